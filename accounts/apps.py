@@ -7,4 +7,4 @@ class AccountsConfig(AppConfig):
     verbose_name = "Contas de Usuários"
 
     def ready(self):
-        pass
+        from . import signals  # noqa: F401
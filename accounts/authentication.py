@@ -0,0 +1,156 @@
+"""
+Autenticação JWT com cache do usuário autenticado
+
+``CachedJWTAuthentication`` guarda no cache, por ``JWT_USER_CACHE_TTL``
+segundos, o usuário de cada token com o perfil (e, para a equipe, as
+permissões) já carregado. A chave inclui um carimbo de versão por usuário,
+trocado pelos sinais de ``accounts.signals`` sempre que usuário, perfil,
+grupos ou permissões mudam (inclusive desativação e troca de senha).
+
+O cache só é usado com um backend compartilhado entre os processos
+(``CACHE_BACKEND``, como Redis ou Memcached): com o ``LocMemCache`` a troca
+de versão valeria só para o worker que fez a alteração, então o usuário é
+carregado do banco a cada requisição. ``JWT_USER_CACHE_TTL = 0`` desliga o
+cache.
+
+O usuário em cache é só para leitura: views que gravam no usuário devem
+carregá-lo de novo do banco.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.metrics import record_cache
+
+VERSION_KEY = "accounts:user_version:{user_id}"
+USER_KEY = "accounts:auth_user:{user_id}:{version}"
+
+
+def get_user_version(user_id):
+    """
+    Retorna o carimbo de versão atual do usuário
+
+    Um carimbo ausente (nunca criado ou removido do cache) é recriado a
+    partir do relógio, para nunca voltar a um valor já usado.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    """
+    Troca o carimbo de versão do usuário, invalidando o usuário em cache
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def shared_cache_enabled():
+    """
+    Indica se o cache padrão é compartilhado entre os processos
+
+    Só nesse caso a troca do carimbo de versão vale para todos os workers.
+    """
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def user_cache_enabled():
+    """
+    Indica se o usuário autenticado pode ser guardado no cache
+    """
+    return getattr(settings, "JWT_USER_CACHE_TTL", 60) > 0 and shared_cache_enabled()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que reutiliza o usuário em cache entre requisições
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        if user_cache_enabled():
+            key = USER_KEY.format(user_id=user_id, version=get_user_version(user_id))
+            user = cache.get(key)
+            record_cache("usuario_jwt", user is not None)
+
+            if user is None:
+                user = self._load_user(user_id)
+                cache.set(key, user, getattr(settings, "JWT_USER_CACHE_TTL", 60))
+        else:
+            user = self._load_user(user_id)
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    def _load_user(self, user_id):
+        """
+        Carrega o usuário com perfil e permissões para guardar no cache
+        """
+        try:
+            user = self.user_model.objects.select_related("profile").get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if user.is_staff or user.is_superuser:
+            user.get_all_permissions()
+
+        return user
+
+
+class StatelessReadJWTAuthentication(CachedJWTAuthentication):
+    """
+    Em métodos de leitura, usa o ``TokenUser`` do próprio token (sem banco
+    nem cache); nos demais métodos, o usuário em cache
+
+    Para endpoints públicos de leitura que só precisam saber quem é o
+    usuário, não do registro completo.
+    """
+
+    def authenticate(self, request):
+        self._safe_method = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if getattr(self, "_safe_method", False):
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken(
+                    _("Token contained no recognizable user identification")
+                )
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,230 @@
+"""
+Autocompletar de bairros (e logradouros) tolerante a erros de digitação
+
+Os nomes são indexados sem acentos e em minúsculas (``fold_name``) em duas
+estruturas em memória, montadas uma vez por processo:
+
+- ``PrefixTrie``: sugestões pelo início do nome ou de qualquer palavra dele
+  ("grande" encontra "Córrego Grande");
+- ``NGramIndex``: candidatos com trigramas em comum, confirmados pela
+  distância de edição (Levenshtein), para grafias como "Corego Grande" ou
+  "Canasvieras".
+
+A lista de logradouros é opcional: um arquivo texto com um nome por linha
+em ``AUTOCOMPLETE_STREETS_FILE``.
+"""
+
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+
+from .validators import FLORIANOPOLIS_NEIGHBORHOODS, fold_name
+
+NAME_START, WORD_START, FUZZY = 0, 1, 2
+
+# Máximo de candidatos percorridos no trie antes de ordenar
+MAX_PREFIX_CANDIDATES = 200
+
+
+def levenshtein(a, b, max_distance=None):
+    """
+    Distância de edição entre ``a`` e ``b``
+
+    Com ``max_distance``, para assim que a distância certamente o excede e
+    retorna ``max_distance + 1``.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class PrefixTrie:
+    """
+    Trie de chaves normalizadas para busca por prefixo
+    """
+
+    _VALUES = ""
+
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, key, value):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault(self._VALUES, []).append(value)
+
+    def search(self, prefix, limit=MAX_PREFIX_CANDIDATES):
+        """
+        Retorna até ``limit`` valores de chaves que começam com ``prefix``
+        """
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        found = []
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            found.extend(node.get(self._VALUES, ()))
+            stack.extend(
+                child
+                for char, child in sorted(node.items(), reverse=True)
+                if char != self._VALUES
+            )
+        return found[:limit]
+
+
+class NGramIndex:
+    """
+    Índice invertido de trigramas para achar candidatos a grafias próximas
+    """
+
+    def __init__(self, n=3):
+        self.n = n
+        self._postings = defaultdict(list)
+
+    def grams(self, text):
+        padded = f" {text}"
+        return {padded[i : i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def add(self, key, value):
+        for gram in self.grams(key):
+            self._postings[gram].append(value)
+
+    def search(self, query, limit, max_distance):
+        """
+        Retorna até ``limit`` valores com mais trigramas em comum com ``query``
+
+        Cada edição altera no máximo ``n`` trigramas, então chaves com menos
+        de ``len(grams) - n * max_distance`` trigramas em comum são descartadas
+        sem calcular a distância.
+        """
+        grams = self.grams(query)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        min_shared = max(1, len(grams) - self.n * max_distance)
+        return [
+            value for value, shared in counts.most_common(limit) if shared >= min_shared
+        ]
+
+
+class NameIndex:
+    """
+    Índice de nomes para autocompletar
+    """
+
+    def __init__(self, names):
+        self.names = sorted(set(name.strip() for name in names if name.strip()))
+        self._folded = [fold_name(name) for name in self.names]
+        self._starts = PrefixTrie()
+        self._words = PrefixTrie()
+        self._suffixes = []
+        self._fuzzy = NGramIndex()
+
+        for i, folded in enumerate(self._folded):
+            self._starts.insert(folded, i)
+            self._fuzzy.add(folded, i)
+            words = folded.split()
+            suffixes = [" ".join(words[position:]) for position in range(len(words))]
+            for suffix in suffixes[1:]:
+                self._words.insert(suffix, i)
+            self._suffixes.append(suffixes)
+
+    @staticmethod
+    def max_distance(query):
+        return 1 if len(query) <= 5 else 2
+
+    def _fuzzy_distance(self, query, i, max_distance):
+        """
+        Menor distância entre a consulta e o nome (ou o início do nome, ou de
+        uma de suas palavras), já que a consulta pode estar incompleta
+        """
+        best = max_distance + 1
+        for suffix in self._suffixes[i]:
+            for target in (suffix, suffix[: len(query)]):
+                best = min(best, levenshtein(query, target, best - 1))
+                if best == 0:
+                    return 0
+        return best
+
+    def suggest(self, query, limit=10):
+        """
+        Retorna sugestões ordenadas: início do nome, início de palavra e, por
+        fim, nomes próximos pela distância de edição
+        """
+        folded = fold_name(query)
+        if not folded:
+            return []
+
+        ranked = {}
+
+        def offer(i, match, distance):
+            rank = (match, distance, len(self._folded[i]), self._folded[i])
+            if i not in ranked or rank < ranked[i]:
+                ranked[i] = rank
+
+        for i in self._starts.search(folded):
+            offer(i, NAME_START, 0)
+        for i in self._words.search(folded):
+            offer(i, WORD_START, 0)
+
+        if len(ranked) < limit and len(folded) >= 3:
+            max_distance = self.max_distance(folded)
+            for i in self._fuzzy.search(folded, limit * 2, max_distance):
+                if i in ranked:
+                    continue
+                distance = self._fuzzy_distance(folded, i, max_distance)
+                if distance <= max_distance:
+                    offer(i, FUZZY, distance)
+
+        best = sorted(ranked, key=ranked.__getitem__)[:limit]
+        return [
+            {
+                "nome": self.names[i],
+                "tipo_correspondencia": ("nome", "palavra", "aproximada")[ranked[i][0]],
+                "distancia": ranked[i][1],
+            }
+            for i in best
+        ]
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _load_streets():
+    path = getattr(settings, "AUTOCOMPLETE_STREETS_FILE", None)
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line.strip()]
+
+
+@lru_cache(maxsize=None)
+def get_index(kind):
+    """
+    Índice do tipo ``bairro`` ou ``logradouro`` (None se não configurado)
+    """
+    if kind == "bairro":
+        return NameIndex(FLORIANOPOLIS_NEIGHBORHOODS)
+    if kind == "logradouro":
+        streets = _load_streets()
+        return NameIndex(streets) if streets else None
+    raise ValueError(f"Tipo de autocompletar desconhecido: {kind}")
@@ -0,0 +1,336 @@
+"""
+Verificação rápida de disponibilidade de CPF
+
+Cada worker mantém em memória um filtro de Bloom com os CPFs cadastrados.
+Quando o filtro responde que o CPF não está presente, a resposta é definitiva
+e o banco não é consultado; quando responde que pode estar presente, a
+confirmação é feita pela consulta indexada em ``Profile.cpf``.
+
+O filtro é montado em uma thread em segundo plano, disparada pela primeira
+consulta do processo; até ficar pronto, toda consulta vai ao banco. Ele
+recebe os CPFs dos perfis criados pelo próprio worker através de sinal e, a
+cada ``REFRESH_SECONDS``, carrega os perfis alterados desde a carga anterior
+(``Profile.data_atualizacao``, com ``REFRESH_OVERLAP_SECONDS`` de folga para
+transações confirmadas com atraso), o que inclui os criados por outros
+workers e CPFs corrigidos. A cada ``REBUILD_SECONDS``, ou quando o filtro
+satura, um filtro novo é montado em segundo plano e substitui o atual.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import CharField, F, Value
+from django.utils import timezone
+
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    "ENABLED": True,
+    "ERROR_RATE": 0.001,
+    "MIN_CAPACITY": 100000,
+    "REFRESH_SECONDS": 30,
+    "REFRESH_OVERLAP_SECONDS": 5 * 60,
+    "REBUILD_SECONDS": 60 * 60,
+}
+
+
+def get_bloom_settings():
+    """
+    Retorna as configurações do filtro de CPFs mescladas com os padrões
+    """
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "CPF_BLOOM_FILTER", {}))
+    return config
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de tamanho fixo sobre um bytearray
+
+    Usa hashing duplo (dois inteiros de 64 bits de um BLAKE2b) para derivar
+    as ``num_hashes`` posições de cada item. ``count`` só conta os itens que
+    acenderam algum bit novo, então recarregar um item não o conta de novo.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8,
+            int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        new = False
+        for position in self._positions(item):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self._bits[byte] & bit:
+                self._bits[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def is_saturated(self):
+        return self.count > self.capacity
+
+
+class CPFRegistry:
+    """
+    Conjunto aproximado dos CPFs cadastrados, por processo
+    """
+
+    def __init__(
+        self,
+        error_rate=0.001,
+        min_capacity=100000,
+        refresh_seconds=30,
+        refresh_overlap_seconds=5 * 60,
+        rebuild_seconds=60 * 60,
+    ):
+        self.error_rate = error_rate
+        self.min_capacity = min_capacity
+        self.refresh_seconds = refresh_seconds
+        self.refresh_overlap = timedelta(seconds=refresh_overlap_seconds)
+        self.rebuild_seconds = rebuild_seconds
+
+        self._filter = None
+        # Perfis alterados a partir daqui ainda não foram carregados
+        self._loaded_since = None
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+        # CPFs adicionados antes de o filtro ficar pronto ou enquanto um novo
+        # é montado; entram no filtro novo na troca
+        self._pending = []
+        self._building = False
+        self._lock = threading.Lock()
+
+    def _load(self, bloom, queryset):
+        for cpf in queryset.values_list("cpf", flat=True).iterator(chunk_size=5000):
+            bloom.add(cpf)
+
+    def rebuild(self):
+        """
+        Monta um filtro novo a partir de todos os perfis e troca o atual
+        """
+        started = timezone.now()
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+
+        try:
+            total = Profile.objects.count()
+            bloom = BloomFilter(max(self.min_capacity, total * 2), self.error_rate)
+            self._load(bloom, Profile.objects.order_by())
+        except Exception:
+            with self._lock:
+                if self._filter is not None:
+                    self._pending = None
+            raise
+
+        with self._lock:
+            for cpf in self._pending:
+                bloom.add(cpf)
+            self._pending = None
+            self._filter = bloom
+            self._loaded_since = started
+            self._built_at = self._refreshed_at = time.monotonic()
+
+        logger.info(
+            "Filtro de CPFs montado: %s CPFs, %s bits, %s hashes",
+            bloom.count,
+            bloom.num_bits,
+            bloom.num_hashes,
+        )
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            # Confere de novo: outra thread pode ter acabado de montar o filtro
+            if self._building or not self._rebuild_due(time.monotonic()):
+                return
+            self._building = True
+
+        threading.Thread(
+            target=self._run_rebuild, name="cpf-bloom-filter", daemon=True
+        ).start()
+
+    def _run_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Falha ao montar o filtro de CPFs")
+        finally:
+            with self._lock:
+                self._building = False
+            connection.close()
+
+    def _rebuild_due(self, now):
+        return (
+            self._filter is None
+            or self._filter.is_saturated
+            or now - self._built_at >= self.rebuild_seconds
+        )
+
+    def _refresh_if_due(self):
+        now = time.monotonic()
+
+        if self._rebuild_due(now):
+            self._rebuild_in_background()
+
+        if self._filter is None or now - self._refreshed_at < self.refresh_seconds:
+            return
+
+        with self._lock:
+            # Outra thread pode ter atualizado enquanto esta esperava a trava
+            if time.monotonic() - self._refreshed_at < self.refresh_seconds:
+                return
+            started = timezone.now()
+            self._load(
+                self._filter,
+                Profile.objects.filter(
+                    data_atualizacao__gte=self._loaded_since - self.refresh_overlap
+                ).order_by(),
+            )
+            self._loaded_since = started
+            self._refreshed_at = time.monotonic()
+
+    def might_contain(self, cpf):
+        """
+        Retorna False somente quando o CPF certamente não está cadastrado
+
+        Enquanto o filtro não estiver montado, retorna True.
+        """
+        self._refresh_if_due()
+        bloom = self._filter
+        return bloom is None or cpf in bloom
+
+    def add(self, cpf):
+        """
+        Registra um CPF recém-cadastrado
+        """
+        if not cpf:
+            return
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(cpf)
+            if self._pending is not None:
+                self._pending.append(cpf)
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+            self._pending = []
+            self._loaded_since = None
+            self._built_at = self._refreshed_at = 0.0
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_cpf_registry():
+    """
+    Retorna o registro de CPFs do processo, criando-o na primeira chamada
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = get_bloom_settings()
+                _registry = CPFRegistry(
+                    error_rate=config["ERROR_RATE"],
+                    min_capacity=config["MIN_CAPACITY"],
+                    refresh_seconds=config["REFRESH_SECONDS"],
+                    refresh_overlap_seconds=config["REFRESH_OVERLAP_SECONDS"],
+                    rebuild_seconds=config["REBUILD_SECONDS"],
+                )
+    return _registry
+
+
+def cpf_exists(cpf):
+    """
+    Verifica se o CPF (apenas dígitos) já está cadastrado
+
+    Consulta o banco apenas quando o filtro não descarta o CPF.
+    """
+    if get_bloom_settings()["ENABLED"]:
+        try:
+            if not get_cpf_registry().might_contain(cpf):
+                return False
+        except Exception as e:
+            logger.warning("Filtro de CPFs indisponível, consultando o banco: %s", e)
+
+    return Profile.objects.filter(cpf=cpf).exists()
+
+
+def find_unavailable(cpfs=(), usernames=(), emails=()):
+    """
+    Retorna os valores já cadastrados, agrupados por campo
+
+    Todas as verificações de unicidade são resolvidas em uma única consulta
+    (UNION ALL). CPFs descartados pelo filtro de Bloom nem entram na consulta.
+    """
+    cpfs = set(filter(None, cpfs))
+    usernames = set(filter(None, usernames))
+    emails = set(filter(None, emails))
+
+    result = {"cpf": set(), "username": set(), "email": set()}
+
+    if cpfs and get_bloom_settings()["ENABLED"]:
+        try:
+            registry = get_cpf_registry()
+            cpfs = {cpf for cpf in cpfs if registry.might_contain(cpf)}
+        except Exception as e:
+            logger.warning("Filtro de CPFs indisponível, consultando o banco: %s", e)
+
+    lookups = [
+        (Profile, "cpf", cpfs),
+        (User, "username", usernames),
+        (User, "email", emails),
+    ]
+
+    queries = [
+        model.objects.filter(**{f"{campo}__in": valores})
+        .annotate(
+            campo=Value(campo, output_field=CharField()),
+            valor=F(campo),
+        )
+        .order_by()
+        .values_list("campo", "valor")
+        for model, campo, valores in lookups
+        if valores
+    ]
+
+    if not queries:
+        return result
+
+    queryset = queries[0].union(*queries[1:], all=True)
+    for campo, valor in queryset:
+        result[campo].add(valor)
+
+    return result
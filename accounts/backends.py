@@ -0,0 +1,137 @@
+"""
+Backend de autenticação com verificação de senha em executor limitado
+
+O cálculo do hash da senha (PBKDF2) é a parte cara do login. Aqui ele roda em
+um pool de threads de tamanho fixo (``PASSWORD_CHECK_WORKERS``), de modo que
+picos de login não ocupem todas as threads de requisição. Quando já há
+``PASSWORD_CHECK_MAX_PENDING`` verificações aguardando além das que estão
+rodando, novas tentativas esperam no máximo ``PASSWORD_CHECK_TIMEOUT``
+segundos por uma vaga e, sem vaga, o login pela API recebe 503. Chamadas de
+``authenticate()`` fora do DRF (ex.: login do admin) recebem apenas None.
+
+As consultas ao banco continuam na thread da requisição; só o hash vai para
+o pool.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from core.metrics import PASSWORD_CHECK_PENDING, PASSWORD_CHECK_REJECTED
+
+logger = logging.getLogger(__name__)
+
+UserModel = get_user_model()
+
+
+class PasswordCheckUnavailable(APIException):
+    """
+    Fila de verificação de senhas cheia
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = (
+        "Muitas tentativas de login simultâneas. Tente novamente em instantes."
+    )
+    default_code = "password_check_unavailable"
+
+
+_executor = None
+_slots = None
+_init_lock = threading.Lock()
+
+
+def _get_pool():
+    global _executor, _slots
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                workers = getattr(settings, "PASSWORD_CHECK_WORKERS", None) or (
+                    os.cpu_count() or 1
+                )
+                pending = getattr(settings, "PASSWORD_CHECK_MAX_PENDING", 32)
+                _slots = threading.BoundedSemaphore(workers + pending)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="password-check"
+                )
+    return _executor, _slots
+
+
+def run_password_check(func, *args):
+    """
+    Executa ``func`` no pool de verificação de senhas e retorna o resultado
+
+    Levanta ``PasswordCheckUnavailable`` se não houver vaga no prazo.
+    """
+    executor, slots = _get_pool()
+    timeout = getattr(settings, "PASSWORD_CHECK_TIMEOUT", 5)
+
+    PASSWORD_CHECK_PENDING.inc()
+    try:
+        if not slots.acquire(timeout=timeout):
+            logger.warning("Fila de verificação de senhas cheia, login recusado")
+            PASSWORD_CHECK_REJECTED.inc()
+            raise PasswordCheckUnavailable()
+
+        try:
+            return executor.submit(func, *args).result()
+        finally:
+            slots.release()
+    finally:
+        PASSWORD_CHECK_PENDING.dec()
+
+
+class BoundedPasswordBackend(ModelBackend):
+    """
+    ModelBackend que verifica a senha no pool limitado
+
+    Carrega o perfil junto com o usuário, já que o token JWT inclui dados
+    do perfil.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        try:
+            return self._authenticate(request, username, password, **kwargs)
+        except PasswordCheckUnavailable:
+            # Só o DRF transforma a exceção em resposta (503)
+            if isinstance(request, Request):
+                raise
+            return None
+
+    def _authenticate(self, request, username, password, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.select_related("profile").get(
+                **{UserModel.USERNAME_FIELD: username}
+            )
+        except UserModel.DoesNotExist:
+            # Calcula um hash mesmo assim para não revelar, pelo tempo de
+            # resposta, se o usuário existe
+            run_password_check(make_password, password)
+            return None
+
+        rehash = []
+        valid = run_password_check(
+            check_password, password, user.password, rehash.append
+        )
+
+        if valid and rehash:
+            user.set_password(password)
+            user.save(update_fields=["password"])
+
+        if valid and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,158 @@
+"""
+Índice local de faixas de CEP de Florianópolis por bairro
+
+A tabela ``data/cep_faixas.csv`` (ou o arquivo em ``CEP_RANGES_FILE``) lista
+faixas de CEP sem sobreposição e os bairros atendidos por cada uma. Ela é
+carregada uma vez por processo em listas ordenadas pelo início da faixa, e a
+busca de um CEP é uma busca binária (``bisect``), sem acesso à rede.
+
+Uma faixa pode atender mais de um bairro; CEPs de Florianópolis fora das
+faixas cadastradas são aceitos sem conferência de bairro. A tabela incluída
+é uma aproximação e não cobre todos os bairros, então um bairro diferente do
+da faixa é apenas um aviso com os bairros sugeridos, nunca um erro. Para
+substituir a tabela pelos dados oficiais dos Correios, gere um CSV no mesmo
+formato (``inicio,fim,bairros`` com bairros separados por ``|``) e aponte
+``CEP_RANGES_FILE`` para ele.
+"""
+
+import bisect
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .validators import fold_name
+
+DEFAULT_RANGES_FILE = Path(__file__).resolve().parent / "data" / "cep_faixas.csv"
+
+# Faixa de CEPs do município de Florianópolis
+FLORIANOPOLIS_CEP_RANGE = (88000000, 88099999)
+
+
+class CEPRangeIndex:
+    """
+    Faixas de CEP ordenadas para busca binária
+    """
+
+    def __init__(self, ranges):
+        ranges = sorted(ranges)
+        self._starts = []
+        self._ends = []
+        self._neighborhoods = []
+
+        for start, end, neighborhoods in ranges:
+            if start > end:
+                raise ValueError(f"Faixa de CEP invertida: {start}-{end}")
+            if self._ends and start <= self._ends[-1]:
+                raise ValueError(f"Faixa de CEP sobreposta: {start}-{end}")
+            self._starts.append(start)
+            self._ends.append(end)
+            self._neighborhoods.append(tuple(neighborhoods))
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, encoding="utf-8", newline="") as f:
+            return cls(
+                (
+                    int(row["inicio"]),
+                    int(row["fim"]),
+                    [name.strip() for name in row["bairros"].split("|")],
+                )
+                for row in csv.DictReader(f)
+            )
+
+    def lookup(self, cep):
+        """
+        Retorna os bairros da faixa que contém o CEP (inteiro), ou None
+        """
+        i = bisect.bisect_right(self._starts, cep) - 1
+        if i >= 0 and cep <= self._ends[i]:
+            return self._neighborhoods[i]
+        return None
+
+    def __iter__(self):
+        return zip(self._starts, self._ends, self._neighborhoods)
+
+    def __len__(self):
+        return len(self._starts)
+
+
+@lru_cache(maxsize=1)
+def get_cep_index():
+    """
+    Índice de faixas de CEP do processo (carregado no primeiro uso)
+    """
+    path = getattr(settings, "CEP_RANGES_FILE", None) or DEFAULT_RANGES_FILE
+    return CEPRangeIndex.from_csv(path)
+
+
+def clean_cep(cep):
+    return re.sub(r"[^0-9]", "", str(cep or ""))
+
+
+def is_florianopolis_cep(cep):
+    """
+    Indica se o CEP (já limpo, 8 dígitos) é de Florianópolis
+    """
+    start, end = FLORIANOPOLIS_CEP_RANGE
+    return start <= int(cep) <= end
+
+
+def lookup_neighborhoods(cep):
+    """
+    Retorna os bairros atendidos pelo CEP, ou None se a faixa não for conhecida
+    """
+    cep_clean = clean_cep(cep)
+    if len(cep_clean) != 8:
+        return None
+    return get_cep_index().lookup(int(cep_clean))
+
+
+def neighborhood_matches(neighborhood, neighborhoods):
+    """
+    Compara o bairro informado com os da faixa, como em
+    ``validate_florianopolis_neighborhood`` (sem acentos e por trecho)
+    """
+    folded = fold_name(neighborhood)
+    return any(
+        folded in fold_name(name) or fold_name(name) in folded for name in neighborhoods
+    )
+
+
+def resolve_cep_neighborhood(cep, neighborhood):
+    """
+    Confere CEP e bairro e retorna ``(bairro a gravar, aviso)``
+
+    Com o bairro vazio, preenche com o bairro da faixa quando ela atende um
+    só bairro. Um bairro que não está na faixa do CEP é mantido e gera um
+    aviso com os bairros da faixa (ou None quando não há divergência).
+
+    Raises:
+        ValidationError: CEP fora de Florianópolis
+    """
+    cep_clean = clean_cep(cep)
+    if len(cep_clean) != 8:
+        return neighborhood, None
+
+    if not is_florianopolis_cep(cep_clean):
+        raise ValidationError("CEP não pertence a Florianópolis.")
+
+    neighborhoods = get_cep_index().lookup(int(cep_clean))
+    if not neighborhoods:
+        return neighborhood, None
+
+    if not neighborhood:
+        if len(neighborhoods) == 1:
+            return neighborhoods[0], None
+        return neighborhood, None
+
+    if not neighborhood_matches(neighborhood, neighborhoods):
+        return neighborhood, (
+            f'Confira o bairro "{neighborhood}": pela nossa tabela de faixas, '
+            f"este CEP atende {', '.join(neighborhoods)}."
+        )
+
+    return neighborhood, None
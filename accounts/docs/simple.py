@@ -15,7 +15,12 @@ USER_CREATE_SIMPLE_SCHEMA = extend_schema(
     description="Cria um novo usuário com perfil de contribuinte",
     tags=["Autenticação"],
     responses={
-        201: OpenApiResponse(description="Usuário criado com sucesso"),
+        201: OpenApiResponse(
+            description=(
+                "Usuário criado com sucesso; avisos.bairro indica um bairro "
+                "diferente dos atendidos pelo CEP"
+            )
+        ),
         400: OpenApiResponse(description="Dados inválidos"),
     },
 )
@@ -61,7 +66,12 @@ PROFILE_UPDATE_SIMPLE_SCHEMA = extend_schema(
     description="Atualiza informações do perfil",
     tags=["Perfil"],
     responses={
-        200: OpenApiResponse(description="Perfil atualizado com sucesso"),
+        200: OpenApiResponse(
+            description=(
+                "Perfil atualizado com sucesso; avisos.bairro indica um bairro "
+                "diferente dos atendidos pelo CEP"
+            )
+        ),
         400: OpenApiResponse(description="Dados inválidos"),
         401: OpenApiResponse(description="Não autenticado"),
     },
@@ -91,7 +101,45 @@ PROFILES_LIST_SIMPLE_SCHEMA = extend_schema(
             name="search",
             type=OpenApiTypes.STR,
             location=OpenApiParameter.QUERY,
-            description="Buscar por nome ou CPF",
+            description="Buscar por nome, usuário, CPF ou bairro (tolera erros de digitação)",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="min_alertas",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description="Mínimo de alertas ativos do contribuinte",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="min_comentarios",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description="Mínimo de comentários ativos do contribuinte",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="sem_atividade_desde",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description="Sem alertas nem comentários desde a data (YYYY-MM-DD)",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="dormente",
+            type=OpenApiTypes.BOOL,
+            location=OpenApiParameter.QUERY,
+            description="Filtrar pela marcação de dormente",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="ordering",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Ordenação: total_alertas, total_comentarios, ultimo_alerta, "
+                "ultimo_comentario ou data_cadastro (prefixo '-' para decrescente)"
+            ),
             required=False,
         ),
         OpenApiParameter(
@@ -111,6 +159,7 @@ PROFILES_LIST_SIMPLE_SCHEMA = extend_schema(
     ],
     responses={
         200: OpenApiResponse(description="Lista obtida com sucesso"),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
         401: OpenApiResponse(description="Não autenticado"),
         403: OpenApiResponse(description="Sem permissão"),
     },
@@ -121,13 +170,138 @@ STATS_SIMPLE_SCHEMA = extend_schema(
     summary="Estatísticas do sistema",
     description="Retorna estatísticas de usuários e contribuintes",
     tags=["Administração"],
+    parameters=[
+        OpenApiParameter(
+            name="data_inicio",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description="Início do período dos registros mensais (YYYY-MM-DD)",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="data_fim",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description="Fim do período dos registros mensais (YYYY-MM-DD)",
+            required=False,
+        ),
+    ],
     responses={
         200: OpenApiResponse(description="Estatísticas geradas com sucesso"),
+        400: OpenApiResponse(description="Datas em formato inválido"),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão"),
+    },
+)
+
+REQUEST_PROFILES_LIST_SIMPLE_SCHEMA = extend_schema(
+    operation_id="request_profiles_list_simple",
+    summary="Listar perfis de requisições",
+    description="Lista os perfis de execução gravados pelo profiler por amostragem",
+    tags=["Administração"],
+    responses={
+        200: OpenApiResponse(description="Lista obtida com sucesso"),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão"),
+    },
+)
+
+REQUEST_PROFILE_TOKEN_SIMPLE_SCHEMA = extend_schema(
+    operation_id="request_profile_token_simple",
+    summary="Emitir token de perfilamento",
+    description=(
+        "Emite um token temporário; requisições com o token no cabeçalho "
+        "X-Profile-Token (ou no parâmetro _profile) são perfiladas"
+    ),
+    tags=["Administração"],
+    request=None,
+    responses={
+        201: OpenApiResponse(description="Token emitido"),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão"),
+    },
+)
+
+REQUEST_PROFILE_DETAIL_SIMPLE_SCHEMA = extend_schema(
+    operation_id="request_profile_detail_simple",
+    summary="Baixar perfil de requisição",
+    description=(
+        "Retorna as pilhas amostradas no formato collapsed, aceito pelo "
+        "flamegraph.pl e pelo speedscope"
+    ),
+    tags=["Administração"],
+    responses={
+        (200, "text/plain"): OpenApiResponse(
+            response=OpenApiTypes.STR, description="Pilhas do perfil"
+        ),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão"),
+        404: OpenApiResponse(description="Perfil não encontrado"),
+    },
+)
+
+SLOW_QUERIES_LIST_SIMPLE_SCHEMA = extend_schema(
+    operation_id="slow_queries_list_simple",
+    summary="Listar consultas lentas",
+    description=(
+        "Agrupa as consultas lentas capturadas por forma de consulta, com "
+        "tempo total, número de execuções, média, máximo e o plano mais recente"
+    ),
+    tags=["Administração"],
+    parameters=[
+        OpenApiParameter(
+            name="ordering",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description="total_ms (padrão), max_ms, media_ms ou execucoes",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="rota",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description="Filtrar pela rota (ex.: accounts:api_user_stats)",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="desde",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description="Apenas capturas a partir da data (YYYY-MM-DD)",
+            required=False,
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description="Número de consultas (padrão: 20, máximo: 100)",
+            required=False,
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(description="Lista obtida com sucesso"),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
         401: OpenApiResponse(description="Não autenticado"),
         403: OpenApiResponse(description="Sem permissão"),
     },
 )
 
+SLOW_QUERY_DETAIL_SIMPLE_SCHEMA = extend_schema(
+    operation_id="slow_query_detail_simple",
+    summary="Amostras de uma consulta lenta",
+    description=(
+        "Lista as capturas mais recentes de uma forma de consulta, com "
+        "parâmetros, rota e plano de execução"
+    ),
+    tags=["Administração"],
+    responses={
+        200: OpenApiResponse(description="Amostras obtidas com sucesso"),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão"),
+        404: OpenApiResponse(description="Consulta não encontrada"),
+    },
+)
+
 CPF_VALIDATION_SIMPLE_SCHEMA = extend_schema(
     operation_id="cpf_validation_simple",
     summary="Validar CPF",
@@ -148,6 +322,46 @@ CPF_VALIDATION_SIMPLE_SCHEMA = extend_schema(
     },
 )
 
+AUTOCOMPLETE_SIMPLE_SCHEMA = extend_schema(
+    operation_id="neighborhoods_autocomplete_simple",
+    summary="Autocompletar bairros",
+    description=(
+        "Sugere bairros de Florianópolis (ou logradouros, se configurados) a "
+        "partir do texto digitado, tolerando acentos ausentes e erros de "
+        "digitação"
+    ),
+    tags=["Validação"],
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description="Texto digitado",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="tipo",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description="bairro (padrão) ou logradouro",
+            required=False,
+            enum=["bairro", "logradouro"],
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description="Máximo de sugestões (padrão: 10, máximo: 20)",
+            required=False,
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(description="Sugestões obtidas com sucesso"),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
+        404: OpenApiResponse(description="Lista de logradouros não configurada"),
+    },
+)
+
 PHONE_VALIDATION_SIMPLE_SCHEMA = extend_schema(
     operation_id="phone_validation_simple",
     summary="Validar telefone",
@@ -188,6 +402,50 @@ CEP_VALIDATION_SIMPLE_SCHEMA = extend_schema(
     },
 )
 
+CEP_LOOKUP_SIMPLE_SCHEMA = extend_schema(
+    operation_id="cep_lookup_simple",
+    summary="Consultar bairro pelo CEP",
+    description=(
+        "Sugere os bairros de Florianópolis atendidos pelo CEP, a partir da "
+        "tabela local de faixas de CEP"
+    ),
+    tags=["Validação"],
+    parameters=[
+        OpenApiParameter(
+            name="cep",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description="CEP a ser consultado",
+            required=True,
+        )
+    ],
+    responses={
+        200: OpenApiResponse(description="Bairros encontrados"),
+        400: OpenApiResponse(description="CEP inválido"),
+        404: OpenApiResponse(description="CEP fora de Florianópolis ou sem faixa"),
+    },
+)
+
+BATCH_VALIDATION_SIMPLE_SCHEMA = extend_schema(
+    operation_id="batch_validation_simple",
+    summary="Validar campos em lote",
+    description=(
+        "Valida qualquer subconjunto de cpf, phone, cep, bairro, username e "
+        "email em uma única chamada. Aceita um objeto ou, para a equipe e "
+        "parceiros com a permissão accounts.validate_batch, uma lista de "
+        "objetos; cada registro da lista conta no limite de taxa"
+    ),
+    tags=["Validação"],
+    request=OpenApiTypes.OBJECT,
+    responses={
+        200: OpenApiResponse(description="Validação realizada com sucesso"),
+        400: OpenApiResponse(description="Requisição inválida"),
+        401: OpenApiResponse(description="Lote enviado sem autenticação"),
+        403: OpenApiResponse(description="Lote enviado sem permissão"),
+        429: OpenApiResponse(description="Limite de registros excedido"),
+    },
+)
+
 NEIGHBORHOODS_SIMPLE_SCHEMA = extend_schema(
     operation_id="neighborhoods_simple",
     summary="Listar bairros",
@@ -0,0 +1,144 @@
+"""
+Documentos de perfil pré-calculados e em cache
+
+``/accounts/me/`` e o JSON legado do perfil são servidos a partir de um
+documento por usuário, montado uma vez (formatação de CPF, telefone e CEP,
+idade) e guardado no cache junto com o seu ETag. A chave inclui o carimbo de
+versão do usuário (trocado a cada gravação de ``User``/``Profile``, ver
+``accounts.authentication``) e a data do dia, já que a idade muda com ela.
+
+Como o usuário em cache da autenticação JWT, o documento só é guardado com
+um backend de cache compartilhado: com o ``LocMemCache`` os outros workers
+não veriam a troca de versão e continuariam servindo o documento (e
+respondendo 304 ao ETag) antigo. Nesse caso o documento é montado a cada
+requisição, e o ETag continua permitindo o 304.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from core.metrics import record_cache
+
+from .authentication import get_user_version, shared_cache_enabled
+from .models import Profile
+from .serializers.user import UserSerializer
+
+DOCUMENT_KEY = "accounts:profile_doc:{kind}:{user_id}:{version}:{day}"
+
+
+def _user_data(user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "full_name": user.get_full_name(),
+    }
+
+
+def build_me_document(user):
+    """
+    Documento servido por ``/accounts/me/``
+    """
+    return UserSerializer(user).data
+
+
+def build_legacy_document(user):
+    """
+    Documento servido pela view legada ``user_profile_json``
+    """
+    try:
+        profile = user.profile
+    except Profile.DoesNotExist:
+        return {"user": _user_data(user), "profile": None, "has_profile": False}
+
+    return {
+        "user": _user_data(user),
+        "profile": {
+            "id": profile.id,
+            "cpf": profile.cpf,
+            "cpf_formatted": profile.get_cpf_formatado(),
+            "phone": profile.telefone,
+            "phone_formatted": profile.get_telefone_formatado(),
+            "address": profile.endereco,
+            "neighborhood": profile.bairro,
+            "cep": profile.cep,
+            "cep_formatted": profile.get_cep_formatado(),
+            "birth_date": (
+                profile.data_nascimento.isoformat() if profile.data_nascimento else None
+            ),
+            "age": profile.get_idade(),
+            "active": profile.ativo,
+            "photo_url": profile.foto.url if profile.foto else None,
+            "created_at": profile.data_cadastro.isoformat(),
+            "updated_at": profile.data_atualizacao.isoformat(),
+        },
+    }
+
+
+DOCUMENT_BUILDERS = {
+    "me": build_me_document,
+    "legacy": build_legacy_document,
+}
+
+
+def get_profile_document(user, kind):
+    """
+    Retorna ``{"data": ..., "etag": ...}`` do documento do usuário
+    """
+    ttl = getattr(settings, "PROFILE_DOCUMENT_CACHE_TTL", 3600)
+    if ttl <= 0 or not shared_cache_enabled():
+        return _build_document(user, kind)
+
+    key = DOCUMENT_KEY.format(
+        kind=kind,
+        user_id=user.pk,
+        version=get_user_version(user.pk),
+        day=timezone.localdate().isoformat(),
+    )
+    document = cache.get(key)
+    record_cache("documento_perfil", document is not None)
+
+    if document is None:
+        document = _build_document(user, kind)
+        cache.set(key, document, ttl)
+
+    return document
+
+
+def _build_document(user, kind):
+    body = json.dumps(
+        DOCUMENT_BUILDERS[kind](user), cls=DjangoJSONEncoder, sort_keys=True
+    )
+    return {
+        "data": json.loads(body),
+        "etag": f'"{hashlib.md5(body.encode()).hexdigest()}"',
+    }
+
+
+def is_not_modified(request, etag):
+    """
+    Indica se o cliente já tem a versão atual (If-None-Match)
+    """
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def set_document_headers(response, etag):
+    """
+    Adiciona ETag e exige revalidação pelo cliente
+    """
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
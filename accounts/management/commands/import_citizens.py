@@ -0,0 +1,448 @@
+"""
+Importa em massa contribuintes a partir de um arquivo CSV ou NDJSON
+
+O arquivo é lido em streaming e processado em lotes: cada lote é validado em
+memória, tem a unicidade de CPF, username e email resolvida em uma única
+consulta, as senhas calculadas em paralelo em um pool de processos e os
+registros gravados com ``bulk_create``. Registros rejeitados são gravados em
+um relatório NDJSON com a linha de origem e os erros por campo.
+
+Colunas aceitas: username, email, first_name, last_name, password, cpf,
+data_nascimento (YYYY-MM-DD), telefone, endereco, bairro e cep. Sem username,
+o CPF é usado como nome de usuário. Registros sem senha (ou todos, com
+``--unusable-passwords``) recebem senha inutilizável e um token de convite,
+gravado em ``--invites`` para que o contribuinte defina a própria senha.
+"""
+
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.availability import find_unavailable, get_cpf_registry
+from accounts.cep import resolve_cep_neighborhood
+from accounts.models import Profile, UserActivity
+from accounts.validators import (
+    validate_birth_date,
+    validate_cep,
+    validate_cpf,
+    validate_florianopolis_neighborhood,
+    validate_phone_number,
+)
+
+USER_FIELDS = ("username", "email", "first_name", "last_name")
+PROFILE_FIELDS = ("cpf", "data_nascimento", "telefone", "endereco", "bairro", "cep")
+UNIQUE_FIELDS = ("cpf", "username", "email")
+
+
+def _init_worker():
+    """
+    Inicializa o Django nos processos do pool (necessário com spawn)
+    """
+    django.setup()
+
+
+def _hash_password(password):
+    return make_password(password)
+
+
+def _read_records(stream, fmt):
+    """
+    Gera (linha, registro) a partir de um arquivo CSV ou NDJSON
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_num, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_num, {"__erro__": f"JSON inválido: {e}"}
+            continue
+        yield line_num, (
+            record
+            if isinstance(record, dict)
+            else {"__erro__": "Cada linha deve ser um objeto JSON"}
+        )
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _clean_record(record):
+    """
+    Normaliza e valida um registro, retornando (dados, erros)
+
+    Aplica as mesmas regras do cadastro pela API: os validadores de
+    ``AUTH_PASSWORD_VALIDATORS`` na senha e a conferência do CEP com o bairro
+    (``resolve_cep_neighborhood``), que também preenche o bairro vazio.
+    """
+    if "__erro__" in record:
+        return None, {"registro": record["__erro__"]}
+
+    data = {
+        field: str(record.get(field) or "").strip()
+        for field in USER_FIELDS + PROFILE_FIELDS + ("password",)
+    }
+    errors = {}
+
+    for field in ("cpf", "telefone", "cep"):
+        data[field] = re.sub(r"[^0-9]", "", data[field])
+
+    if not data["username"]:
+        data["username"] = data["cpf"]
+
+    checks = [
+        ("cpf", validate_cpf, True),
+        ("telefone", validate_phone_number, False),
+        ("cep", validate_cep, False),
+        ("bairro", validate_florianopolis_neighborhood, False),
+        ("email", validate_email, False),
+        ("username", User._meta.get_field("username").run_validators, True),
+    ]
+
+    for field, validator, required in checks:
+        if not data[field]:
+            if required:
+                errors[field] = "Campo obrigatório."
+            continue
+        try:
+            validator(data[field])
+        except ValidationError as e:
+            errors[field] = " ".join(e.messages)
+
+    birth_date = (
+        parse_date(data["data_nascimento"]) if data["data_nascimento"] else None
+    )
+    try:
+        if data["data_nascimento"] and birth_date is None:
+            raise ValidationError(
+                "Data de nascimento deve estar no formato YYYY-MM-DD."
+            )
+        validate_birth_date(birth_date)
+        data["data_nascimento"] = birth_date
+    except ValidationError as e:
+        errors["data_nascimento"] = " ".join(e.messages)
+
+    if data["cep"] and "cep" not in errors and "bairro" not in errors:
+        try:
+            data["bairro"], _ = resolve_cep_neighborhood(data["cep"], data["bairro"])
+        except ValidationError as e:
+            errors["cep"] = " ".join(e.messages)
+
+    if data["password"]:
+        user = User(**{field: data[field] for field in USER_FIELDS})
+        try:
+            validate_password(data["password"], user=user)
+        except ValidationError as e:
+            errors["password"] = " ".join(e.messages)
+
+    return data, errors
+
+
+class Command(BaseCommand):
+    help = "Importa contribuintes em massa a partir de um arquivo CSV ou NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo a importar (use - para stdin)")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Formato do arquivo (padrão: pela extensão, csv para stdin)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Registros por lote (padrão: 1000)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processos para o cálculo das senhas (padrão: número de CPUs)",
+        )
+        parser.add_argument(
+            "--unusable-passwords",
+            action="store_true",
+            help="Ignora as senhas do arquivo e gera convites para todos",
+        )
+        parser.add_argument(
+            "--rejects",
+            help="Relatório NDJSON dos registros rejeitados (padrão: <path>.rejects.ndjson)",
+        )
+        parser.add_argument(
+            "--invites",
+            help="CSV com os tokens de convite (padrão: <path>.invites.csv)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas valida, sem gravar no banco",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        batch_size = max(1, options["batch_size"])
+        self.unusable_passwords = options["unusable_passwords"]
+        self.dry_run = options["dry_run"]
+
+        base = "import" if path == "-" else path
+        rejects_path = options["rejects"] or f"{base}.rejects.ndjson"
+        invites_path = options["invites"] or f"{base}.invites.csv"
+
+        try:
+            stream = (
+                sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+            )
+        except OSError as e:
+            raise CommandError(f"Não foi possível abrir {path}: {e}")
+
+        self.seen = {field: set() for field in UNIQUE_FIELDS}
+        self.totals = {"lidos": 0, "importados": 0, "rejeitados": 0, "convites": 0}
+        started = time.monotonic()
+
+        self.workers = max(1, options["workers"])
+        executor = None
+        if self.workers > 1 and not self.unusable_passwords:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+
+        try:
+            with stream, open(rejects_path, "w", encoding="utf-8") as rejects, open(
+                invites_path, "w", newline="", encoding="utf-8"
+            ) as invites_file:
+                self.rejects = rejects
+                self.invites = csv.writer(invites_file)
+                self.invites.writerow(["username", "email", "uid", "token"])
+
+                for batch in _batched(_read_records(stream, fmt), batch_size):
+                    self._process_batch(batch, executor)
+                    self.stdout.write(
+                        f"{self.totals['lidos']} lidos, "
+                        f"{self.totals['importados']} importados, "
+                        f"{self.totals['rejeitados']} rejeitados"
+                    )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Importação concluída em {elapsed:.1f}s: "
+                f"{self.totals['importados']} importados, "
+                f"{self.totals['rejeitados']} rejeitados, "
+                f"{self.totals['convites']} convites"
+                + (" (dry-run, nada foi gravado)" if self.dry_run else "")
+            )
+        )
+        if self.totals["rejeitados"]:
+            self.stdout.write(f"Rejeitados: {rejects_path}")
+        if self.totals["convites"]:
+            self.stdout.write(f"Convites: {invites_path}")
+
+    def _reject(self, line_num, record, errors):
+        record = {k: v for k, v in record.items() if k != "password"}
+        self.rejects.write(
+            json.dumps(
+                {"linha": line_num, "registro": record, "erros": errors},
+                ensure_ascii=False,
+                default=str,
+            )
+            + "\n"
+        )
+        self.totals["rejeitados"] += 1
+
+    def _process_batch(self, batch, executor):
+        self.totals["lidos"] += len(batch)
+
+        valid = []
+        for line_num, record in batch:
+            data, errors = _clean_record(record)
+            if errors:
+                self._reject(line_num, record, errors)
+            else:
+                valid.append((line_num, record, data))
+
+        unavailable = find_unavailable(
+            cpfs=[data["cpf"] for _, _, data in valid],
+            usernames=[data["username"] for _, _, data in valid],
+            emails=[data["email"] for _, _, data in valid],
+        )
+
+        accepted = []
+        for line_num, record, data in valid:
+            errors = {}
+            for field in UNIQUE_FIELDS:
+                value = data[field]
+                if not value:
+                    continue
+                if value in unavailable[field]:
+                    errors[field] = "Já cadastrado no sistema."
+                elif value in self.seen[field]:
+                    errors[field] = "Valor repetido no arquivo."
+
+            if errors:
+                self._reject(line_num, record, errors)
+                continue
+
+            for field in UNIQUE_FIELDS:
+                if data[field]:
+                    self.seen[field].add(data[field])
+            accepted.append((line_num, record, data))
+
+        if not accepted:
+            return
+
+        if self.dry_run:
+            self.totals["importados"] += len(accepted)
+            return
+
+        self._hash_passwords(accepted, executor)
+
+        try:
+            with transaction.atomic():
+                created = self._bulk_create(accepted)
+        except IntegrityError:
+            created = self._create_one_by_one(accepted)
+        else:
+            # bulk_create não dispara o sinal que inclui o CPF no filtro
+            registry = get_cpf_registry()
+            for _, data in created:
+                registry.add(data["cpf"])
+
+        self.totals["importados"] += len(created)
+        self._write_invites(created)
+
+    def _hash_passwords(self, accepted, executor):
+        pending = []
+        for _, _, data in accepted:
+            if self.unusable_passwords or not data["password"]:
+                data["hash"] = make_password(None)
+                data["convite"] = True
+            else:
+                pending.append(data)
+
+        if not pending:
+            return
+
+        passwords = [data["password"] for data in pending]
+        if executor is None:
+            hashes = map(_hash_password, passwords)
+        else:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = executor.map(_hash_password, passwords, chunksize=chunksize)
+
+        for data, password_hash in zip(pending, hashes):
+            data["hash"] = password_hash
+
+    def _build_user(self, data):
+        return User(
+            username=data["username"],
+            email=data["email"],
+            first_name=data["first_name"][:150],
+            last_name=data["last_name"][:150],
+            password=data["hash"],
+        )
+
+    def _build_profile(self, user, data):
+        return Profile(
+            user=user,
+            cpf=data["cpf"],
+            data_nascimento=data["data_nascimento"],
+            telefone=data["telefone"],
+            endereco=data["endereco"],
+            bairro=data["bairro"],
+            cep=data["cep"],
+        )
+
+    def _bulk_create(self, accepted):
+        users = User.objects.bulk_create([self._build_user(d) for _, _, d in accepted])
+
+        if any(user.pk is None for user in users):
+            ids = dict(
+                User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list("username", "id")
+            )
+            for user in users:
+                user.pk = ids[user.username]
+
+        Profile.objects.bulk_create(
+            [
+                self._build_profile(user, data)
+                for user, (_, _, data) in zip(users, accepted)
+            ]
+        )
+        # Nem os sinais que criam o resumo de atividade
+        UserActivity.objects.bulk_create(
+            [UserActivity(user=user) for user in users], ignore_conflicts=True
+        )
+        return [(user, data) for user, (_, _, data) in zip(users, accepted)]
+
+    def _create_one_by_one(self, accepted):
+        """
+        Grava registro a registro quando o lote conflita com cadastros
+        feitos durante a importação
+        """
+        created = []
+        for line_num, record, data in accepted:
+            try:
+                with transaction.atomic():
+                    user = self._build_user(data)
+                    user.save()
+                    self._build_profile(user, data).save()
+            except IntegrityError as e:
+                self._reject(line_num, record, {"registro": f"Conflito ao gravar: {e}"})
+                continue
+            created.append((user, data))
+        return created
+
+    def _write_invites(self, created):
+        for user, data in created:
+            if not data.get("convite"):
+                continue
+            self.invites.writerow(
+                [
+                    user.username,
+                    user.email,
+                    urlsafe_base64_encode(force_bytes(user.pk)),
+                    default_token_generator.make_token(user),
+                ]
+            )
+            self.totals["convites"] += 1
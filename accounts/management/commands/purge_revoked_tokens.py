@@ -0,0 +1,45 @@
+"""
+Remove os refresh tokens revogados que já expiraram
+
+Pode ser agendado (cron) ou rodar como processo de fundo com ``--loop``.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Remove em lotes os tokens revogados já expirados"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Linhas removidas por lote (padrão: 5000)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Executa continuamente, a cada --interval segundos",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=3600,
+            help="Intervalo entre execuções com --loop (padrão: 3600)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total = purge_expired(batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"{total} tokens revogados expirados removidos")
+            )
+
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
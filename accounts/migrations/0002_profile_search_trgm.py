@@ -0,0 +1,53 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ("accounts_user_first_name_trgm", "auth_user", "lower(first_name)"),
+    ("accounts_user_last_name_trgm", "auth_user", "lower(last_name)"),
+    ("accounts_user_username_trgm", "auth_user", "lower(username)"),
+    ("accounts_profile_cpf_trgm", "accounts_profile", "cpf"),
+    ("accounts_profile_bairro_trgm", "accounts_profile", "lower(bairro)"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, expression in TRIGRAM_INDEXES:
+        # Um CONCURRENTLY interrompido deixa o índice inválido; recria-o
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) "
+                "AND NOT indisvalid",
+                [name],
+            )
+            invalid = cursor.fetchone() is not None
+        if invalid:
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+            f"USING gin (({expression}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação; assim os índices
+    # são criados sem bloquear gravações em auth_user e accounts_profile
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
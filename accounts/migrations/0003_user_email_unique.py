@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_profile_search_trgm"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE UNIQUE INDEX accounts_user_email_uniq "
+                "ON auth_user (email) WHERE email <> ''"
+            ),
+            reverse_sql="DROP INDEX accounts_user_email_uniq",
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_revokedtoken"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserActivity",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="activity",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+                (
+                    "total_alertas",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Total de Alertas"
+                    ),
+                ),
+                (
+                    "total_comentarios",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Total de Comentários"
+                    ),
+                ),
+                (
+                    "ultimo_alerta",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="Último Alerta",
+                    ),
+                ),
+                (
+                    "ultimo_comentario",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="Último Comentário",
+                    ),
+                ),
+                (
+                    "dormente",
+                    models.BooleanField(
+                        db_index=True,
+                        default=False,
+                        help_text="Sem alertas, comentários ou login no período configurado",
+                        verbose_name="Dormente",
+                    ),
+                ),
+                (
+                    "data_atualizacao",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Última Atualização"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Atividade do Usuário",
+                "verbose_name_plural": "Atividade dos Usuários",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_useractivity"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="profile",
+            options={
+                "ordering": ["-data_cadastro"],
+                "permissions": [
+                    ("validate_batch", "Pode validar registros de cadastro em lote")
+                ],
+                "verbose_name": "Perfil do Contribuinte",
+                "verbose_name_plural": "Perfis dos Contribuintes",
+            },
+        ),
+    ]
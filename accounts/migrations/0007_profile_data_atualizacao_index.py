@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+INDEX = models.Index(fields=["data_atualizacao"], name="accounts_profile_atualiz_idx")
+
+
+def add_index(apps, schema_editor):
+    Profile = apps.get_model("accounts", "Profile")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(Profile, INDEX, concurrently=True)
+    else:
+        schema_editor.add_index(Profile, INDEX)
+
+
+def remove_index(apps, schema_editor):
+    Profile = apps.get_model("accounts", "Profile")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(Profile, INDEX, concurrently=True)
+    else:
+        schema_editor.remove_index(Profile, INDEX)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0006_profile_validate_batch_permission"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name="profile", index=INDEX)],
+            database_operations=[migrations.RunPython(add_index, remove_index)],
+        ),
+    ]
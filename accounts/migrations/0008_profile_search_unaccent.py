@@ -0,0 +1,94 @@
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+# unaccent() não é IMMUTABLE (depende do dicionário configurado), então não
+# pode ser usado em índices; o wrapper fixa o dicionário
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS
+$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+"""
+
+UNACCENT_INDEXES = [
+    (
+        "accounts_user_first_name_unaccent_trgm",
+        "auth_user",
+        "immutable_unaccent(lower(first_name))",
+    ),
+    (
+        "accounts_user_last_name_unaccent_trgm",
+        "auth_user",
+        "immutable_unaccent(lower(last_name))",
+    ),
+    (
+        "accounts_user_username_unaccent_trgm",
+        "auth_user",
+        "immutable_unaccent(lower(username))",
+    ),
+    (
+        "accounts_profile_bairro_unaccent_trgm",
+        "accounts_profile",
+        "immutable_unaccent(lower(bairro))",
+    ),
+]
+
+# Índices da 0002 substituídos pelos de cima (o de CPF continua)
+LOWER_INDEXES = [
+    ("accounts_user_first_name_trgm", "auth_user", "lower(first_name)"),
+    ("accounts_user_last_name_trgm", "auth_user", "lower(last_name)"),
+    ("accounts_user_username_trgm", "auth_user", "lower(username)"),
+    ("accounts_profile_bairro_trgm", "accounts_profile", "lower(bairro)"),
+]
+
+
+def _create_indexes(schema_editor, indexes):
+    for name, table, expression in indexes:
+        # Um CONCURRENTLY interrompido deixa o índice inválido; recria-o
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) "
+                "AND NOT indisvalid",
+                [name],
+            )
+            invalid = cursor.fetchone() is not None
+        if invalid:
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+            f"USING gin (({expression}) gin_trgm_ops)"
+        )
+
+
+def _drop_indexes(schema_editor, indexes):
+    for name, _, _ in indexes:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_unaccent_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_FUNCTION)
+    _create_indexes(schema_editor, UNACCENT_INDEXES)
+    _drop_indexes(schema_editor, LOWER_INDEXES)
+
+
+def drop_unaccent_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    _create_indexes(schema_editor, LOWER_INDEXES)
+    _drop_indexes(schema_editor, UNACCENT_INDEXES)
+    schema_editor.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0007_profile_data_atualizacao_index"),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunPython(create_unaccent_indexes, drop_unaccent_indexes),
+    ]
@@ -100,6 +100,15 @@ class Profile(models.Model):
         verbose_name = "Perfil do Contribuinte"
         verbose_name_plural = "Perfis dos Contribuintes"
         ordering = ["-data_cadastro"]
+        indexes = [
+            # Carga incremental do filtro de CPFs (accounts.availability)
+            models.Index(
+                fields=["data_atualizacao"], name="accounts_profile_atualiz_idx"
+            ),
+        ]
+        permissions = [
+            ("validate_batch", "Pode validar registros de cadastro em lote"),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.cpf}"
@@ -152,3 +161,75 @@ class Profile(models.Model):
                 < (self.data_nascimento.month, self.data_nascimento.day)
             )
         )
+
+
+class UserActivity(models.Model):
+    """
+    Resumo da atividade do usuário (alertas e comentários ativos)
+
+    Criado zerado junto com o usuário (``accounts.signals``) e mantido pelos
+    sinais de ``alerts.signals`` a cada gravação de alerta ou comentário;
+    ``mark_dormant_profiles --rebuild`` (app alerts) o recalcula por completo.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Usuário",
+        related_name="activity",
+    )
+
+    total_alertas = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Total de Alertas"
+    )
+
+    total_comentarios = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Total de Comentários"
+    )
+
+    ultimo_alerta = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Último Alerta"
+    )
+
+    ultimo_comentario = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Último Comentário"
+    )
+
+    dormente = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name="Dormente",
+        help_text="Sem alertas, comentários ou login no período configurado",
+    )
+
+    data_atualizacao = models.DateTimeField(
+        auto_now=True, verbose_name="Última Atualização"
+    )
+
+    class Meta:
+        verbose_name = "Atividade do Usuário"
+        verbose_name_plural = "Atividade dos Usuários"
+
+    def __str__(self):
+        return f"{self.user.username}: {self.total_alertas} alertas, {self.total_comentarios} comentários"
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh token revogado (rotacionado ou encerrado)
+
+    Guarda apenas o jti e a expiração do token; linhas expiradas são
+    removidas pelo comando ``purge_revoked_tokens``.
+    """
+
+    jti = models.CharField(max_length=64, primary_key=True, verbose_name="JTI")
+
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Expira em")
+
+    class Meta:
+        verbose_name = "Token Revogado"
+        verbose_name_plural = "Tokens Revogados"
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,103 @@
+"""
+Armazenamento compacto de refresh tokens revogados
+
+Substitui as tabelas do ``token_blacklist`` do simplejwt (que guardam todos
+os tokens emitidos e revogados para sempre) por uma única tabela com o jti
+e a expiração de cada token revogado. Tokens expirados já são recusados pela
+validação do JWT, então suas linhas podem ser apagadas a qualquer momento
+(``purge_revoked_tokens``).
+
+Cada processo mantém também um conjunto em memória dos jtis que revogou,
+com descarte por expiração, para recusar reusos sem ir ao banco.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.db import IntegrityError, transaction
+
+from .models import RevokedToken
+
+
+class LocalRevocationSet:
+    """
+    Conjunto limitado de jtis revogados com descarte por expiração
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._evict(time.time())
+            if len(self._expiry) >= self.max_entries:
+                _, oldest = heapq.heappop(self._heap)
+                self._expiry.pop(oldest, None)
+            self._expiry[jti] = exp
+            heapq.heappush(self._heap, (exp, jti))
+
+    def __contains__(self, jti):
+        exp = self._expiry.get(jti)
+        return exp is not None and exp > time.time()
+
+    def _evict(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            _, jti = heapq.heappop(self._heap)
+            self._expiry.pop(jti, None)
+
+    def clear(self):
+        with self._lock:
+            self._expiry.clear()
+            self._heap.clear()
+
+    def __len__(self):
+        return len(self._expiry)
+
+
+_local = LocalRevocationSet()
+
+
+def revoke(jti, exp):
+    """
+    Revoga o token; retorna False se ele já estava revogado
+
+    A inserção pela chave primária torna a revogação atômica: de duas
+    requisições concorrentes com o mesmo token, só uma consegue revogá-lo.
+    """
+    if jti in _local:
+        return False
+
+    expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        _local.add(jti, exp)
+        return False
+
+    _local.add(jti, exp)
+    return True
+
+
+def purge_expired(batch_size=5000, now=None):
+    """
+    Remove em lotes os tokens revogados já expirados e retorna o total
+    """
+    now = now or datetime.now(tz=timezone.utc)
+    total = 0
+
+    while True:
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__lte=now).values_list(
+                "jti", flat=True
+            )[:batch_size]
+        )
+        if not jtis:
+            return total
+        deleted, _ = RevokedToken.objects.filter(jti__in=jtis).delete()
+        total += deleted
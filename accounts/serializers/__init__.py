@@ -2,10 +2,11 @@
 Serializers modulares para o app accounts
 """
 
-from .auth import CustomTokenObtainPairSerializer
+from .auth import CustomTokenObtainPairSerializer, RotatingTokenRefreshSerializer
 from .user import UserSerializer, UserCreateSerializer, UserUpdateSerializer
 from .profile import (
     ProfileSerializer,
+    ProfileCreateSerializer,
     ProfileUpdateSerializer,
     ProfileListSerializer,
     ProfileStatsSerializer,
@@ -13,10 +14,12 @@ from .profile import (
 
 __all__ = [
     "CustomTokenObtainPairSerializer",
+    "RotatingTokenRefreshSerializer",
     "UserSerializer",
     "UserCreateSerializer",
     "UserUpdateSerializer",
     "ProfileSerializer",
+    "ProfileCreateSerializer",
     "ProfileUpdateSerializer",
     "ProfileListSerializer",
     "ProfileStatsSerializer",
@@ -2,15 +2,51 @@
 Serializers para autenticação JWT
 """
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 from ..models import Profile
+from ..revocation import revoke
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Serializer customizado para JWT que inclui informações do perfil
+
+    Com ``SIMPLE_JWT["UPDATE_LAST_LOGIN"]`` desligado, o ``last_login`` é
+    atualizado aqui no máximo uma vez a cada ``LAST_LOGIN_UPDATE_INTERVAL``
+    segundos, com um UPDATE direto (sem sinais nem regravação do perfil).
     """
 
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        self._touch_last_login(self.user)
+        return data
+
+    @staticmethod
+    def _touch_last_login(user):
+        interval = getattr(settings, "LAST_LOGIN_UPDATE_INTERVAL", 15 * 60)
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=interval)
+
+        if user.last_login and user.last_login > cutoff:
+            return
+
+        User.objects.filter(
+            Q(last_login__isnull=True) | Q(last_login__lte=cutoff), pk=user.pk
+        ).update(last_login=now)
+        user.last_login = now
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
@@ -29,3 +65,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             token["has_profile"] = False
 
         return token
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh com rotação de uso único usando o armazenamento de revogação
+
+    Ao rotacionar, o refresh token usado é revogado antes de emitir o novo;
+    um token já revogado (reuso) é recusado.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            if not revoke(refresh[api_settings.JTI_CLAIM], refresh["exp"]):
+                raise InvalidToken(_("Token is blacklisted"))
+
+        return super().validate(attrs)
@@ -2,8 +2,51 @@
 Serializers para modelo Profile
 """
 
+import re
+
+from django.core.exceptions import ValidationError
 from rest_framework import serializers
+from ..cep import resolve_cep_neighborhood
 from ..models import Profile
+from ..validators import validate_cpf
+
+
+def _validate_cep_neighborhood(serializer, attrs):
+    """
+    Confere CEP e bairro pelo índice de faixas de CEP e preenche o bairro
+    vazio a partir do CEP
+
+    Só roda quando CEP ou bairro fazem parte da alteração. Um bairro fora da
+    faixa do CEP não bloqueia o cadastro: o aviso fica em
+    ``serializer.context["avisos"]`` para a view incluir na resposta.
+    """
+    if "cep" not in attrs and "bairro" not in attrs:
+        return attrs
+
+    instance = serializer.instance
+    cep = attrs.get("cep", getattr(instance, "cep", ""))
+    bairro = attrs.get("bairro", getattr(instance, "bairro", ""))
+
+    try:
+        bairro_resolvido, aviso = resolve_cep_neighborhood(cep, bairro)
+    except ValidationError as e:
+        raise serializers.ValidationError({"cep": e.messages})
+
+    if aviso:
+        serializer.context.setdefault("avisos", {})["bairro"] = aviso
+
+    if bairro_resolvido != bairro:
+        attrs["bairro"] = bairro_resolvido
+
+    return attrs
+
+
+def serializer_warnings(serializer):
+    """
+    ``{"avisos": {...}}`` com os avisos da validação, ou vazio se não houver
+    """
+    avisos = serializer.context.get("avisos")
+    return {"avisos": avisos} if avisos else {}
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -56,6 +99,30 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         return cpf_clean
 
+    def validate(self, attrs):
+        """
+        Confere o CEP com o bairro
+        """
+        return _validate_cep_neighborhood(self, attrs)
+
+
+class ProfileCreateSerializer(ProfileSerializer):
+    """
+    Serializer de perfil usado no registro
+
+    Não consulta o banco para verificar o CPF: a unicidade é garantida pela
+    constraint única de ``Profile.cpf`` dentro da transação de registro.
+    """
+
+    class Meta(ProfileSerializer.Meta):
+        extra_kwargs = {"cpf": {"validators": [validate_cpf]}}
+
+    def validate_cpf(self, value):
+        """
+        Normaliza o CPF para apenas dígitos
+        """
+        return re.sub(r"[^0-9]", "", str(value))
+
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
     """
@@ -98,7 +165,7 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         if "cep" in attrs and attrs["cep"]:
             attrs["cep"] = re.sub(r"[^0-9]", "", attrs["cep"])
 
-        return attrs
+        return _validate_cep_neighborhood(self, attrs)
 
 
 class ProfileListSerializer(serializers.ModelSerializer):
@@ -113,6 +180,19 @@ class ProfileListSerializer(serializers.ModelSerializer):
         source="get_telefone_formatado", read_only=True
     )
     idade = serializers.IntegerField(source="get_idade", read_only=True)
+    total_alertas = serializers.IntegerField(
+        source="user.activity.total_alertas", read_only=True
+    )
+    total_comentarios = serializers.IntegerField(
+        source="user.activity.total_comentarios", read_only=True
+    )
+    ultimo_alerta = serializers.DateTimeField(
+        source="user.activity.ultimo_alerta", read_only=True
+    )
+    ultimo_comentario = serializers.DateTimeField(
+        source="user.activity.ultimo_comentario", read_only=True
+    )
+    dormente = serializers.BooleanField(source="user.activity.dormente", read_only=True)
 
     class Meta:
         model = Profile
@@ -126,6 +206,11 @@ class ProfileListSerializer(serializers.ModelSerializer):
             "ativo",
             "idade",
             "data_cadastro",
+            "total_alertas",
+            "total_comentarios",
+            "ultimo_alerta",
+            "ultimo_comentario",
+            "dormente",
         ]
 
 
@@ -4,7 +4,9 @@ Serializers para modelo User
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .profile import ProfileSerializer
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from .profile import ProfileSerializer, ProfileCreateSerializer
 from ..models import Profile
 
 
@@ -34,12 +36,31 @@ class UserSerializer(serializers.ModelSerializer):
 class UserCreateSerializer(serializers.ModelSerializer):
     """
     Serializer para criação de usuário com perfil
+
+    A unicidade de username, email e CPF não é verificada com consultas
+    prévias: usuário e perfil são gravados em uma única transação e as
+    violações das constraints únicas viram os mesmos erros de campo.
     """
 
-    profile = ProfileSerializer()
+    profile = ProfileCreateSerializer()
     password = serializers.CharField(write_only=True, min_length=8)
     password_confirm = serializers.CharField(write_only=True)
 
+    UNIQUE_ERRORS = [
+        (
+            ("auth_user_username", "auth_user.username"),
+            {"username": ["Este nome de usuário já está em uso."]},
+        ),
+        (
+            ("accounts_user_email_uniq", "auth_user.email"),
+            {"email": ["Este email já está em uso."]},
+        ),
+        (
+            ("accounts_profile_cpf", "accounts_profile.cpf"),
+            {"profile": {"cpf": ["Este CPF já está cadastrado."]}},
+        ),
+    ]
+
     class Meta:
         model = User
         fields = [
@@ -51,6 +72,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
             "password_confirm",
             "profile",
         ]
+        extra_kwargs = {"username": {"validators": [UnicodeUsernameValidator()]}}
 
     def validate(self, attrs):
         """
@@ -60,35 +82,32 @@ class UserCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("As senhas não coincidem.")
         return attrs
 
-    def validate_email(self, value):
-        """
-        Valida se o email é único
-        """
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Este email já está em uso.")
-        return value
-
-    def validate_username(self, value):
-        """
-        Valida se o username é único
-        """
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("Este nome de usuário já está em uso.")
-        return value
-
     def create(self, validated_data):
         """
-        Cria usuário e perfil
+        Cria usuário e perfil em uma única transação
         """
         profile_data = validated_data.pop("profile")
         validated_data.pop("password_confirm")
 
-        user = User.objects.create_user(**validated_data)
-
-        Profile.objects.create(user=user, **profile_data)
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(**validated_data)
+                Profile.objects.create(user=user, **profile_data)
+        except IntegrityError as e:
+            raise serializers.ValidationError(self._unique_error(e))
 
         return user
 
+    def _unique_error(self, error):
+        """
+        Converte a violação de constraint única no erro do campo correspondente
+        """
+        message = str(error)
+        for identifiers, detail in self.UNIQUE_ERRORS:
+            if any(identifier in message for identifier in identifiers):
+                return detail
+        raise error
+
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     """
@@ -99,6 +118,15 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         model = User
         fields = ["first_name", "last_name", "email"]
 
+    def update(self, instance, validated_data):
+        """
+        Grava só os campos alterados, sem regravar o resto da linha
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
     def validate_email(self, value):
         """
         Valida se o email é único (exceto para o próprio usuário)
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+from .authentication import bump_user_version
+from .availability import get_cpf_registry
+from .models import Profile, UserActivity
+
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -13,9 +17,78 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def create_user_activity(sender, instance, created, **kwargs):
+    """
+    Cria o resumo de atividade zerado do usuário novo
+
+    Sem ele, o usuário ficaria fora dos filtros de atividade e nunca seria
+    marcado como dormente até o primeiro alerta ou comentário.
+    """
+    if created and not kwargs.get("raw"):
+        UserActivity.objects.bulk_create(
+            [UserActivity(user=instance)], ignore_conflicts=True
+        )
+
+
+@receiver(post_save, sender=User)
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
     """
     Salva o perfil quando o usuário é salvo (se o perfil existir)
+
+    Só regrava o perfil quando ele foi carregado junto ao usuário (e pode ter
+    sido alterado). Usuários recém-criados e gravações com ``update_fields``
+    (que só tocam nos campos do usuário, como a senha ou ``last_login``) não
+    geram escrita no perfil.
     """
-    if hasattr(instance, "profile"):
+    if created or update_fields is not None:
+        return
+
+    if User.profile.related.is_cached(instance):
         instance.profile.save()
+
+
+@receiver(post_save, sender=Profile)
+def register_profile_cpf(sender, instance, created, **kwargs):
+    """
+    Inclui o CPF do perfil novo no filtro de disponibilidade do worker
+
+    Alterações de perfis existentes chegam ao filtro pela carga periódica.
+    """
+    if created:
+        get_cpf_registry().add(instance.cpf)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Invalida o usuário em cache da autenticação JWT
+    """
+    bump_user_version(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_profile_user(sender, instance, **kwargs):
+    """
+    Invalida o usuário em cache quando o perfil muda
+    """
+    bump_user_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_cached_user_permissions(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Invalida os usuários em cache quando grupos ou permissões mudam
+    """
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        bump_user_version(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            bump_user_version(user_id)
@@ -1 +1,738 @@
-# Create your tests here.
+"""
+Testes do app accounts
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, datetime
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from benchmarks.budget import QueryBudgetMixin
+from core.models import SlowQuery
+from core.throttling import SlidingWindowRateThrottle
+
+from . import backends
+from .authentication import user_cache_enabled
+from .autocomplete import NameIndex
+from .availability import BloomFilter, CPFRegistry, get_cpf_registry
+from .models import Profile, UserActivity
+from .revocation import _local as local_revocations
+
+
+class AccountsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Orçamento de consultas das views de accounts
+
+    As contagens incluem as 3 consultas de savepoint da transação desfeita
+    em volta de cada chamada.
+    """
+
+    namespace = "accounts"
+    # A view legada de perfil depende de um template que não existe no projeto;
+    # os detalhes de perfis de requisição e de consultas lentas dependem de
+    # capturas que a massa de dados não gera
+    exclude = (
+        "GET accounts:profile",
+        "GET accounts:api_request_profile_detail",
+        "GET accounts:api_slow_query_detail",
+    )
+    query_budgets = {
+        "GET accounts:profile_json": 6,
+        "POST accounts:api_register": 8,
+        "GET accounts:api_user_profile": 4,
+        "PATCH accounts:api_profile_update": 7,
+        "GET accounts:api_profiles_list": 8,
+        "GET accounts:api_profiles_list [busca]": 8,
+        "GET accounts:api_inactive_profiles": 8,
+        "GET accounts:api_user_stats": 11,
+        "GET accounts:api_request_profiles": 6,
+        "POST accounts:api_request_profiles": 6,
+        "GET accounts:api_slow_queries": 7,
+        "GET accounts:api_check_cpf": 4,
+        "GET accounts:api_validate_phone": 3,
+        "GET accounts:api_validate_cep": 3,
+        "POST accounts:api_validate_batch": 4,
+        "POST accounts:api_validate_batch [lote]": 7,
+        "GET accounts:api_cep_lookup": 3,
+        "GET accounts:api_neighborhoods": 3,
+        "GET accounts:api_neighborhoods_autocomplete": 3,
+        "GET accounts:check_cpf_legacy": 4,
+    }
+
+
+class BatchValidationTests(TestCase):
+    """
+    Validação em lote restrita e contada por registro
+    """
+
+    rates = {"validation": None, "cpf_check": None, "validation_batch": "5/min"}
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        self.url = reverse("accounts:api_validate_batch")
+        self.client = APIClient()
+        self.records = [{"username": f"novo{i}"} for i in range(3)]
+
+    def post(self, user=None, data=None):
+        self.client.force_authenticate(user)
+        with mock.patch.object(SlidingWindowRateThrottle, "THROTTLE_RATES", self.rates):
+            return self.client.post(self.url, data or self.records, format="json")
+
+    def test_list_requires_staff_or_partner_permission(self):
+        citizen = User.objects.create(username="cidadao")
+        partner = User.objects.create(username="parceiro")
+        partner.user_permissions.add(Permission.objects.get(codename="validate_batch"))
+
+        self.assertEqual(self.post().status_code, 401)
+        self.assertEqual(self.post(citizen).status_code, 403)
+        self.assertEqual(self.post(User.objects.get(pk=partner.pk)).status_code, 200)
+        # Um objeto só continua aberto a todos
+        self.assertEqual(self.post(citizen, {"username": "novo"}).status_code, 200)
+
+    def test_each_record_counts_against_the_rate(self):
+        staff = User.objects.create(username="equipe", is_staff=True)
+
+        response = self.post(staff)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 3)
+
+        response = self.post(staff)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    def test_cpf_rate_only_counts_requests_with_a_cpf(self):
+        rates = {"validation": None, "cpf_check": "1/min", "validation_batch": None}
+
+        with mock.patch.object(SlidingWindowRateThrottle, "THROTTLE_RATES", rates):
+            for _ in range(3):
+                response = self.client.post(
+                    self.url, {"username": "novo"}, format="json"
+                )
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                self.client.get(reverse("accounts:api_check_cpf")).status_code, 400
+            )
+
+            data = {"cpf": "529.982.247-25"}
+            self.assertEqual(
+                self.client.post(self.url, data, format="json").status_code, 200
+            )
+            self.assertEqual(
+                self.client.post(self.url, data, format="json").status_code, 429
+            )
+
+
+class CEPNeighborhoodTests(TestCase):
+    """
+    Consulta de CEP, autocompletar de bairros e conferência CEP/bairro
+    """
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        self.client = APIClient()
+
+    def register(self, **profile):
+        data = {
+            "username": "cidadao",
+            "email": "cidadao@example.com",
+            "password": "senha-forte-123",
+            "password_confirm": "senha-forte-123",
+            "profile": {
+                "cpf": "52998224725",
+                "data_nascimento": "1990-05-10",
+                **profile,
+            },
+        }
+        return self.client.post(reverse("accounts:api_register"), data, format="json")
+
+    def test_lookup_suggests_neighborhoods_of_the_range(self):
+        url = reverse("accounts:api_cep_lookup")
+
+        response = self.client.get(url, {"cep": "88010-100"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["bairros"], ["Centro"])
+        self.assertEqual(response.data["bairro"], "Centro")
+
+        response = self.client.get(url, {"cep": "88040000"})
+        self.assertIn("Trindade", response.data["bairros"])
+        self.assertIsNone(response.data["bairro"])
+
+        self.assertEqual(self.client.get(url, {"cep": "01001000"}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"cep": "123"}).status_code, 400)
+
+    def test_autocomplete_tolerates_missing_accents_and_typos(self):
+        url = reverse("accounts:api_neighborhoods_autocomplete")
+
+        for query in ("corrego", "Corego Grande"):
+            response = self.client.get(url, {"q": query})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Córrego Grande", str(response.data["results"]))
+
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_neighborhood_outside_the_range_is_a_warning(self):
+        response = self.register(cep="88040000", bairro="Córrego Grande")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("Trindade", response.data["avisos"]["bairro"])
+        self.assertEqual(User.objects.get().profile.bairro, "Córrego Grande")
+
+    def test_matching_neighborhood_has_no_warning_and_empty_is_filled(self):
+        response = self.register(cep="88010100")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("avisos", response.data)
+        self.assertEqual(User.objects.get().profile.bairro, "Centro")
+
+    def test_cep_outside_florianopolis_is_rejected(self):
+        response = self.register(cep="01001000", bairro="Centro")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cep", response.data["errors"]["profile"])
+
+    def test_profile_update_keeps_neighborhood_with_warning(self):
+        self.assertEqual(self.register(cep="88010100").status_code, 201)
+        self.client.force_authenticate(User.objects.get())
+
+        response = self.client.patch(
+            reverse("accounts:api_profile_update"),
+            {"cep": "88040000", "bairro": "Bom Retiro"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("bairro", response.data["avisos"])
+        self.assertEqual(response.data["profile"]["bairro"], "Bom Retiro")
+
+
+class AutocompleteTests(TestCase):
+    """
+    Autocompletar de bairros: erros de digitação, acentos, limite e prefixos
+    """
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        self.url = reverse("accounts:api_neighborhoods_autocomplete")
+
+    def suggest(self, query, **params):
+        return self.client.get(self.url, {"q": query, **params})
+
+    def test_typo_is_matched_by_edit_distance(self):
+        response = self.suggest("Corego Grande")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"][0],
+            {
+                "nome": "Córrego Grande",
+                "tipo_correspondencia": "aproximada",
+                "distancia": 1,
+            },
+        )
+
+    def test_accents_and_case_are_folded(self):
+        for query in ("córrego grande", "CÓRREGO grande", "corrego GRANDE"):
+            results = self.suggest(query).data["results"]
+            self.assertEqual(results[0]["nome"], "Córrego Grande", query)
+            self.assertEqual(results[0]["tipo_correspondencia"], "nome", query)
+
+        results = self.suggest("GRANDE").data["results"]
+        self.assertIn("Córrego Grande", [result["nome"] for result in results])
+        self.assertEqual({r["tipo_correspondencia"] for r in results}, {"palavra"})
+
+    def test_limit_is_applied_and_clamped(self):
+        self.assertEqual(self.suggest("c", limit=3).data["total"], 3)
+        self.assertEqual(self.suggest("c", limit=0).data["total"], 1)
+        self.assertEqual(self.suggest("c", limit="tres").status_code, 400)
+
+        streets = NameIndex([f"Rua {number}" for number in range(50)])
+        with mock.patch("accounts.views.validation.get_index", return_value=streets):
+            self.assertEqual(self.suggest("rua", limit=100).data["total"], 20)
+            self.assertEqual(self.suggest("rua").data["total"], 10)
+
+    def test_empty_or_short_prefix(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.suggest("   ").status_code, 400)
+
+        results = self.suggest("c").data["results"]
+        self.assertTrue(results)
+        for result in results:
+            self.assertTrue(result["nome"].startswith("C"), result["nome"])
+            self.assertEqual(result["tipo_correspondencia"], "nome")
+
+        # Abaixo de três letras não há busca aproximada
+        response = self.suggest("zz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [])
+
+
+class CPFRegistryTests(TestCase):
+    """
+    O filtro de CPFs nunca descarta um CPF cadastrado
+    """
+
+    def setUp(self):
+        self.registry = CPFRegistry(min_capacity=100, refresh_seconds=0)
+
+    def create_profile(self, cpf, **kwargs):
+        user = User.objects.create(username=f"u{cpf}")
+        return Profile.objects.create(
+            user=user, cpf=cpf, data_nascimento="1990-01-01", **kwargs
+        )
+
+    def test_unbuilt_filter_defers_to_the_database(self):
+        with mock.patch.object(self.registry, "_rebuild_in_background") as build:
+            self.assertTrue(self.registry.might_contain("11111111111"))
+
+        build.assert_called_once()
+
+    def test_profiles_from_other_workers_and_changed_cpfs_are_loaded(self):
+        self.create_profile("11111111111")
+        self.registry.rebuild()
+        self.assertTrue(self.registry.might_contain("11111111111"))
+
+        # Gravados sem passar pelo registro deste processo
+        user = User.objects.create(username="outro_worker")
+        Profile.objects.bulk_create(
+            [Profile(user=user, cpf="22222222222", data_nascimento="1990-01-01")]
+        )
+        profile = Profile.objects.get(cpf="11111111111")
+        Profile.objects.filter(pk=profile.pk).update(cpf="33333333333")
+        profile.refresh_from_db()
+        profile.save()
+
+        self.assertTrue(self.registry.might_contain("22222222222"))
+        self.assertTrue(self.registry.might_contain("33333333333"))
+
+    def test_cpfs_added_before_the_filter_is_ready_are_kept(self):
+        self.registry.add("44444444444")
+        self.registry.rebuild()
+
+        self.assertTrue(self.registry.might_contain("44444444444"))
+
+    def test_reloading_a_cpf_does_not_count_it_again(self):
+        bloom = BloomFilter(100)
+        for _ in range(3):
+            bloom.add("55555555555")
+
+        self.assertEqual(bloom.count, 1)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """
+    Usuário em cache na autenticação JWT
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="jwt", password="senha-forte-123", first_name="Ana"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.url = reverse("accounts:api_user_profile")
+
+    def test_cache_requires_a_shared_backend(self):
+        self.assertFalse(user_cache_enabled())
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    @mock.patch("accounts.authentication.user_cache_enabled", return_value=True)
+    def test_update_does_not_write_back_the_cached_user(self, enabled):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        # Alteração que ainda não invalidou o usuário em cache
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, last_name="Souza")
+
+        response = self.client.patch(self.url, {"first_name": "Bia"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.first_name, "Bia")
+        self.assertEqual(user.last_name, "Souza")
+        self.assertTrue(user.is_staff)
+
+
+class ImportCitizensTests(TestCase):
+    """
+    Importação em massa com as regras do cadastro pela API
+    """
+
+    def import_rows(self, rows):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "cidadaos.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+        call_command("import_citizens", path, workers=1, stdout=io.StringIO())
+        with open(f"{path}.rejects.ndjson", encoding="utf-8") as f:
+            return {
+                reject["registro"]["cpf"]: reject["erros"]
+                for reject in map(json.loads, f)
+            }
+
+    def test_password_and_cep_rules_match_registration(self):
+        base = {"data_nascimento": "1990-05-10", "password": "senha-forte-123"}
+        rejects = self.import_rows(
+            [
+                {**base, "cpf": "52998224725", "cep": "88010100"},
+                {**base, "cpf": "11144477735", "password": "12345678"},
+                {**base, "cpf": "39053344705", "cep": "01001000"},
+            ]
+        )
+
+        self.assertEqual(set(rejects), {"11144477735", "39053344705"})
+        self.assertIn("password", rejects["11144477735"])
+        self.assertIn("cep", rejects["39053344705"])
+        self.assertEqual(Profile.objects.get().bairro, "Centro")
+
+    def test_imported_users_get_activity_and_enter_the_cpf_filter(self):
+        registry = get_cpf_registry()
+        registry.rebuild()
+
+        self.import_rows([{"cpf": "52998224725", "data_nascimento": "1990-05-10"}])
+
+        user = User.objects.get(username="52998224725")
+        self.assertTrue(UserActivity.objects.filter(user=user).exists())
+        self.assertTrue(registry.might_contain("52998224725"))
+
+
+class RegistrationUniquenessTests(TestCase):
+    """
+    Violações das constraints únicas no cadastro viram erros de campo
+    """
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        self.client = APIClient()
+        response = self.register()
+        self.assertEqual(response.status_code, 201)
+
+    def register(self, **overrides):
+        data = {
+            "username": "cidadao",
+            "email": "cidadao@example.com",
+            "password": "senha-forte-123",
+            "password_confirm": "senha-forte-123",
+            "profile": {"cpf": "52998224725", "data_nascimento": "1990-05-10"},
+        }
+        data.update(overrides)
+        return self.client.post(reverse("accounts:api_register"), data, format="json")
+
+    def test_duplicate_username(self):
+        response = self.register(email="outro@example.com")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", response.data["errors"])
+
+    def test_duplicate_email(self):
+        response = self.register(
+            username="outro",
+            profile={"cpf": "11144477735", "data_nascimento": "1990-05-10"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.data["errors"])
+
+    def test_duplicate_cpf(self):
+        response = self.register(username="outro", email="outro@example.com")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cpf", response.data["errors"]["profile"])
+        self.assertEqual(User.objects.count(), 1)
+
+
+class RefreshTokenRotationTests(TestCase):
+    """
+    Refresh tokens são de uso único
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="rotacao", password="senha-forte-123"
+        )
+        self.client = APIClient()
+        self.url = reverse("token_refresh")
+
+    def refresh(self, token):
+        return self.client.post(self.url, {"refresh": token}, format="json")
+
+    def test_reused_refresh_token_is_rejected(self):
+        token = str(RefreshToken.for_user(self.user))
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("refresh", response.data)
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_revocation_is_shared_through_the_database(self):
+        token = str(RefreshToken.for_user(self.user))
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+        # Outro worker não tem o jti no conjunto local
+        local_revocations.clear()
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+
+class ProfileDocumentTests(TestCase):
+    """
+    ETag e respostas 304 em /accounts/me/
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="etag", password="senha-forte-123", first_name="Ana"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.url = reverse("accounts:api_user_profile")
+
+    def test_not_modified_until_the_profile_changes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.patch(self.url, {"first_name": "Bia"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["first_name"], "Bia")
+
+    def test_local_cache_does_not_serve_a_stale_document(self):
+        etag = self.client.get(self.url)["ETag"]
+        # Alteração feita por outro worker: a versão deste não foi trocada
+        User.objects.filter(pk=self.user.pk).update(first_name="Carla")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["first_name"], "Carla")
+
+
+@override_settings(
+    PASSWORD_CHECK_WORKERS=1, PASSWORD_CHECK_MAX_PENDING=0, PASSWORD_CHECK_TIMEOUT=0.05
+)
+class BoundedPasswordBackendTests(TestCase):
+    """
+    Verificação de senhas no pool limitado
+    """
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        # Pool novo com as configurações do teste
+        for name in ("_executor", "_slots"):
+            patcher = mock.patch.object(backends, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: backends._executor and backends._executor.shutdown())
+        self.user = User.objects.create_user(
+            username="senha", password="senha-forte-123"
+        )
+
+    def test_checks_beyond_the_pool_are_rejected(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_check():
+            started.set()
+            return release.wait(5)
+
+        thread = threading.Thread(
+            target=backends.run_password_check, args=(slow_check,)
+        )
+        thread.start()
+        started.wait(5)
+        with self.assertRaises(backends.PasswordCheckUnavailable):
+            backends.run_password_check(bool, 1)
+        release.set()
+        thread.join()
+
+        self.assertTrue(backends.run_password_check(bool, 1))
+
+    def test_full_pool_returns_503_to_api_login_only(self):
+        _, slots = backends._get_pool()
+        slots.acquire()
+        self.addCleanup(slots.release)
+        credentials = {"username": "senha", "password": "senha-forte-123"}
+
+        response = APIClient().post(
+            reverse("token_obtain_pair"), credentials, format="json"
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIsNone(authenticate(**credentials))
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+    )
+    def test_outdated_hash_is_upgraded_without_rewriting_the_profile(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password("senha-forte-123", hasher="md5")
+        )
+        Profile.objects.create(
+            user=self.user, cpf="52998224725", data_nascimento="1990-01-01"
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate(username="senha", password="senha-forte-123")
+
+        self.assertEqual(user, self.user)
+        self.assertTrue(
+            User.objects.get(pk=self.user.pk).password.startswith("pbkdf2_sha256$")
+        )
+        self.assertFalse(
+            any(
+                'UPDATE "accounts_profile"' in q["sql"]
+                for q in queries.captured_queries
+            )
+        )
+
+
+class SlowQueryAPITests(TestCase):
+    """
+    API administrativa de consultas lentas
+    """
+
+    def setUp(self):
+        admin = User.objects.create_user(username="admin_lentas", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        self.url = reverse("accounts:api_slow_queries")
+        for fingerprint, duracoes in (("a" * 32, [300, 300]), ("b" * 32, [900])):
+            for duracao in duracoes:
+                SlowQuery.objects.create(
+                    fingerprint=fingerprint,
+                    sql=f"SELECT {fingerprint}",
+                    duracao_ms=duracao,
+                    rota="accounts:api_users_list",
+                )
+
+    def test_groups_by_fingerprint_with_ordering_and_limit(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r["fingerprint"][0], r["execucoes"]) for r in response.data["results"]],
+            [("b", 1), ("a", 2)],
+        )
+
+        response = self.client.get(self.url, {"ordering": "execucoes", "limit": "1"})
+        self.assertEqual([r["fingerprint"][0] for r in response.data["results"]], ["a"])
+
+    def test_invalid_parameters_return_400(self):
+        for params in (
+            {"ordering": "sql"},
+            {"limit": "dez"},
+            {"desde": "ontem"},
+            {"desde": "2025-02-30"},
+        ):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_detail_of_an_unknown_fingerprint_returns_404(self):
+        url = reverse("accounts:api_slow_query_detail", args=["a" * 32])
+        self.assertEqual(self.client.get(url).data["count"], 2)
+
+        url = reverse("accounts:api_slow_query_detail", args=["c" * 32])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class UserStatsTests(TestCase):
+    """
+    Estatísticas de usuários calculadas no banco
+    """
+
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username="admin_stats", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        self.url = reverse("accounts:api_user_stats")
+
+    def create_profile(self, number, years, registered=None, **kwargs):
+        today = date.today()
+        born = today.replace(year=today.year - years, day=1)
+        user = User.objects.create(username=f"stats_{number}")
+        profile = Profile.objects.create(
+            user=user, cpf=f"{number:011d}", data_nascimento=born, **kwargs
+        )
+        if registered:
+            Profile.objects.filter(pk=profile.pk).update(
+                data_cadastro=timezone.make_aware(datetime(*registered, 15, 12))
+            )
+        return profile
+
+    def test_age_buckets_count_active_profiles(self):
+        self.create_profile(1, 20)
+        self.create_profile(2, 30)
+        self.create_profile(3, 31)
+        self.create_profile(4, 70)
+        self.create_profile(5, 40, ativo=False)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["age_distribution"],
+            {"16-25": 1, "26-35": 2, "36-45": 0, "46-55": 0, "56-65": 0, "65+": 1},
+        )
+        self.assertEqual(
+            (response.data["total_profiles"], response.data["active_profiles"]), (5, 4)
+        )
+
+    def test_monthly_registrations_in_the_period(self):
+        self.create_profile(1, 30, registered=(2025, 1))
+        self.create_profile(2, 30, registered=(2025, 3))
+        self.create_profile(3, 30, registered=(2025, 3))
+        self.create_profile(4, 30, registered=(2025, 5))
+
+        response = self.client.get(
+            self.url, {"data_inicio": "2025-01-01", "data_fim": "2025-03-31"}
+        )
+
+        self.assertEqual(
+            response.data["monthly_registrations"],
+            [{"month": "2025-01", "count": 1}, {"month": "2025-03", "count": 2}],
+        )
+
+    def test_invalid_dates_return_400(self):
+        for params in ({"data_inicio": "01/01/2025"}, {"data_fim": "2025-13-01"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
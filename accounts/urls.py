@@ -7,11 +7,18 @@ from .views import (
     UserStatsAPIView,
     check_cpf_availability,
     list_neighborhoods,
+    autocomplete_neighborhoods,
     profile_view,
     check_cpf_legacy,
 )
-from .views.validation import validate_phone, validate_cep
-from .views.admin import InactiveProfilesAPIView
+from .views.validation import validate_phone, validate_cep, validate_batch, lookup_cep
+from .views.admin import (
+    InactiveProfilesAPIView,
+    RequestProfileDetailAPIView,
+    RequestProfileListAPIView,
+    SlowQueryDetailAPIView,
+    SlowQueryListAPIView,
+)
 from .views.legacy import user_profile_json
 
 app_name = "accounts"
@@ -29,9 +36,36 @@ urlpatterns = [
         name="api_inactive_profiles",
     ),
     path("stats/", UserStatsAPIView.as_view(), name="api_user_stats"),
+    path(
+        "profiling/",
+        RequestProfileListAPIView.as_view(),
+        name="api_request_profiles",
+    ),
+    path(
+        "profiling/<str:profile_id>/",
+        RequestProfileDetailAPIView.as_view(),
+        name="api_request_profile_detail",
+    ),
+    path(
+        "slow-queries/",
+        SlowQueryListAPIView.as_view(),
+        name="api_slow_queries",
+    ),
+    path(
+        "slow-queries/<str:fingerprint>/",
+        SlowQueryDetailAPIView.as_view(),
+        name="api_slow_query_detail",
+    ),
     path("validate/cpf/", check_cpf_availability, name="api_check_cpf"),
     path("validate/phone/", validate_phone, name="api_validate_phone"),
     path("validate/cep/", validate_cep, name="api_validate_cep"),
+    path("validate/batch/", validate_batch, name="api_validate_batch"),
+    path("cep/lookup/", lookup_cep, name="api_cep_lookup"),
     path("neighborhoods/", list_neighborhoods, name="api_neighborhoods"),
+    path(
+        "neighborhoods/autocomplete/",
+        autocomplete_neighborhoods,
+        name="api_neighborhoods_autocomplete",
+    ),
     path("check-cpf/", check_cpf_legacy, name="check_cpf_legacy"),
 ]
@@ -3,6 +3,7 @@ Validators modulares para o app accounts
 """
 
 import re
+import unicodedata
 from datetime import date
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
@@ -120,6 +121,71 @@ def validate_birth_date(birth_date):
         raise ValidationError("Data de nascimento inválida.")
 
 
+# Bairros de Florianópolis aceitos pelo sistema
+FLORIANOPOLIS_NEIGHBORHOODS = [
+    "Centro",
+    "Trindade",
+    "Pantanal",
+    "Córrego Grande",
+    "Santa Mônica",
+    "Carvoeira",
+    "Serrinha",
+    "João Paulo",
+    "Monte Verde",
+    "Saco Grande",
+    "Itacorubi",
+    "Agronômica",
+    "Capoeiras",
+    "Coqueiros",
+    "Estreito",
+    "Balneário",
+    "Coloninha",
+    "Abraão",
+    "Bom Abrigo",
+    "Canto",
+    "Canasvieiras",
+    "Ingleses",
+    "Santinho",
+    "Cachoeira do Bom Jesus",
+    "Ponta das Canas",
+    "Lagoinha",
+    "Daniela",
+    "Jurerê",
+    "Jurerê Internacional",
+    "Praia Brava",
+    "Barra da Lagoa",
+    "Galheta",
+    "Mole",
+    "Joaquina",
+    "Campeche",
+    "Armação",
+    "Matadeiro",
+    "Lagoinha do Leste",
+    "Pântano do Sul",
+    "Costa de Dentro",
+    "Ribeirão da Ilha",
+    "Tapera",
+    "Caieira da Barra do Sul",
+    "Alto Ribeirão",
+    "Sede Fragas",
+    "Costeira do Pirajubaé",
+    "Saco dos Limões",
+    "José Mendes",
+    "Prainha",
+    "Bom Retiro",
+    "Jardim Atlântico",
+    "Vargem do Bom Jesus",
+    "Vargem Grande",
+    "Vargem Pequena",
+    "Santo Antônio de Lisboa",
+    "Ratones",
+    "Cacupé",
+    "Sambaqui",
+    "Barra do Sambaqui",
+    "Monte Cristo",
+]
+
+
 def validate_florianopolis_neighborhood(neighborhood):
     """
     Valida se o bairro pertence a Florianópolis
@@ -133,69 +199,6 @@ def validate_florianopolis_neighborhood(neighborhood):
     if not neighborhood:
         return
 
-    FLORIANOPOLIS_NEIGHBORHOODS = [
-        "Centro",
-        "Trindade",
-        "Pantanal",
-        "Córrego Grande",
-        "Santa Mônica",
-        "Carvoeira",
-        "Serrinha",
-        "João Paulo",
-        "Monte Verde",
-        "Saco Grande",
-        "Itacorubi",
-        "Agronômica",
-        "Capoeiras",
-        "Coqueiros",
-        "Estreito",
-        "Balneário",
-        "Coloninha",
-        "Abraão",
-        "Bom Abrigo",
-        "Canto",
-        "Canasvieiras",
-        "Ingleses",
-        "Santinho",
-        "Cachoeira do Bom Jesus",
-        "Ponta das Canas",
-        "Lagoinha",
-        "Daniela",
-        "Jurerê",
-        "Jurerê Internacional",
-        "Praia Brava",
-        "Barra da Lagoa",
-        "Galheta",
-        "Mole",
-        "Joaquina",
-        "Campeche",
-        "Armação",
-        "Matadeiro",
-        "Lagoinha do Leste",
-        "Pântano do Sul",
-        "Costa de Dentro",
-        "Ribeirão da Ilha",
-        "Tapera",
-        "Caieira da Barra do Sul",
-        "Alto Ribeirão",
-        "Sede Fragas",
-        "Costeira do Pirajubaé",
-        "Saco dos Limões",
-        "José Mendes",
-        "Prainha",
-        "Bom Retiro",
-        "Jardim Atlântico",
-        "Vargem do Bom Jesus",
-        "Vargem Grande",
-        "Vargem Pequena",
-        "Santo Antônio de Lisboa",
-        "Ratones",
-        "Cacupé",
-        "Sambaqui",
-        "Barra do Sambaqui",
-        "Monte Cristo",
-    ]
-
     neighborhood_normalized = neighborhood.strip().title()
 
     found = False
@@ -208,12 +211,33 @@ def validate_florianopolis_neighborhood(neighborhood):
             break
 
     if not found:
+        from .autocomplete import get_index
+
+        suggestions = [
+            item["nome"] for item in get_index("bairro").suggest(neighborhood, 3)
+        ]
+        hint = f" Você quis dizer: {', '.join(suggestions)}?" if suggestions else ""
         raise ValidationError(
             f'Bairro "{neighborhood}" não encontrado em Florianópolis. '
-            "Verifique a grafia ou entre em contato com o suporte."
+            "Verifique a grafia ou entre em contato com o suporte." + hint
         )
 
 
+def fold_name(name):
+    """
+    Normaliza um nome para comparação (sem acentos, minúsculo, espaços simples)
+
+    Args:
+        name (str): Nome de bairro ou logradouro
+
+    Returns:
+        str: Nome normalizado
+    """
+    decomposed = unicodedata.normalize("NFKD", str(name or ""))
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(ascii_name.lower().split())
+
+
 phone_validator = RegexValidator(
     regex=r"^\(\d{2}\)\s\d{4,5}-\d{4}$",
     message="Telefone deve estar no formato: (48) 99999-9999",
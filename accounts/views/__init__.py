@@ -4,12 +4,23 @@ Views modulares para o app accounts
 
 from .auth import UserCreateAPIView
 from .profile import UserProfileAPIView, ProfileUpdateAPIView
-from .admin import ProfileListAPIView, UserStatsAPIView, InactiveProfilesAPIView
+from .admin import (
+    ProfileListAPIView,
+    UserStatsAPIView,
+    InactiveProfilesAPIView,
+    RequestProfileListAPIView,
+    RequestProfileDetailAPIView,
+    SlowQueryListAPIView,
+    SlowQueryDetailAPIView,
+)
 from .validation import (
     check_cpf_availability,
     list_neighborhoods,
+    autocomplete_neighborhoods,
     validate_phone,
     validate_cep,
+    validate_batch,
+    lookup_cep,
 )
 from .legacy import (
     profile_view,
@@ -24,10 +35,17 @@ __all__ = [
     "ProfileListAPIView",
     "UserStatsAPIView",
     "InactiveProfilesAPIView",
+    "RequestProfileListAPIView",
+    "RequestProfileDetailAPIView",
+    "SlowQueryListAPIView",
+    "SlowQueryDetailAPIView",
     "check_cpf_availability",
     "list_neighborhoods",
+    "autocomplete_neighborhoods",
     "validate_phone",
     "validate_cep",
+    "validate_batch",
+    "lookup_cep",
     "profile_view",
     "check_cpf_legacy",
     "user_profile_json",
@@ -5,26 +5,147 @@ Views administrativas para gerenciamento de usuários e estatísticas
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Count, Q
-from django.core.paginator import Paginator
+from django.http import FileResponse
+from django.core.cache import cache
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import (
+    Avg,
+    Case,
+    CharField,
+    Count,
+    F,
+    FloatField,
+    Func,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest, Lower, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import date, timedelta
 import logging
+import re
+
+from core.metrics import record_cache
+from core.models import SlowQuery
+from core.profiling import HEADER, get_profiling_settings, get_storage, issue_token
+from core.schema import lazy_schema
+from core.pagination import EstimatedCountPaginator
 
 from ..models import Profile
+from ..validators import fold_name
 from ..serializers.profile import ProfileListSerializer
-from ..docs.simple import PROFILES_LIST_SIMPLE_SCHEMA, STATS_SIMPLE_SCHEMA
 
 logger = logging.getLogger(__name__)
 
 
-class ProfileListAPIView(APIView):
+class ImmutableUnaccent(Func):
+    """
+    ``immutable_unaccent``: o unaccent imutável (migração 0008) usado nas
+    expressões dos índices trigram
+    """
+
+    function = "immutable_unaccent"
+    output_field = CharField()
+
+
+def _folded(field):
+    """
+    Campo sem acentos e em minúsculas, igual à expressão dos índices trigram
+    """
+    return ImmutableUnaccent(Lower(field))
+
+
+def _parse_date(value):
+    """
+    Data YYYY-MM-DD do parâmetro, ou None se inválida (inclusive datas
+    impossíveis como 2025-13-01, em que ``parse_date`` levanta ValueError)
+    """
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+class ActivityFilterMixin:
+    """
+    Filtros e ordenação pelo resumo de atividade (``UserActivity``)
+
+    Parâmetros inválidos levantam ``ValueError``, respondido com 400.
+    """
+
+    ORDERING_FIELDS = {
+        "total_alertas": "user__activity__total_alertas",
+        "total_comentarios": "user__activity__total_comentarios",
+        "ultimo_alerta": "user__activity__ultimo_alerta",
+        "ultimo_comentario": "user__activity__ultimo_comentario",
+        "data_cadastro": "data_cadastro",
+    }
+
+    def _apply_activity_filters(self, request, queryset):
+        for param, lookup in (
+            ("min_alertas", "user__activity__total_alertas__gte"),
+            ("min_comentarios", "user__activity__total_comentarios__gte"),
+        ):
+            value = request.query_params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise ValueError(f"{param} deve ser um inteiro não negativo")
+                queryset = queryset.filter(**{lookup: int(value)})
+
+        sem_atividade_desde = request.query_params.get("sem_atividade_desde")
+        if sem_atividade_desde:
+            desde = parse_date(sem_atividade_desde)
+            if desde is None:
+                raise ValueError("sem_atividade_desde deve estar no formato YYYY-MM-DD")
+            queryset = queryset.exclude(
+                user__activity__ultimo_alerta__date__gte=desde
+            ).exclude(user__activity__ultimo_comentario__date__gte=desde)
+
+        dormente = request.query_params.get("dormente")
+        if dormente is not None:
+            queryset = queryset.filter(
+                user__activity__dormente=dormente.lower() in ("true", "1", "yes")
+            )
+
+        return queryset
+
+    def _apply_ordering(self, request, queryset):
+        ordering = request.query_params.get("ordering")
+        if not ordering:
+            return queryset
+
+        field = self.ORDERING_FIELDS.get(ordering.lstrip("-"))
+        if field is None:
+            raise ValueError(
+                f"ordering deve ser um de: {', '.join(self.ORDERING_FIELDS)} "
+                "(prefixo '-' para ordem decrescente)"
+            )
+
+        expression = (
+            F(field).desc(nulls_last=True)
+            if ordering.startswith("-")
+            else F(field).asc(nulls_last=True)
+        )
+        return queryset.order_by(expression, "-id")
+
+
+class ProfileListAPIView(ActivityFilterMixin, APIView):
     """
     API para listar perfis de contribuintes (apenas para administradores)
     """
 
     permission_classes = [permissions.IsAdminUser]
 
-    @PROFILES_LIST_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILES_LIST_SIMPLE_SCHEMA")
     def get(self, request):
         """
         Lista contribuintes com filtros opcionais e paginação
@@ -33,18 +154,27 @@ class ProfileListAPIView(APIView):
         - bairro: Filtrar por bairro específico
         - ativo: Filtrar por status ativo (true/false)
         - search: Buscar por nome ou CPF
+        - min_alertas / min_comentarios: Mínimo de alertas/comentários ativos
+        - sem_atividade_desde: Sem alertas nem comentários desde a data
+        - dormente: Filtrar pela marcação de dormente (true/false)
+        - ordering: total_alertas, total_comentarios, ultimo_alerta,
+          ultimo_comentario ou data_cadastro (prefixo "-" para decrescente)
         - page: Número da página
         - page_size: Itens por página (padrão: 20, máximo: 100)
         """
         try:
-            queryset = Profile.objects.select_related("user").order_by("-data_cadastro")
+            queryset = Profile.objects.select_related(
+                "user", "user__activity"
+            ).order_by("-data_cadastro")
 
             queryset = self._apply_filters(request, queryset)
+            queryset = self._apply_activity_filters(request, queryset)
+            queryset = self._apply_ordering(request, queryset)
 
             page = int(request.query_params.get("page", 1))
             page_size = min(int(request.query_params.get("page_size", 20)), 100)
 
-            paginator = Paginator(queryset, page_size)
+            paginator = EstimatedCountPaginator(queryset, page_size)
             page_obj = paginator.get_page(page)
 
             serializer = ProfileListSerializer(page_obj, many=True)
@@ -71,6 +201,7 @@ class ProfileListAPIView(APIView):
             return Response(
                 {
                     "count": paginator.count,
+                    "count_is_exact": paginator.count_is_exact,
                     "next": next_url,
                     "previous": previous_url,
                     "page": page,
@@ -80,8 +211,13 @@ class ProfileListAPIView(APIView):
                 }
             )
 
+        except ValueError as e:
+            return Response(
+                {"message": "Parâmetros inválidos", "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
-            logger.error(f"Erro ao listar perfis: {str(e)}")
+            logger.exception("Erro ao listar perfis")
             return Response(
                 {"message": "Erro ao listar contribuintes", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -90,10 +226,22 @@ class ProfileListAPIView(APIView):
     def _apply_filters(self, request, queryset):
         """
         Aplica filtros na queryset
+
+        No PostgreSQL a busca usa os índices trigram (pg_trgm) sobre nome,
+        usuário, CPF e bairro normalizados (sem acentos e em minúsculas), tolera
+        erros de digitação e ordena os resultados pela similaridade com o termo
+        buscado.
         """
+        use_trigram = connections[queryset.db].vendor == "postgresql"
+
         bairro = request.query_params.get("bairro")
         if bairro:
-            queryset = queryset.filter(bairro__icontains=bairro)
+            if use_trigram:
+                queryset = queryset.alias(bairro_busca=_folded("bairro")).filter(
+                    bairro_busca__contains=fold_name(bairro)
+                )
+            else:
+                queryset = queryset.filter(bairro__icontains=bairro)
 
         ativo = request.query_params.get("ativo")
         if ativo is not None:
@@ -102,15 +250,92 @@ class ProfileListAPIView(APIView):
 
         search = request.query_params.get("search")
         if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-                | Q(user__username__icontains=search)
-                | Q(cpf__icontains=search)
-            )
+            if use_trigram:
+                queryset = self._apply_trigram_search(queryset, search)
+            else:
+                queryset = queryset.filter(
+                    Q(user__first_name__icontains=search)
+                    | Q(user__last_name__icontains=search)
+                    | Q(user__username__icontains=search)
+                    | Q(cpf__icontains=search)
+                    | Q(bairro__icontains=search)
+                )
 
         return queryset
 
+    def _apply_trigram_search(self, queryset, search):
+        """
+        Busca por similaridade trigram, ordenada pela melhor correspondência
+
+        Termo e campos são comparados sem acentos e em minúsculas ("jose"
+        encontra "José"). Termos curtos quase não têm trigramas em comum com o
+        texto, então os trechos exatos também entram e vêm primeiro na
+        ordenação.
+        """
+        termo = fold_name(search)
+        digits = re.sub(r"[^0-9]", "", search)
+
+        users = (
+            User.objects.alias(
+                first_name_busca=_folded("first_name"),
+                last_name_busca=_folded("last_name"),
+                username_busca=_folded("username"),
+            )
+            .filter(
+                Q(first_name_busca__trigram_word_similar=termo)
+                | Q(last_name_busca__trigram_word_similar=termo)
+                | Q(username_busca__trigram_word_similar=termo)
+                | Q(first_name_busca__contains=termo)
+                | Q(last_name_busca__contains=termo)
+                | Q(username_busca__contains=termo)
+            )
+            .values("id")
+        )
+
+        queryset = queryset.alias(
+            bairro_busca=_folded("bairro"),
+            first_name_busca=_folded("user__first_name"),
+            last_name_busca=_folded("user__last_name"),
+            username_busca=_folded("user__username"),
+        )
+
+        condition = (
+            Q(user__in=users)
+            | Q(bairro_busca__trigram_word_similar=termo)
+            | Q(bairro_busca__contains=termo)
+            | Q(cpf__contains=termo)
+        )
+        if len(digits) >= 3:
+            condition |= Q(cpf__contains=digits)
+
+        exact = (
+            Q(first_name_busca__contains=termo)
+            | Q(last_name_busca__contains=termo)
+            | Q(username_busca__contains=termo)
+            | Q(bairro_busca__contains=termo)
+            | Q(cpf__contains=termo)
+        )
+        if len(digits) >= 3:
+            exact |= Q(cpf__contains=digits)
+
+        similarity = Greatest(
+            TrigramWordSimilarity(termo, "first_name_busca"),
+            TrigramWordSimilarity(termo, "last_name_busca"),
+            TrigramWordSimilarity(termo, "username_busca"),
+            TrigramWordSimilarity(termo, "bairro_busca"),
+            Case(
+                When(exact, then=Value(1.0)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+        )
+
+        return (
+            queryset.filter(condition)
+            .annotate(similaridade=similarity)
+            .order_by("-similaridade", "-data_cadastro")
+        )
+
 
 class UserStatsAPIView(APIView):
     """
@@ -119,7 +344,16 @@ class UserStatsAPIView(APIView):
 
     permission_classes = [permissions.IsAdminUser]
 
-    @STATS_SIMPLE_SCHEMA
+    AGE_RANGES = [
+        ("16-25", 16, 25),
+        ("26-35", 26, 35),
+        ("36-45", 36, 45),
+        ("46-55", 46, 55),
+        ("56-65", 56, 65),
+        ("65+", 66, None),
+    ]
+
+    @lazy_schema("accounts.docs.simple.STATS_SIMPLE_SCHEMA")
     def get(self, request):
         """
         Retorna estatísticas completas do sistema
@@ -129,113 +363,148 @@ class UserStatsAPIView(APIView):
         - Total de perfis
         - Perfis ativos/inativos
         - Top 10 bairros com mais contribuintes
-        - Registros mensais (últimos 6 meses)
+        - Registros mensais (período informado ou últimos 6 meses)
         - Distribuição de idades
+
+        Parâmetros opcionais:
+        - data_inicio: Início do período de registros (YYYY-MM-DD)
+        - data_fim: Fim do período de registros (YYYY-MM-DD)
         """
         try:
-            total_users = User.objects.count()
-            total_profiles = Profile.objects.count()
-            active_profiles = Profile.objects.filter(ativo=True).count()
-            inactive_profiles = total_profiles - active_profiles
-
-            neighborhoods_stats = (
-                Profile.objects.values("bairro")
-                .annotate(count=Count("bairro"))
-                .exclude(bairro="")
-                .order_by("-count")[:10]
-            )
+            data_inicio = request.query_params.get("data_inicio")
+            data_fim = request.query_params.get("data_fim")
 
-            from django.utils import timezone
-            from datetime import timedelta
+            inicio = _parse_date(data_inicio) if data_inicio else None
+            fim = _parse_date(data_fim) if data_fim else None
 
-            six_months_ago = timezone.now() - timedelta(days=180)
-            monthly_registrations = (
-                Profile.objects.filter(data_cadastro__gte=six_months_ago)
-                .extra(select={"month": "strftime('%%Y-%%m', data_cadastro)"})
-                .values("month")
-                .annotate(count=Count("id"))
-                .order_by("month")
-            )
+            if (data_inicio and inicio is None) or (data_fim and fim is None):
+                return Response(
+                    {"message": "Datas devem estar no formato YYYY-MM-DD"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-            age_distribution = self._get_age_distribution()
-
-            data = {
-                "total_users": total_users,
-                "total_profiles": total_profiles,
-                "active_profiles": active_profiles,
-                "inactive_profiles": inactive_profiles,
-                "completion_rate": (
-                    round((total_profiles / total_users * 100), 2)
-                    if total_users > 0
-                    else 0
-                ),
-                "top_neighborhoods": list(neighborhoods_stats),
-                "monthly_registrations": list(monthly_registrations),
-                "age_distribution": age_distribution,
-                "generated_at": timezone.now().isoformat(),
-            }
+            cache_key = f"accounts:user_stats:{inicio}:{fim}"
+            data = cache.get(cache_key)
+            record_cache("estatisticas_usuarios", data is not None)
+
+            if data is None:
+                data = self._build_stats(inicio, fim)
+                cache.set(
+                    cache_key,
+                    data,
+                    getattr(settings, "USER_STATS_CACHE_TTL", 300),
+                )
 
-            logger.info(f"Estatísticas geradas por {request.user.username}")
+            logger.info("Estatísticas geradas por %s", request.user.username)
             return Response(data)
 
         except Exception as e:
-            logger.error(f"Erro ao gerar estatísticas: {str(e)}")
+            logger.exception("Erro ao gerar estatísticas")
             return Response(
                 {"message": "Erro ao gerar estatísticas", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    def _get_age_distribution(self):
+    def _build_stats(self, inicio, fim):
         """
-        Calcula distribuição de idades dos contribuintes
+        Calcula as estatísticas com agregações no banco
         """
-        try:
-            from datetime import date
-
-            today = date.today()
-
-            age_ranges = {
-                "16-25": 0,
-                "26-35": 0,
-                "36-45": 0,
-                "46-55": 0,
-                "56-65": 0,
-                "65+": 0,
-            }
+        total_users = User.objects.count()
+        profile_counts = Profile.objects.aggregate(
+            total=Count("id"), ativos=Count("id", filter=Q(ativo=True))
+        )
+        total_profiles = profile_counts["total"]
+        active_profiles = profile_counts["ativos"]
+        inactive_profiles = total_profiles - active_profiles
+
+        neighborhoods_stats = (
+            Profile.objects.values("bairro")
+            .annotate(count=Count("bairro"))
+            .exclude(bairro="")
+            .order_by("-count")[:10]
+        )
+
+        return {
+            "total_users": total_users,
+            "total_profiles": total_profiles,
+            "active_profiles": active_profiles,
+            "inactive_profiles": inactive_profiles,
+            "completion_rate": (
+                round((total_profiles / total_users * 100), 2) if total_users > 0 else 0
+            ),
+            "top_neighborhoods": list(neighborhoods_stats),
+            "monthly_registrations": self._get_monthly_registrations(inicio, fim),
+            "age_distribution": self._get_age_distribution(),
+            "generated_at": timezone.now().isoformat(),
+        }
+
+    def _get_monthly_registrations(self, inicio, fim):
+        """
+        Conta cadastros por mês (truncamento de data no banco)
+        """
+        queryset = Profile.objects.all()
 
-            profiles = Profile.objects.filter(ativo=True).select_related("user")
+        if inicio:
+            queryset = queryset.filter(data_cadastro__date__gte=inicio)
+        elif not fim:
+            queryset = queryset.filter(
+                data_cadastro__gte=timezone.now() - timedelta(days=180)
+            )
 
-            for profile in profiles:
-                age = (
-                    today.year
-                    - profile.data_nascimento.year
-                    - (
-                        (today.month, today.day)
-                        < (profile.data_nascimento.month, profile.data_nascimento.day)
-                    )
-                )
+        if fim:
+            queryset = queryset.filter(data_cadastro__date__lte=fim)
 
-                if 16 <= age <= 25:
-                    age_ranges["16-25"] += 1
-                elif 26 <= age <= 35:
-                    age_ranges["26-35"] += 1
-                elif 36 <= age <= 45:
-                    age_ranges["36-45"] += 1
-                elif 46 <= age <= 55:
-                    age_ranges["46-55"] += 1
-                elif 56 <= age <= 65:
-                    age_ranges["56-65"] += 1
-                elif age > 65:
-                    age_ranges["65+"] += 1
-
-            return age_ranges
+        monthly = (
+            queryset.annotate(month=TruncMonth("data_cadastro"))
+            .values("month")
+            .annotate(count=Count("id"))
+            .order_by("month")
+        )
 
-        except Exception as e:
-            logger.error(f"Erro ao calcular distribuição de idades: {str(e)}")
-            return {}
+        return [
+            {"month": item["month"].strftime("%Y-%m"), "count": item["count"]}
+            for item in monthly
+        ]
 
+    def _get_age_distribution(self):
+        """
+        Calcula distribuição de idades dos contribuintes
 
-class InactiveProfilesAPIView(APIView):
+        As idades viram limites de data de nascimento e a classificação em
+        faixas é feita com CASE no banco, agrupando por faixa.
+        """
+        today = date.today()
+
+        def born_before(years):
+            try:
+                return today.replace(year=today.year - years)
+            except ValueError:
+                return today.replace(year=today.year - years, day=28)
+
+        whens = []
+        for label, min_age, max_age in self.AGE_RANGES:
+            condition = Q(data_nascimento__lte=born_before(min_age))
+            if max_age is not None:
+                condition &= Q(data_nascimento__gt=born_before(max_age + 1))
+            whens.append(When(condition, then=Value(label)))
+
+        counts = (
+            Profile.objects.filter(ativo=True)
+            .annotate(faixa=Case(*whens, default=Value(""), output_field=CharField()))
+            .values("faixa")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+
+        age_ranges = {label: 0 for label, _, _ in self.AGE_RANGES}
+        for item in counts:
+            if item["faixa"] in age_ranges:
+                age_ranges[item["faixa"]] = item["count"]
+
+        return age_ranges
+
+
+class InactiveProfilesAPIView(ActivityFilterMixin, APIView):
     """
     API para listar perfis inativos (apenas para administradores)
     """
@@ -243,22 +512,27 @@ class InactiveProfilesAPIView(APIView):
     permission_classes = [permissions.IsAdminUser]
     serializer_class = ProfileListSerializer
 
-    @PROFILES_LIST_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILES_LIST_SIMPLE_SCHEMA")
     def get(self, request):
         """
         Lista contribuintes inativos com paginação
+
+        Aceita os mesmos filtros de atividade e a ordenação da listagem de
+        contribuintes.
         """
         try:
             queryset = (
                 Profile.objects.filter(ativo=False)
-                .select_related("user")
+                .select_related("user", "user__activity")
                 .order_by("-data_atualizacao")
             )
+            queryset = self._apply_activity_filters(request, queryset)
+            queryset = self._apply_ordering(request, queryset)
 
             page = int(request.query_params.get("page", 1))
             page_size = min(int(request.query_params.get("page_size", 20)), 100)
 
-            paginator = Paginator(queryset, page_size)
+            paginator = EstimatedCountPaginator(queryset, page_size)
             page_obj = paginator.get_page(page)
 
             serializer = ProfileListSerializer(page_obj, many=True)
@@ -266,6 +540,7 @@ class InactiveProfilesAPIView(APIView):
             return Response(
                 {
                     "count": paginator.count,
+                    "count_is_exact": paginator.count_is_exact,
                     "page": page,
                     "page_size": page_size,
                     "total_pages": paginator.num_pages,
@@ -273,14 +548,19 @@ class InactiveProfilesAPIView(APIView):
                 }
             )
 
+        except ValueError as e:
+            return Response(
+                {"message": "Parâmetros inválidos", "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
-            logger.error(f"Erro ao listar perfis inativos: {str(e)}")
+            logger.exception("Erro ao listar perfis inativos")
             return Response(
                 {"message": "Erro ao listar contribuintes inativos", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @PROFILES_LIST_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILES_LIST_SIMPLE_SCHEMA")
     def patch(self, request):
         """
         Reativa um contribuinte inativo
@@ -298,7 +578,10 @@ class InactiveProfilesAPIView(APIView):
             profile.save()
 
             logger.info(
-                f"Perfil reativado por {request.user.username}: {profile.user.username} - {profile.get_cpf_formatado()}"
+                "Perfil reativado por %s: %s - %s",
+                request.user.username,
+                profile.user.username,
+                profile.get_cpf_formatado(),
             )
 
             return Response(
@@ -314,8 +597,196 @@ class InactiveProfilesAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
         except Exception as e:
-            logger.error(f"Erro ao reativar perfil: {str(e)}")
+            logger.exception("Erro ao reativar perfil")
             return Response(
                 {"message": "Erro ao reativar contribuinte", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class RequestProfileListAPIView(APIView):
+    """
+    Perfis de requisições gravados pelo profiler (apenas para administradores)
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @lazy_schema("accounts.docs.simple.REQUEST_PROFILES_LIST_SIMPLE_SCHEMA")
+    def get(self, request):
+        """
+        Lista os perfis gravados, do mais recente para o mais antigo
+
+        Só enxerga os perfis em ``PROFILING["DIR"]`` deste servidor (ou do
+        diretório compartilhado, se configurado).
+        """
+        profiles = get_storage().list()
+        return Response({"count": len(profiles), "results": profiles})
+
+    @lazy_schema("accounts.docs.simple.REQUEST_PROFILE_TOKEN_SIMPLE_SCHEMA")
+    def post(self, request):
+        """
+        Emite um token de perfilamento para o administrador autenticado
+        """
+        config = get_profiling_settings()
+        if not config["ENABLED"]:
+            return Response(
+                {"message": "Profiler desativado"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        logger.info("Token de perfilamento emitido para %s", request.user.username)
+        return Response(
+            {
+                "token": issue_token(request.user),
+                "header": HEADER,
+                "expires_in": config["TOKEN_MAX_AGE"],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class RequestProfileDetailAPIView(APIView):
+    """
+    Download de um perfil de requisição (apenas para administradores)
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @lazy_schema("accounts.docs.simple.REQUEST_PROFILE_DETAIL_SIMPLE_SCHEMA")
+    def get(self, request, profile_id):
+        """
+        Retorna as pilhas do perfil no formato collapsed
+        """
+        path = get_storage().path(profile_id)
+        if path is None:
+            return Response(
+                {"message": "Perfil não encontrado"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return FileResponse(
+            open(path, "rb"),
+            content_type="text/plain; charset=utf-8",
+            as_attachment=True,
+            filename=f"{profile_id}.folded",
+        )
+
+
+class SlowQueryListAPIView(APIView):
+    """
+    Consultas lentas agrupadas por forma de consulta (apenas para
+    administradores)
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    ORDERING_FIELDS = ("total_ms", "max_ms", "media_ms", "execucoes")
+
+    @lazy_schema("accounts.docs.simple.SLOW_QUERIES_LIST_SIMPLE_SCHEMA")
+    def get(self, request):
+        """
+        Lista as formas de consulta com maior tempo total no banco
+
+        Parâmetros opcionais:
+        - ordering: total_ms (padrão), max_ms, media_ms ou execucoes
+        - rota: Filtrar pela rota da requisição
+        - desde: Apenas capturas a partir da data (YYYY-MM-DD)
+        - limit: Número de consultas (padrão: 20, máximo: 100)
+        """
+        ordering = request.query_params.get("ordering", "total_ms")
+        if ordering not in self.ORDERING_FIELDS:
+            return Response(
+                {
+                    "message": "Parâmetros inválidos",
+                    "error": f"ordering deve ser um de: {', '.join(self.ORDERING_FIELDS)}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        limit = request.query_params.get("limit", "20")
+        if not limit.isdigit():
+            return Response(
+                {
+                    "message": "Parâmetros inválidos",
+                    "error": "limit deve ser um inteiro positivo",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(max(int(limit), 1), 100)
+
+        queryset = SlowQuery.objects.all()
+        rota = request.query_params.get("rota")
+        if rota:
+            queryset = queryset.filter(rota=rota)
+        desde = request.query_params.get("desde")
+        if desde:
+            desde = _parse_date(desde)
+            if desde is None:
+                return Response(
+                    {"message": "desde deve estar no formato YYYY-MM-DD"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(data_criacao__date__gte=desde)
+
+        latest = SlowQuery.objects.filter(fingerprint=OuterRef("fingerprint"))
+        groups = (
+            queryset.values("fingerprint")
+            .annotate(
+                total_ms=Sum("duracao_ms"),
+                execucoes=Count("id"),
+                media_ms=Avg("duracao_ms"),
+                max_ms=Max("duracao_ms"),
+                ultima_captura=Max("data_criacao"),
+                sql=Subquery(latest.order_by("-id").values("sql")[:1]),
+                plano=Subquery(
+                    latest.exclude(plano="").order_by("-id").values("plano")[:1]
+                ),
+            )
+            .order_by(f"-{ordering}", "fingerprint")[:limit]
+        )
+
+        results = [
+            {
+                **group,
+                "total_ms": round(group["total_ms"], 1),
+                "media_ms": round(group["media_ms"], 1),
+                "max_ms": round(group["max_ms"], 1),
+            }
+            for group in groups
+        ]
+        return Response({"count": len(results), "results": results})
+
+
+class SlowQueryDetailAPIView(APIView):
+    """
+    Capturas de uma forma de consulta lenta (apenas para administradores)
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @lazy_schema("accounts.docs.simple.SLOW_QUERY_DETAIL_SIMPLE_SCHEMA")
+    def get(self, request, fingerprint):
+        """
+        Lista as 50 capturas mais recentes da consulta
+        """
+        samples = list(
+            SlowQuery.objects.filter(fingerprint=fingerprint)
+            .order_by("-id")
+            .values(
+                "id",
+                "sql",
+                "parametros",
+                "duracao_ms",
+                "banco",
+                "rota",
+                "plano",
+                "data_criacao",
+            )[:50]
+        )
+        if not samples:
+            return Response(
+                {"message": "Consulta não encontrada"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {"fingerprint": fingerprint, "count": len(samples), "results": samples}
+        )
@@ -4,12 +4,13 @@ Views para autenticação e registro
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
+from rest_framework import status, permissions, serializers
 from django.contrib.auth.models import User
 import logging
 
+from ..serializers.profile import serializer_warnings
 from ..serializers.user import UserCreateSerializer
-from ..docs.simple import USER_CREATE_SIMPLE_SCHEMA, USER_AVAILABILITY_SIMPLE_SCHEMA
+from core.schema import lazy_schema
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +23,7 @@ class UserCreateAPIView(APIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = UserCreateSerializer
 
-    @USER_CREATE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.USER_CREATE_SIMPLE_SCHEMA")
     def post(self, request):
         """
         Cria um novo usuário com perfil completo
@@ -51,7 +52,9 @@ class UserCreateAPIView(APIView):
                 user = serializer.save()
 
                 logger.info(
-                    f"Novo usuário criado: {user.username} - {user.profile.get_cpf_formatado()}"
+                    "Novo usuário criado: %s - %s",
+                    user.username,
+                    user.profile.get_cpf_formatado(),
                 )
 
                 return Response(
@@ -65,12 +68,19 @@ class UserCreateAPIView(APIView):
                             if hasattr(user, "profile")
                             else None
                         ),
+                        **serializer_warnings(serializer),
                     },
                     status=status.HTTP_201_CREATED,
                 )
 
+            except serializers.ValidationError as e:
+                return Response(
+                    {"message": "Dados inválidos", "errors": e.detail},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             except Exception as e:
-                logger.error(f"Erro ao criar usuário: {str(e)}")
+                logger.exception("Erro ao criar usuário")
                 return Response(
                     {"message": "Erro interno do servidor", "error": str(e)},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -81,7 +91,7 @@ class UserCreateAPIView(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    @USER_AVAILABILITY_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.USER_AVAILABILITY_SIMPLE_SCHEMA")
     def get(self, request):
         """
         Verifica disponibilidade de username e email
@@ -4,8 +4,13 @@ Views legadas para compatibilidade com versões anteriores
 
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
+import math
+
+from ..availability import cpf_exists
+from ..documents import get_profile_document, is_not_modified, set_document_headers
 from ..models import Profile
+from .validation import CPFCheckRateThrottle
 
 
 @login_required
@@ -41,6 +46,14 @@ def check_cpf_availability(request):
     Esta view mantém compatibilidade com código anterior.
     Para APIs REST, use check_cpf_availability em validation.py.
     """
+    throttle = CPFCheckRateThrottle()
+    if not throttle.allow_request(request, None):
+        response = JsonResponse(
+            {"error": "Muitas requisições. Tente novamente mais tarde."}, status=429
+        )
+        response["Retry-After"] = str(math.ceil(throttle.wait()))
+        return response
+
     if request.method == "GET":
         cpf = request.GET.get("cpf", "").strip()
         if cpf:
@@ -48,7 +61,7 @@ def check_cpf_availability(request):
 
             cpf = re.sub(r"[^0-9]", "", cpf)
 
-            exists = Profile.objects.filter(cpf=cpf).exists()
+            exists = cpf_exists(cpf)
             return JsonResponse(
                 {
                     "available": not exists,
@@ -64,57 +77,17 @@ def user_profile_json(request):
     """
     View legada para retornar perfil em JSON
 
-    Mantém compatibilidade com código JavaScript anterior.
+    Mantém compatibilidade com código JavaScript anterior. Servida do
+    documento de perfil em cache, com ETag.
     """
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Usuário não autenticado"}, status=401)
 
-    try:
-        profile = request.user.profile
-        data = {
-            "user": {
-                "id": request.user.id,
-                "username": request.user.username,
-                "email": request.user.email,
-                "first_name": request.user.first_name,
-                "last_name": request.user.last_name,
-                "full_name": request.user.get_full_name(),
-            },
-            "profile": {
-                "id": profile.id,
-                "cpf": profile.cpf,
-                "cpf_formatted": profile.get_cpf_formatado(),
-                "phone": profile.telefone,
-                "phone_formatted": profile.get_telefone_formatado(),
-                "address": profile.endereco,
-                "neighborhood": profile.bairro,
-                "cep": profile.cep,
-                "cep_formatted": profile.get_cep_formatado(),
-                "birth_date": (
-                    profile.data_nascimento.isoformat()
-                    if profile.data_nascimento
-                    else None
-                ),
-                "age": profile.get_idade(),
-                "active": profile.ativo,
-                "photo_url": profile.foto.url if profile.foto else None,
-                "created_at": profile.data_cadastro.isoformat(),
-                "updated_at": profile.data_atualizacao.isoformat(),
-            },
-        }
-        return JsonResponse(data)
-    except Profile.DoesNotExist:
-        return JsonResponse(
-            {
-                "user": {
-                    "id": request.user.id,
-                    "username": request.user.username,
-                    "email": request.user.email,
-                    "first_name": request.user.first_name,
-                    "last_name": request.user.last_name,
-                    "full_name": request.user.get_full_name(),
-                },
-                "profile": None,
-                "has_profile": False,
-            }
-        )
+    document = get_profile_document(request.user, "legacy")
+
+    if is_not_modified(request, document["etag"]):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(document["data"])
+
+    return set_document_headers(response, document["etag"])
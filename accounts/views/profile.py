@@ -5,13 +5,15 @@ Views para gerenciamento de perfil do usuário
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
+from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
 import logging
 
+from ..documents import get_profile_document, is_not_modified, set_document_headers
 from ..models import Profile
 from ..serializers.user import UserSerializer, UserUpdateSerializer
-from ..serializers.profile import ProfileUpdateSerializer
-from ..docs.simple import USER_PROFILE_SIMPLE_SCHEMA, PROFILE_UPDATE_SIMPLE_SCHEMA
+from ..serializers.profile import ProfileUpdateSerializer, serializer_warnings
+from core.schema import lazy_schema
 
 logger = logging.getLogger(__name__)
 
@@ -24,24 +26,40 @@ class UserProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
 
-    @USER_PROFILE_SIMPLE_SCHEMA
+    def get_user(self, request):
+        """
+        Usuário lido do banco para gravação (``request.user`` pode vir do
+        cache da autenticação JWT)
+        """
+        return User.objects.get(pk=request.user.pk)
+
+    @lazy_schema("accounts.docs.simple.USER_PROFILE_SIMPLE_SCHEMA")
     def get(self, request):
         """
         Retorna dados completos do usuário logado incluindo perfil
+
+        Servido do documento em cache; responde 304 se o ETag enviado em
+        If-None-Match ainda for o atual.
         """
         try:
-            serializer = UserSerializer(request.user)
-            return Response(serializer.data)
+            document = get_profile_document(request.user, "me")
+
+            if is_not_modified(request, document["etag"]):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(document["data"])
+
+            return set_document_headers(response, document["etag"])
         except Exception as e:
-            logger.error(
-                f"Erro ao obter perfil do usuário {request.user.username}: {str(e)}"
+            logger.exception(
+                "Erro ao obter perfil do usuário %s", request.user.username
             )
             return Response(
                 {"message": "Erro ao obter dados do usuário", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @USER_PROFILE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.USER_PROFILE_SIMPLE_SCHEMA")
     def patch(self, request):
         """
         Atualiza dados básicos do usuário (não inclui perfil)
@@ -51,12 +69,14 @@ class UserProfileAPIView(APIView):
         - last_name: Sobrenome
         - email: Email (deve ser único)
         """
-        serializer = UserUpdateSerializer(request.user, data=request.data, partial=True)
+        serializer = UserUpdateSerializer(
+            self.get_user(request), data=request.data, partial=True
+        )
 
         if serializer.is_valid():
             try:
                 user = serializer.save()
-                logger.info(f"Dados do usuário atualizados: {user.username}")
+                logger.info("Dados do usuário atualizados: %s", user.username)
 
                 return Response(
                     {
@@ -65,9 +85,7 @@ class UserProfileAPIView(APIView):
                     }
                 )
             except Exception as e:
-                logger.error(
-                    f"Erro ao atualizar usuário {request.user.username}: {str(e)}"
-                )
+                logger.exception("Erro ao atualizar usuário %s", request.user.username)
                 return Response(
                     {"message": "Erro interno do servidor", "error": str(e)},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -78,17 +96,17 @@ class UserProfileAPIView(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    @USER_PROFILE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.USER_PROFILE_SIMPLE_SCHEMA")
     def put(self, request):
         """
         Atualização completa dos dados básicos do usuário
         """
-        serializer = UserUpdateSerializer(request.user, data=request.data)
+        serializer = UserUpdateSerializer(self.get_user(request), data=request.data)
 
         if serializer.is_valid():
             try:
                 user = serializer.save()
-                logger.info(f"Dados completos do usuário atualizados: {user.username}")
+                logger.info("Dados completos do usuário atualizados: %s", user.username)
 
                 return Response(
                     {
@@ -97,9 +115,7 @@ class UserProfileAPIView(APIView):
                     }
                 )
             except Exception as e:
-                logger.error(
-                    f"Erro ao atualizar usuário {request.user.username}: {str(e)}"
-                )
+                logger.exception("Erro ao atualizar usuário %s", request.user.username)
                 return Response(
                     {"message": "Erro interno do servidor", "error": str(e)},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,7 +141,7 @@ class ProfileUpdateAPIView(APIView):
         """
         return get_object_or_404(Profile, user=user)
 
-    @PROFILE_UPDATE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILE_UPDATE_SIMPLE_SCHEMA")
     def get(self, request):
         """
         Retorna dados completos do perfil do contribuinte
@@ -135,15 +151,15 @@ class ProfileUpdateAPIView(APIView):
             serializer = ProfileUpdateSerializer(profile)
             return Response(serializer.data)
         except Exception as e:
-            logger.error(
-                f"Erro ao obter perfil do usuário {request.user.username}: {str(e)}"
+            logger.exception(
+                "Erro ao obter perfil do usuário %s", request.user.username
             )
             return Response(
                 {"message": "Erro ao obter perfil", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @PROFILE_UPDATE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILE_UPDATE_SIMPLE_SCHEMA")
     def patch(self, request):
         """
         Atualiza dados do perfil do contribuinte
@@ -168,18 +184,21 @@ class ProfileUpdateAPIView(APIView):
                 try:
                     updated_profile = serializer.save()
                     logger.info(
-                        f"Perfil atualizado: {updated_profile.user.username} - {updated_profile.get_cpf_formatado()}"
+                        "Perfil atualizado: %s - %s",
+                        updated_profile.user.username,
+                        updated_profile.get_cpf_formatado(),
                     )
 
                     return Response(
                         {
                             "message": "Perfil atualizado com sucesso",
                             "profile": ProfileUpdateSerializer(updated_profile).data,
+                            **serializer_warnings(serializer),
                         }
                     )
                 except Exception as e:
-                    logger.error(
-                        f"Erro ao salvar perfil do usuário {request.user.username}: {str(e)}"
+                    logger.exception(
+                        "Erro ao salvar perfil do usuário %s", request.user.username
                     )
                     return Response(
                         {"message": "Erro interno do servidor", "error": str(e)},
@@ -192,15 +211,15 @@ class ProfileUpdateAPIView(APIView):
             )
 
         except Exception as e:
-            logger.error(
-                f"Erro ao atualizar perfil do usuário {request.user.username}: {str(e)}"
+            logger.exception(
+                "Erro ao atualizar perfil do usuário %s", request.user.username
             )
             return Response(
                 {"message": "Erro ao processar solicitação", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @PROFILE_UPDATE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILE_UPDATE_SIMPLE_SCHEMA")
     def put(self, request):
         """
         Atualização completa do perfil do contribuinte
@@ -213,18 +232,21 @@ class ProfileUpdateAPIView(APIView):
                 try:
                     updated_profile = serializer.save()
                     logger.info(
-                        f"Perfil completamente atualizado: {updated_profile.user.username}"
+                        "Perfil completamente atualizado: %s",
+                        updated_profile.user.username,
                     )
 
                     return Response(
                         {
                             "message": "Perfil atualizado com sucesso",
                             "profile": ProfileUpdateSerializer(updated_profile).data,
+                            **serializer_warnings(serializer),
                         }
                     )
                 except Exception as e:
-                    logger.error(
-                        f"Erro ao salvar perfil completo do usuário {request.user.username}: {str(e)}"
+                    logger.exception(
+                        "Erro ao salvar perfil completo do usuário %s",
+                        request.user.username,
                     )
                     return Response(
                         {"message": "Erro interno do servidor", "error": str(e)},
@@ -237,15 +259,15 @@ class ProfileUpdateAPIView(APIView):
             )
 
         except Exception as e:
-            logger.error(
-                f"Erro ao atualizar perfil completo do usuário {request.user.username}: {str(e)}"
+            logger.exception(
+                "Erro ao atualizar perfil completo do usuário %s", request.user.username
             )
             return Response(
                 {"message": "Erro ao processar solicitação", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @PROFILE_UPDATE_SIMPLE_SCHEMA
+    @lazy_schema("accounts.docs.simple.PROFILE_UPDATE_SIMPLE_SCHEMA")
     def delete(self, request):
         """
         Desativa o perfil do usuário (soft delete)
@@ -256,7 +278,9 @@ class ProfileUpdateAPIView(APIView):
             profile.save()
 
             logger.info(
-                f"Perfil desativado: {profile.user.username} - {profile.get_cpf_formatado()}"
+                "Perfil desativado: %s - %s",
+                profile.user.username,
+                profile.get_cpf_formatado(),
             )
 
             return Response(
@@ -267,8 +291,8 @@ class ProfileUpdateAPIView(APIView):
                 }
             )
         except Exception as e:
-            logger.error(
-                f"Erro ao desativar perfil do usuário {request.user.username}: {str(e)}"
+            logger.exception(
+                "Erro ao desativar perfil do usuário %s", request.user.username
             )
             return Response(
                 {"message": "Erro ao desativar perfil", "error": str(e)},
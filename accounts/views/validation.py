@@ -2,22 +2,101 @@
 Views para validação e utilitários
 """
 
+import re
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 
-from ..models import Profile
-from ..docs.simple import (
-    CPF_VALIDATION_SIMPLE_SCHEMA,
-    PHONE_VALIDATION_SIMPLE_SCHEMA,
-    CEP_VALIDATION_SIMPLE_SCHEMA,
-    NEIGHBORHOODS_SIMPLE_SCHEMA,
+from core.throttling import SlidingWindowRateThrottle
+from core.schema import lazy_schema
+from ..autocomplete import get_index
+from ..availability import cpf_exists, find_unavailable
+from ..cep import (
+    clean_cep,
+    is_florianopolis_cep,
+    lookup_neighborhoods,
+    resolve_cep_neighborhood,
+)
+from ..validators import (
+    FLORIANOPOLIS_NEIGHBORHOODS,
+    format_cep,
+    format_cpf,
+    format_phone,
+    validate_cep as validate_cep_value,
+    validate_cpf,
+    validate_florianopolis_neighborhood,
+    validate_phone_number,
 )
 
 
-@CPF_VALIDATION_SIMPLE_SCHEMA
+class CPFCheckRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limita consultas de disponibilidade de CPF (evita enumeração)
+
+    Só conta requisições que de fato informam um CPF.
+    """
+
+    scope = "cpf_check"
+
+    def get_cost(self, request, view):
+        if request.method == "GET":
+            cpfs = [request.query_params.get("cpf")]
+        else:
+            data = request.data
+            records = data if isinstance(data, list) else [data]
+            cpfs = [record.get("cpf") for record in records if isinstance(record, dict)]
+        return 1 if any(str(cpf or "").strip() for cpf in cpfs) else 0
+
+
+class ValidationRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limita as rotas públicas de validação de campos
+    """
+
+    scope = "validation"
+
+
+class BatchValidationRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limita a validação em lote: cada registro da lista consome uma unidade
+    """
+
+    scope = "validation_batch"
+
+    def get_cost(self, request, view):
+        data = request.data
+        if not isinstance(data, list) or not can_validate_in_bulk(request.user):
+            return 0
+        return len(data)
+
+
+def can_validate_in_bulk(user):
+    """
+    Validação em lote (lista de registros) só para a equipe e parceiros com
+    a permissão ``accounts.validate_batch``
+    """
+    return user.is_authenticated and (
+        user.is_staff or user.has_perm("accounts.validate_batch")
+    )
+
+
+class AutocompleteRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limita o autocompletar (uma chamada por tecla digitada)
+    """
+
+    scope = "autocomplete"
+
+
+@lazy_schema("accounts.docs.simple.CPF_VALIDATION_SIMPLE_SCHEMA")
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([CPFCheckRateThrottle])
 def check_cpf_availability(request):
     """
     API endpoint para verificar se um CPF já está em uso
@@ -31,8 +110,6 @@ def check_cpf_availability(request):
             {"error": "CPF é obrigatório"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    import re
-
     cpf_clean = re.sub(r"[^0-9]", "", cpf)
 
     if len(cpf_clean) != 11:
@@ -41,13 +118,11 @@ def check_cpf_availability(request):
         )
 
     try:
-        from ..validators import validate_cpf
-
         validate_cpf(cpf_clean)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    exists = Profile.objects.filter(cpf=cpf_clean).exists()
+    exists = cpf_exists(cpf_clean)
 
     return Response(
         {
@@ -63,7 +138,7 @@ def check_cpf_availability(request):
     )
 
 
-@NEIGHBORHOODS_SIMPLE_SCHEMA
+@lazy_schema("accounts.docs.simple.NEIGHBORHOODS_SIMPLE_SCHEMA")
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def list_neighborhoods(request):
@@ -72,81 +147,71 @@ def list_neighborhoods(request):
 
     Retorna todos os bairros aceitos pelo sistema para validação.
     """
-    neighborhoods = [
-        "Centro",
-        "Trindade",
-        "Pantanal",
-        "Córrego Grande",
-        "Santa Mônica",
-        "Carvoeira",
-        "Serrinha",
-        "João Paulo",
-        "Monte Verde",
-        "Saco Grande",
-        "Itacorubi",
-        "Agronômica",
-        "Capoeiras",
-        "Coqueiros",
-        "Estreito",
-        "Balneário",
-        "Coloninha",
-        "Abraão",
-        "Bom Abrigo",
-        "Canto",
-        "Canasvieiras",
-        "Ingleses",
-        "Santinho",
-        "Cachoeira do Bom Jesus",
-        "Ponta das Canas",
-        "Lagoinha",
-        "Daniela",
-        "Jurerê",
-        "Jurerê Internacional",
-        "Praia Brava",
-        "Barra da Lagoa",
-        "Galheta",
-        "Mole",
-        "Joaquina",
-        "Campeche",
-        "Armação",
-        "Matadeiro",
-        "Lagoinha do Leste",
-        "Pântano do Sul",
-        "Costa de Dentro",
-        "Ribeirão da Ilha",
-        "Tapera",
-        "Caieira da Barra do Sul",
-        "Alto Ribeirão",
-        "Sede Fragas",
-        "Costeira do Pirajubaé",
-        "Saco dos Limões",
-        "José Mendes",
-        "Prainha",
-        "Bom Retiro",
-        "Jardim Atlântico",
-        "Vargem do Bom Jesus",
-        "Vargem Grande",
-        "Vargem Pequena",
-        "Santo Antônio de Lisboa",
-        "Ratones",
-        "Cacupé",
-        "Sambaqui",
-        "Barra do Sambaqui",
-        "Monte Cristo",
-    ]
-
     return Response(
         {
-            "neighborhoods": sorted(neighborhoods),
-            "total": len(neighborhoods),
+            "neighborhoods": sorted(FLORIANOPOLIS_NEIGHBORHOODS),
+            "total": len(FLORIANOPOLIS_NEIGHBORHOODS),
             "note": "Lista oficial de bairros de Florianópolis aceitos pelo sistema",
         }
     )
 
 
-@PHONE_VALIDATION_SIMPLE_SCHEMA
+@lazy_schema("accounts.docs.simple.AUTOCOMPLETE_SIMPLE_SCHEMA")
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AutocompleteRateThrottle])
+def autocomplete_neighborhoods(request):
+    """
+    API endpoint para sugerir bairros (ou logradouros) a partir do texto digitado
+
+    Tolera acentos ausentes e erros de digitação ("Corego Grande"). As
+    sugestões vêm de índices em memória, sem consulta ao banco.
+    """
+    query = request.GET.get("q", "").strip()
+    tipo = request.GET.get("tipo", "bairro")
+
+    if not query:
+        return Response(
+            {"error": "Parâmetro q é obrigatório"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if tipo not in ("bairro", "logradouro"):
+        return Response(
+            {"error": "tipo deve ser bairro ou logradouro"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        limit = min(max(int(request.GET.get("limit", 10)), 1), 20)
+    except ValueError:
+        return Response(
+            {"error": "limit deve ser um número inteiro"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    index = get_index(tipo)
+    if index is None:
+        return Response(
+            {"error": "Lista de logradouros não configurada"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    suggestions = index.suggest(query, limit)
+
+    return Response(
+        {
+            "query": query,
+            "tipo": tipo,
+            "results": suggestions,
+            "total": len(suggestions),
+        }
+    )
+
+
+@lazy_schema("accounts.docs.simple.PHONE_VALIDATION_SIMPLE_SCHEMA")
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([ValidationRateThrottle])
 def validate_phone(request):
     """
     API endpoint para validar telefone brasileiro
@@ -178,9 +243,10 @@ def validate_phone(request):
         )
 
 
-@CEP_VALIDATION_SIMPLE_SCHEMA
+@lazy_schema("accounts.docs.simple.CEP_VALIDATION_SIMPLE_SCHEMA")
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([ValidationRateThrottle])
 def validate_cep(request):
     """
     API endpoint para validar CEP brasileiro
@@ -210,3 +276,225 @@ def validate_cep(request):
             {"cep": cep, "valid": False, "error": str(e)},
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+
+@lazy_schema("accounts.docs.simple.CEP_LOOKUP_SIMPLE_SCHEMA")
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([ValidationRateThrottle])
+def lookup_cep(request):
+    """
+    API endpoint para consultar os bairros atendidos por um CEP
+
+    Usa o índice local de faixas de CEP de Florianópolis (sem consulta externa).
+    O campo ``bairro`` vem preenchido quando a faixa atende um único bairro.
+    """
+    cep = request.GET.get("cep", "").strip()
+
+    if not cep:
+        return Response(
+            {"error": "CEP é obrigatório"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        validate_cep_value(cep)
+    except ValidationError as e:
+        return Response(
+            {"cep": cep, "error": _error_message(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    cep_clean = clean_cep(cep)
+
+    if not is_florianopolis_cep(cep_clean):
+        return Response(
+            {
+                "cep": cep_clean,
+                "found": False,
+                "error": "CEP não pertence a Florianópolis",
+            },
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    neighborhoods = lookup_neighborhoods(cep_clean)
+
+    if not neighborhoods:
+        return Response(
+            {
+                "cep": cep_clean,
+                "found": False,
+                "error": "Faixa de CEP não cadastrada",
+            },
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(
+        {
+            "cep": cep_clean,
+            "cep_formatted": format_cep(cep_clean),
+            "found": True,
+            "bairros": list(neighborhoods),
+            "bairro": neighborhoods[0] if len(neighborhoods) == 1 else None,
+        }
+    )
+
+
+BATCH_FIELDS = ("cpf", "phone", "cep", "bairro", "username", "email")
+UNIQUE_FIELDS = ("cpf", "username", "email")
+
+
+def _error_message(error):
+    if isinstance(error, ValidationError):
+        return " ".join(error.messages)
+    return str(error)
+
+
+def _validate_record_fields(record):
+    """
+    Valida o formato dos campos de um registro (sem consultar o banco)
+
+    Retorna o resultado por campo e os valores normalizados dos campos únicos.
+    """
+    fields = {}
+    unique_values = {}
+
+    for field in BATCH_FIELDS:
+        if field not in record:
+            continue
+
+        value = str(record.get(field) or "").strip()
+        result = {"value": value, "valid": True}
+
+        try:
+            if field == "cpf":
+                value = re.sub(r"[^0-9]", "", value)
+                validate_cpf(value)
+                result["formatted"] = format_cpf(value)
+            elif field == "phone":
+                validate_phone_number(value)
+                result["formatted"] = format_phone(value)
+            elif field == "cep":
+                validate_cep_value(value)
+                result["formatted"] = format_cep(value)
+            elif field == "bairro":
+                if not value:
+                    raise ValidationError("Bairro é obrigatório.")
+                validate_florianopolis_neighborhood(value)
+            elif field == "username":
+                if not value:
+                    raise ValidationError("Nome de usuário é obrigatório.")
+                User._meta.get_field("username").run_validators(value)
+            elif field == "email":
+                validate_email(value)
+        except Exception as e:
+            result["valid"] = False
+            result["error"] = _error_message(e)
+        else:
+            if field in UNIQUE_FIELDS:
+                unique_values[field] = value
+
+        fields[field] = result
+
+    cep, bairro = fields.get("cep"), fields.get("bairro")
+    if cep and bairro and cep["valid"] and bairro["valid"]:
+        try:
+            _, aviso = resolve_cep_neighborhood(cep["value"], bairro["value"])
+        except ValidationError as e:
+            cep["valid"] = False
+            cep["error"] = _error_message(e)
+        else:
+            if aviso:
+                bairro["warning"] = aviso
+
+    return fields, unique_values
+
+
+@lazy_schema("accounts.docs.simple.BATCH_VALIDATION_SIMPLE_SCHEMA")
+@api_view(["POST"])
+@permission_classes([permissions.AllowAny])
+@throttle_classes(
+    [ValidationRateThrottle, CPFCheckRateThrottle, BatchValidationRateThrottle]
+)
+def validate_batch(request):
+    """
+    API endpoint para validar vários campos (ou registros) de uma vez
+
+    Aceita um objeto com qualquer subconjunto de cpf, phone, cep, bairro,
+    username e email, ou uma lista desses objetos (apenas para a equipe e
+    parceiros autorizados; cada registro conta na taxa ``validation_batch``).
+    As verificações de unicidade de CPF, username e email de
+    todos os registros são resolvidas em uma única consulta.
+    """
+    data = request.data
+    many = isinstance(data, list)
+    records = data if many else [data]
+
+    if not records or not all(isinstance(record, dict) for record in records):
+        return Response(
+            {"error": "Envie um objeto ou uma lista de objetos com os campos"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if many and not request.user.is_authenticated:
+        return Response(
+            {"error": "Validação em lote requer autenticação"},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    if many and not can_validate_in_bulk(request.user):
+        return Response(
+            {"error": "Validação em lote restrita a parceiros autorizados"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    max_items = getattr(settings, "VALIDATION_BATCH_MAX_ITEMS", 500)
+    if len(records) > max_items:
+        return Response(
+            {"error": f"Máximo de {max_items} registros por requisição"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    validated = [_validate_record_fields(record) for record in records]
+
+    unavailable = find_unavailable(
+        **{
+            f"{field}s": [values[field] for _, values in validated if field in values]
+            for field in UNIQUE_FIELDS
+        }
+    )
+
+    seen = {field: set() for field in UNIQUE_FIELDS}
+    results = []
+
+    for fields, values in validated:
+        for field, value in values.items():
+            result = fields[field]
+            result["available"] = value not in unavailable[field]
+
+            if not result["available"]:
+                result["valid"] = False
+                result["error"] = "Já cadastrado no sistema."
+            elif value in seen[field]:
+                result["available"] = False
+                result["valid"] = False
+                result["error"] = "Valor repetido no lote."
+
+            seen[field].add(value)
+
+        results.append(
+            {
+                "valid": all(result["valid"] for result in fields.values()),
+                "fields": fields,
+            }
+        )
+
+    if not many:
+        return Response(results[0])
+
+    return Response(
+        {
+            "total": len(results),
+            "valid": sum(1 for result in results if result["valid"]),
+            "results": results,
+        }
+    )
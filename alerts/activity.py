@@ -0,0 +1,193 @@
+"""
+Manutenção do resumo de atividade dos usuários (accounts.UserActivity)
+
+A criação ou reativação de um alerta ou comentário apenas incrementa o
+contador e avança a data do último registro; a desativação ou exclusão de um
+registro ativo decrementa o contador e, só se ele era o último, busca a data
+do anterior. Alterações que não mudam ``ativo`` nem o usuário não tocam no
+resumo. ``recompute`` refaz o resumo de um usuário com uma agregação sobre os
+seus registros (atualizações em massa), e ``rebuild_all`` recalcula tudo,
+para corrigir divergências de atualizações que não disparam sinais.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from accounts.models import UserActivity
+
+from .models import Alert, Comment
+
+ACTIVITY_FIELDS = {
+    Alert: ('total_alertas', 'ultimo_alerta'),
+    Comment: ('total_comentarios', 'ultimo_comentario'),
+}
+
+
+def record_created(model, user_id, created_at):
+    """
+    Contabiliza um registro recém-criado do usuário
+    """
+    total_field, last_field = ACTIVITY_FIELDS[model]
+
+    updated = UserActivity.objects.filter(user_id=user_id).update(**{
+        total_field: F(total_field) + 1,
+        last_field: Greatest(Coalesce(last_field, created_at), created_at),
+        'dormente': False,
+        'data_atualizacao': timezone.now(),
+    })
+
+    if not updated:
+        recompute_user(user_id)
+
+
+def record_removed(model, user_id, created_at):
+    """
+    Descontabiliza um registro ativo que foi desativado ou excluído
+
+    Só atualiza um resumo já existente (a exclusão pode fazer parte da
+    exclusão do próprio usuário).
+    """
+    total_field, last_field = ACTIVITY_FIELDS[model]
+    previous = (
+        model.objects.filter(user_id=OuterRef('user_id'), ativo=True)
+        .order_by('-data_criacao')
+        .values('data_criacao')[:1]
+    )
+
+    UserActivity.objects.filter(user_id=user_id).update(**{
+        total_field: Greatest(F(total_field) - 1, 0),
+        last_field: Case(
+            When(**{f'{last_field}__lte': created_at}, then=Subquery(previous)),
+            default=F(last_field),
+        ),
+        'data_atualizacao': timezone.now(),
+    })
+
+
+def _stats(model, user_id):
+    return model.objects.filter(user_id=user_id, ativo=True).aggregate(
+        total=Count('id'),
+        ultimo=Max('data_criacao'),
+    )
+
+
+def recompute(model, user_id, create=True):
+    """
+    Recalcula o resumo de um tipo de registro para um usuário
+
+    Se o usuário ainda não tem resumo, ele é criado com os dois contadores
+    (``recompute_user``). Com ``create=False`` só atualiza um resumo já
+    existente (usado nas exclusões, que podem fazer parte da exclusão do
+    próprio usuário).
+    """
+    total_field, last_field = ACTIVITY_FIELDS[model]
+    stats = _stats(model, user_id)
+
+    updated = UserActivity.objects.filter(user_id=user_id).update(**{
+        total_field: stats['total'],
+        last_field: stats['ultimo'],
+        'data_atualizacao': timezone.now(),
+    })
+
+    if not updated and create:
+        recompute_user(user_id)
+
+
+def recompute_user(user_id):
+    """
+    Recalcula o resumo completo (alertas e comentários) de um usuário,
+    criando-o se necessário
+    """
+    values = {}
+    for model, (total_field, last_field) in ACTIVITY_FIELDS.items():
+        stats = _stats(model, user_id)
+        values[total_field] = stats['total']
+        values[last_field] = stats['ultimo']
+
+    UserActivity.objects.update_or_create(user_id=user_id, defaults=values)
+
+
+def rebuild_all(batch_size=1000):
+    """
+    Recalcula o resumo de todos os usuários e retorna quantos foram gravados
+
+    Os usuários são processados em lotes de ``batch_size``: as agregações e
+    a gravação de cada lote consideram só os usuários dele.
+    """
+    user_ids = User.objects.order_by('id').values_list('id', flat=True)
+    batch = []
+    total = 0
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) == batch_size:
+            total += _rebuild_batch(batch)
+            batch = []
+    if batch:
+        total += _rebuild_batch(batch)
+    return total
+
+
+def _rebuild_batch(user_ids):
+    stats = {}
+    for model in ACTIVITY_FIELDS:
+        stats[model] = {
+            row['user_id']: row
+            for row in model.objects.filter(ativo=True, user_id__in=user_ids)
+            .values('user_id')
+            .annotate(total=Count('id'), ultimo=Max('data_criacao'))
+            .order_by()
+        }
+
+    empty = {'total': 0, 'ultimo': None}
+    now = timezone.now()
+    rows = []
+    for user_id in user_ids:
+        values = {}
+        for model, (total_field, last_field) in ACTIVITY_FIELDS.items():
+            row = stats[model].get(user_id, empty)
+            values[total_field] = row['total']
+            values[last_field] = row['ultimo']
+        rows.append(UserActivity(user_id=user_id, data_atualizacao=now, **values))
+
+    UserActivity.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=[
+            'total_alertas',
+            'ultimo_alerta',
+            'total_comentarios',
+            'ultimo_comentario',
+            'data_atualizacao',
+        ],
+    )
+    return len(rows)
+
+
+def mark_dormant(days):
+    """
+    Marca como dormentes os usuários sem alerta, comentário ou login há
+    ``days`` dias (e cadastrados há mais tempo que isso)
+
+    Retorna (marcados, reativados).
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+
+    inativo = (
+        (Q(ultimo_alerta__isnull=True) | Q(ultimo_alerta__lt=cutoff))
+        & (Q(ultimo_comentario__isnull=True) | Q(ultimo_comentario__lt=cutoff))
+        & (Q(user__last_login__isnull=True) | Q(user__last_login__lt=cutoff))
+        & Q(user__date_joined__lt=cutoff)
+    )
+
+    marcados = UserActivity.objects.filter(inativo, dormente=False).update(
+        dormente=True, data_atualizacao=timezone.now()
+    )
+    reativados = UserActivity.objects.filter(~inativo, dormente=True).update(
+        dormente=False, data_atualizacao=timezone.now()
+    )
+    return marcados, reativados
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Alert, Post, Comment
+from .models import Alert, Post, Comment, StatsSnapshot
 
 
 @admin.register(Alert)
@@ -289,3 +289,12 @@ class CommentAdmin(admin.ModelAdmin):
         updated = queryset.update(ativo=False)
         self.message_user(request, f'{updated} comentário(s) desativado(s).')
     desativar_comentarios.short_description = 'Desativar comentários selecionados'
+
+
+@admin.register(StatsSnapshot)
+class StatsSnapshotAdmin(admin.ModelAdmin):
+    """
+    Admin para consultar os snapshots de estatísticas
+    """
+    list_display = ('chave', 'generated_at')
+    readonly_fields = ('chave', 'dados', 'generated_at')
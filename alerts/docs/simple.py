@@ -3,7 +3,8 @@ Schemas simplificados para documentação das APIs do app alerts
 """
 
 from drf_spectacular.utils import extend_schema
-from drf_spectacular.openapi import OpenApiResponse
+from drf_spectacular.openapi import OpenApiParameter, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
 from rest_framework import status
 
 ALERT_CREATE_SIMPLE_SCHEMA = extend_schema(
@@ -313,3 +314,43 @@ ADMIN_COMMENT_MODERATE_SIMPLE_SCHEMA = extend_schema(
     }
 )
 
+ADMIN_SPAM_CLUSTER_LIST_SIMPLE_SCHEMA = extend_schema(
+    operation_id="admin_spam_cluster_list",
+    summary="Listar Clusters de Spam",
+    description="Listar grupos de comentários quase idênticos publicados por contas diferentes",
+    tags=["Administração"],
+    parameters=[
+        OpenApiParameter(
+            name="min_usuarios",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description="Mínimo de contas diferentes no cluster (padrão: 2)",
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(description="Lista de clusters"),
+        400: OpenApiResponse(description="min_usuarios inválido"),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão de administrador"),
+    }
+)
+
+ADMIN_SPAM_CLUSTER_MODERATE_SIMPLE_SCHEMA = extend_schema(
+    operation_id="admin_spam_cluster_moderate",
+    summary="Moderar Cluster de Spam",
+    description=(
+        "Aprovar, rejeitar ou excluir todos os comentários de um cluster. "
+        "O corpo traz a ação e os comentario_ids vistos na listagem; se o "
+        "cluster tiver mudado, nada é alterado e a resposta é 409."
+    ),
+    tags=["Administração"],
+    request=OpenApiTypes.OBJECT,
+    responses={
+        200: OpenApiResponse(description="Cluster moderado"),
+        400: OpenApiResponse(description="Ação ou comentario_ids inválidos"),
+        404: OpenApiResponse(description="Cluster não encontrado"),
+        409: OpenApiResponse(description="Os comentários do cluster mudaram"),
+        401: OpenApiResponse(description="Não autenticado"),
+        403: OpenApiResponse(description="Sem permissão de administrador"),
+    }
+)
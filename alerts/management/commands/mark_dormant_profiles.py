@@ -0,0 +1,52 @@
+"""
+Marca como dormentes os usuários sem atividade recente
+
+Usa o resumo de ``accounts.UserActivity`` (mantido pelos sinais de
+``alerts.signals``): um usuário é dormente quando não tem alerta, comentário
+nem login nos últimos ``--days`` dias. ``--rebuild`` recalcula antes o resumo
+de todos os usuários, corrigindo divergências de atualizações em massa.
+
+O status ``ativo`` do perfil não é alterado.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from alerts.activity import mark_dormant, rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Marca como dormentes os usuários sem alertas, comentários ou login recentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=180,
+            help='Dias sem atividade para considerar o usuário dormente (padrão: 180)',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recalcula o resumo de atividade de todos os usuários antes de marcar',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tamanho dos lotes de gravação no --rebuild (padrão: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days deve ser maior que zero')
+
+        if options['rebuild']:
+            total = rebuild_all(batch_size=options['batch_size'])
+            self.stdout.write(f"Resumo de atividade recalculado para {total} usuários")
+
+        marcados, reativados = mark_dormant(options['days'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{marcados} usuários marcados como dormentes, {reativados} reativados"
+            )
+        )
@@ -0,0 +1,21 @@
+"""
+Remove as assinaturas de comentários fora da janela da detecção de spam
+
+Deve ser agendado periodicamente (ex.: cron de hora em hora). Assinaturas
+antigas já são ignoradas na comparação; o comando só libera espaço e apaga
+os clusters que ficaram sem comentários.
+"""
+
+from django.core.management.base import BaseCommand
+
+from alerts.spam import purge_signatures
+
+
+class Command(BaseCommand):
+    help = 'Remove as assinaturas de spam fora da janela de detecção'
+
+    def handle(self, *args, **options):
+        signatures, clusters = purge_signatures()
+        self.stdout.write(
+            self.style.SUCCESS(f'{signatures} assinaturas e {clusters} clusters removidos')
+        )
@@ -0,0 +1,34 @@
+"""
+Recalcula os snapshots de estatísticas de posts e comentários
+
+Deve ser agendado periodicamente (ex.: cron a cada poucos minutos) para que
+os painéis administrativos sempre encontrem um snapshot recente.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from alerts.stats import STATS_BUILDERS, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os snapshots de estatísticas usados pelas APIs de stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'chaves',
+            nargs='*',
+            help=f"Snapshots a recalcular ({', '.join(STATS_BUILDERS)}). Padrão: todos",
+        )
+
+    def handle(self, *args, **options):
+        chaves = options['chaves'] or list(STATS_BUILDERS)
+
+        invalidas = [chave for chave in chaves if chave not in STATS_BUILDERS]
+        if invalidas:
+            raise CommandError(f"Snapshots desconhecidos: {', '.join(invalidas)}")
+
+        for chave in chaves:
+            snapshot = refresh_snapshot(chave)
+            self.stdout.write(
+                self.style.SUCCESS(f"Snapshot '{chave}' gerado em {snapshot.generated_at.isoformat()}")
+            )
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("alerts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "chave",
+                    models.CharField(
+                        help_text="Identificador do conjunto de estatísticas (ex.: posts, comments)",
+                        max_length=50,
+                        unique=True,
+                        verbose_name="Chave",
+                    ),
+                ),
+                ("dados", models.JSONField(default=dict, verbose_name="Dados")),
+                (
+                    "generated_at",
+                    models.DateTimeField(
+                        help_text="Momento em que as estatísticas foram calculadas",
+                        verbose_name="Gerado em",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Snapshot de Estatísticas",
+                "verbose_name_plural": "Snapshots de Estatísticas",
+            },
+        ),
+    ]
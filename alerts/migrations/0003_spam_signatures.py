@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("alerts", "0002_statssnapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpamCluster",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Data de Criação"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Cluster de Spam",
+                "verbose_name_plural": "Clusters de Spam",
+            },
+        ),
+        migrations.CreateModel(
+            name="CommentSignature",
+            fields=[
+                (
+                    "comment",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="spam_signature",
+                        serialize=False,
+                        to="alerts.comment",
+                        verbose_name="Comentário",
+                    ),
+                ),
+                (
+                    "assinatura",
+                    models.JSONField(
+                        help_text="Mínimos das funções de hash do MinHash",
+                        verbose_name="Assinatura",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(db_index=True, verbose_name="Data de Criação"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+                (
+                    "cluster",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="assinaturas",
+                        to="alerts.spamcluster",
+                        verbose_name="Cluster",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Assinatura de Comentário",
+                "verbose_name_plural": "Assinaturas de Comentários",
+            },
+        ),
+        migrations.CreateModel(
+            name="CommentSignatureBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chave", models.BigIntegerField(db_index=True, verbose_name="Chave")),
+                (
+                    "assinatura",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="faixas",
+                        to="alerts.commentsignature",
+                        verbose_name="Assinatura",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Faixa de Assinatura",
+                "verbose_name_plural": "Faixas de Assinaturas",
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def backfill_user_activity(apps, schema_editor):
+    """
+    Cria o resumo de atividade dos usuários que ainda não têm um
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    UserActivity = apps.get_model("accounts", "UserActivity")
+    Alert = apps.get_model("alerts", "Alert")
+    Comment = apps.get_model("alerts", "Comment")
+
+    def summary(model):
+        return {
+            row["user_id"]: row
+            for row in model.objects.filter(ativo=True)
+            .values("user_id")
+            .annotate(total=Count("id"), ultimo=Max("data_criacao"))
+            .order_by()
+        }
+
+    alertas = summary(Alert)
+    comentarios = summary(Comment)
+    empty = {"total": 0, "ultimo": None}
+
+    rows = []
+    for user_id in (
+        User.objects.filter(activity__isnull=True).values_list("id", flat=True).iterator()
+    ):
+        alerta = alertas.get(user_id, empty)
+        comentario = comentarios.get(user_id, empty)
+        rows.append(
+            UserActivity(
+                user_id=user_id,
+                total_alertas=alerta["total"],
+                ultimo_alerta=alerta["ultimo"],
+                total_comentarios=comentario["total"],
+                ultimo_comentario=comentario["ultimo"],
+            )
+        )
+
+    UserActivity.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("alerts", "0003_spam_signatures"),
+        ("accounts", "0005_useractivity"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_activity, migrations.RunPython.noop),
+    ]
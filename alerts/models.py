@@ -297,5 +297,124 @@ class Comment(models.Model):
     def get_replies_count(self):
         """
         Retorna o número de respostas a este comentário
+        
+        Usa a anotação ``respostas_ativas`` quando o queryset a trouxer.
         """
+        if hasattr(self, 'respostas_ativas'):
+            return self.respostas_ativas
         return self.replies.filter(ativo=True, aprovado=True).count()
+
+
+class StatsSnapshot(models.Model):
+    """
+    Snapshot pré-calculado das estatísticas exibidas nos painéis administrativos
+    """
+    
+    chave = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name="Chave",
+        help_text="Identificador do conjunto de estatísticas (ex.: posts, comments)"
+    )
+    
+    dados = models.JSONField(
+        default=dict,
+        verbose_name="Dados"
+    )
+    
+    generated_at = models.DateTimeField(
+        verbose_name="Gerado em",
+        help_text="Momento em que as estatísticas foram calculadas"
+    )
+    
+    class Meta:
+        verbose_name = "Snapshot de Estatísticas"
+        verbose_name_plural = "Snapshots de Estatísticas"
+    
+    def __str__(self):
+        return f"{self.chave} ({self.generated_at.strftime('%d/%m/%Y %H:%M')})"
+
+
+class SpamCluster(models.Model):
+    """
+    Grupo de comentários quase idênticos publicados por contas diferentes
+    """
+    
+    data_criacao = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Data de Criação"
+    )
+    
+    class Meta:
+        verbose_name = "Cluster de Spam"
+        verbose_name_plural = "Clusters de Spam"
+    
+    def __str__(self):
+        return f"Cluster de spam {self.id}"
+
+
+class CommentSignature(models.Model):
+    """
+    Assinatura MinHash de um comentário recente, usada na detecção de spam
+    """
+    
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Comentário",
+        related_name="spam_signature"
+    )
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Usuário",
+        related_name="+"
+    )
+    
+    assinatura = models.JSONField(
+        verbose_name="Assinatura",
+        help_text="Mínimos das funções de hash do MinHash"
+    )
+    
+    cluster = models.ForeignKey(
+        SpamCluster,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Cluster",
+        related_name="assinaturas"
+    )
+    
+    data_criacao = models.DateTimeField(
+        db_index=True,
+        verbose_name="Data de Criação"
+    )
+    
+    class Meta:
+        verbose_name = "Assinatura de Comentário"
+        verbose_name_plural = "Assinaturas de Comentários"
+
+
+class CommentSignatureBand(models.Model):
+    """
+    Faixa (LSH) de uma assinatura; assinaturas com uma faixa igual são
+    candidatas a duplicadas
+    """
+    
+    assinatura = models.ForeignKey(
+        CommentSignature,
+        on_delete=models.CASCADE,
+        verbose_name="Assinatura",
+        related_name="faixas"
+    )
+    
+    chave = models.BigIntegerField(
+        db_index=True,
+        verbose_name="Chave"
+    )
+    
+    class Meta:
+        verbose_name = "Faixa de Assinatura"
+        verbose_name_plural = "Faixas de Assinaturas"
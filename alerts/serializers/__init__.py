@@ -3,8 +3,8 @@ Serializers modulares para o app alerts
 """
 
 from .alert import AlertSerializer, AlertCreateSerializer, AlertUpdateSerializer, AlertListSerializer, AlertStatsSerializer
-from .post import PostSerializer, PostCreateSerializer, PostUpdateSerializer, PostListSerializer, PostStatsSerializer
-from .comment import CommentSerializer, CommentCreateSerializer, CommentUpdateSerializer, CommentListSerializer, CommentStatsSerializer
+from .post import PostSerializer, PostCreateSerializer, PostUpdateSerializer, PostListSerializer, PostStatsSerializer, with_comment_counts
+from .comment import CommentSerializer, CommentCreateSerializer, CommentUpdateSerializer, CommentListSerializer, CommentStatsSerializer, with_comment_tree, with_replies_count
 
 __all__ = [
     'AlertSerializer',
@@ -22,4 +22,7 @@ __all__ = [
     'CommentUpdateSerializer',
     'CommentListSerializer',
     'CommentStatsSerializer',
+    'with_comment_counts',
+    'with_comment_tree',
+    'with_replies_count',
 ]
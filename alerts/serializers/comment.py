@@ -4,10 +4,38 @@ Serializers para o modelo Comment
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Count, Prefetch, Q
 from ..models import Comment, Post
 from ..validators import validate_comment_content
 
 
+def with_replies_count(queryset):
+    """
+    Carrega o usuário e anota o total de respostas ativas e aprovadas
+    (usado por ``Comment.get_replies_count``)
+    """
+    return queryset.select_related('user').annotate(
+        respostas_ativas=Count(
+            'replies', filter=Q(replies__ativo=True, replies__aprovado=True)
+        )
+    )
+
+
+def with_comment_tree(queryset):
+    """
+    Prepara o queryset para o ``CommentSerializer``: usuário, post, autor do
+    comentário pai e respostas aprovadas carregados de uma vez
+    """
+    replies = with_replies_count(
+        Comment.objects.filter(ativo=True, aprovado=True).order_by('data_criacao')
+    )
+    return with_replies_count(
+        queryset.select_related('post', 'parent__user')
+    ).prefetch_related(
+        Prefetch('replies', queryset=replies, to_attr='respostas_aprovadas')
+    )
+
+
 class UserCommentSerializer(serializers.ModelSerializer):
     """
     Serializer básico para dados do usuário em comentários
@@ -47,6 +75,10 @@ class CommentSerializer(serializers.ModelSerializer):
         return None
     
     def get_replies(self, obj):
+        if hasattr(obj, 'respostas_aprovadas'):
+            return CommentListSerializer(
+                obj.respostas_aprovadas, many=True, context=self.context
+            ).data
         if hasattr(obj, 'replies'):
             replies = obj.replies.filter(ativo=True, aprovado=True).order_by('data_criacao')
             return CommentListSerializer(replies, many=True, context=self.context).data
@@ -203,4 +235,5 @@ class CommentStatsSerializer(serializers.Serializer):
     comentarios_semana = serializers.IntegerField()
     usuarios_mais_ativos = serializers.ListField()
     posts_mais_comentados = serializers.ListField()
+    generated_at = serializers.DateTimeField()
 
@@ -4,11 +4,30 @@ Serializers para o modelo Post
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Count, Q
 from ..models import Post, Alert
 from ..validators import validate_post_content
 from .alert import AlertListSerializer
 
 
+def with_comment_counts(queryset):
+    """
+    Carrega o autor e anota o total de comentários ativos e aprovados, para
+    que os serializers de Post não façam uma consulta por post
+    """
+    return queryset.select_related('autor').annotate(
+        comentarios_ativos=Count(
+            'comments', filter=Q(comments__ativo=True, comments__aprovado=True)
+        )
+    )
+
+
+def _count_comments(post):
+    if hasattr(post, 'comentarios_ativos'):
+        return post.comentarios_ativos
+    return post.comments.filter(ativo=True, aprovado=True).count()
+
+
 class PostSerializer(serializers.ModelSerializer):
     """
     Serializer completo para Post
@@ -33,7 +52,7 @@ class PostSerializer(serializers.ModelSerializer):
         return obj.autor.get_full_name() or obj.autor.username
     
     def get_comentarios_count(self, obj):
-        return obj.comments.filter(ativo=True, aprovado=True).count()
+        return _count_comments(obj)
     
     def get_tempo_desde_publicacao(self, obj):
         if not obj.data_publicacao:
@@ -133,7 +152,7 @@ class PostListSerializer(serializers.ModelSerializer):
         return obj.autor.get_full_name() or obj.autor.username
     
     def get_comentarios_count(self, obj):
-        return obj.comments.filter(ativo=True, aprovado=True).count()
+        return _count_comments(obj)
     
     def get_tempo_desde_publicacao(self, obj):
         if not obj.data_publicacao:
@@ -178,4 +197,5 @@ class PostStatsSerializer(serializers.Serializer):
     total_comentarios = serializers.IntegerField()
     posts_mais_visualizados = serializers.ListField()
     posts_mais_comentados = serializers.ListField()
+    generated_at = serializers.DateTimeField()
 
@@ -0,0 +1,74 @@
+"""
+Sinais que mantêm o resumo de atividade dos usuários (accounts.UserActivity)
+
+O estado contado de cada registro (usuário e ``ativo``) é guardado quando ele
+é carregado, para que uma gravação só altere o resumo se esse estado mudou.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import activity
+from .models import Alert, Comment
+
+
+def _counted_state(instance):
+    # Lido do __dict__ para não carregar campos adiados
+    return instance.__dict__.get('user_id'), instance.__dict__.get('ativo')
+
+
+@receiver(post_init, sender=Alert)
+@receiver(post_init, sender=Comment)
+def remember_activity_state(sender, instance, **kwargs):
+    """
+    Guarda o usuário e o ``ativo`` com que o registro foi carregado
+    """
+    instance._activity_state = _counted_state(instance)
+
+
+@receiver(post_save, sender=Alert)
+@receiver(post_save, sender=Comment)
+def update_activity_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Incrementa o resumo na criação; na alteração, aplica a diferença quando
+    ``ativo`` ou o usuário mudaram
+    """
+    if kwargs.get('raw'):
+        return
+
+    previous = instance._activity_state
+    current = _counted_state(instance)
+    instance._activity_state = current
+
+    if created:
+        if instance.ativo:
+            activity.record_created(sender, instance.user_id, instance.data_criacao)
+        return
+
+    if update_fields is not None and not {'ativo', 'user', 'user_id'} & set(update_fields):
+        return
+    if previous == current:
+        return
+
+    old_user_id, was_active = previous
+    if was_active is None or old_user_id is None:
+        # Estado anterior desconhecido (campo adiado): recalcula
+        activity.recompute(sender, instance.user_id)
+        if old_user_id not in (None, instance.user_id):
+            activity.recompute(sender, old_user_id, create=False)
+        return
+
+    if was_active:
+        activity.record_removed(sender, old_user_id, instance.data_criacao)
+    if instance.ativo:
+        activity.record_created(sender, instance.user_id, instance.data_criacao)
+
+
+@receiver(post_delete, sender=Alert)
+@receiver(post_delete, sender=Comment)
+def update_activity_on_delete(sender, instance, **kwargs):
+    """
+    Descontabiliza o registro excluído, se ele estava ativo
+    """
+    if instance.ativo:
+        activity.record_removed(sender, instance.user_id, instance.data_criacao)
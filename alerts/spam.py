@@ -0,0 +1,343 @@
+"""
+Detecção de spam coordenado em comentários usando MinHash e LSH
+
+Cada comentário recente tem a assinatura MinHash gravada em
+``CommentSignature`` e as faixas de LSH em ``CommentSignatureBand``. Um
+comentário novo é comparado apenas com os candidatos que compartilham alguma
+faixa (uma consulta indexada), o que permite encontrar textos quase
+idênticos publicados por contas diferentes em qualquer worker. Os duplicados
+formam um ``SpamCluster``, cujo id é o mesmo para todos os processos.
+
+As assinaturas mais antigas que ``WINDOW_SECONDS`` deixam de ser
+consideradas; ``python manage.py purge_spam_signatures`` as remove.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .models import CommentSignature, CommentSignatureBand, SpamCluster
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WINDOW_SECONDS': 6 * 60 * 60,
+    # Candidatos comparados por comentário (os mais recentes)
+    'MAX_CANDIDATES': 500,
+    'SIMILARITY_THRESHOLD': 0.7,
+    'HOLD_FOR_REVIEW': True,
+    'BANDS': 8,
+    'ROWS': 4,
+    'SHINGLE_SIZE': 2,
+}
+
+_MAX_HASH = (1 << 32) - 1
+
+
+class ClusterChanged(Exception):
+    """
+    Os comentários do cluster não são os informados na moderação
+    """
+
+    def __init__(self, comment_ids):
+        super().__init__('Os comentários do cluster mudaram')
+        self.comment_ids = comment_ids
+
+
+def get_spam_settings():
+    """
+    Retorna as configurações de detecção de spam mescladas com os padrões
+    """
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'SPAM_DETECTION', {}))
+    return config
+
+
+def normalize_text(text):
+    """
+    Normaliza o texto removendo acentos, pontuação e caixa
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def shingles(text, size):
+    """
+    Retorna o conjunto de hashes dos shingles de palavras do texto
+    """
+    words = normalize_text(text).split()
+    if len(words) <= size:
+        return {zlib.crc32(' '.join(words).encode())}
+    return {
+        zlib.crc32(' '.join(words[i:i + size]).encode())
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """
+    Assinaturas MinHash e faixas de LSH
+
+    Cada comentário vira uma assinatura de ``bands * rows`` mínimos. A
+    assinatura é dividida em ``bands`` faixas; dois comentários são candidatos
+    quando coincidem em pelo menos uma faixa, e são considerados duplicados
+    quando a similaridade estimada atinge o limite configurado. As máscaras
+    vêm de uma semente fixa, então todos os processos geram as mesmas
+    assinaturas.
+    """
+
+    def __init__(self, bands=8, rows=4, shingle_size=2, seed=1):
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._masks = [rng.randrange(0, _MAX_HASH) for _ in range(bands * rows)]
+
+    def signature(self, text):
+        """
+        Calcula a assinatura MinHash do texto
+
+        Cada função de hash é o CRC32 do shingle combinado por XOR com uma
+        máscara aleatória, o que mantém o cálculo dos mínimos em código C.
+        """
+        hashes = shingles(text, self.shingle_size)
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """
+        Estima a similaridade de Jaccard entre duas assinaturas
+        """
+        equal = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return equal / len(sig_a)
+
+    def band_keys(self, signature):
+        """
+        Chaves inteiras (64 bits com sinal) das faixas da assinatura
+        """
+        keys = []
+        for band in range(self.bands):
+            start = band * self.rows
+            values = ','.join(map(str, signature[start:start + self.rows]))
+            digest = hashlib.blake2b(f'{band}:{values}'.encode(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'big', signed=True))
+        return keys
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher():
+    """
+    Retorna o MinHasher do processo, criando-o na primeira chamada
+    """
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                config = get_spam_settings()
+                _hasher = MinHasher(
+                    bands=config['BANDS'],
+                    rows=config['ROWS'],
+                    shingle_size=config['SHINGLE_SIZE'],
+                )
+    return _hasher
+
+
+def _window_start(config, now=None):
+    return (now or timezone.now()) - timedelta(seconds=config['WINDOW_SECONDS'])
+
+
+def find_duplicates(user_id, text, now=None):
+    """
+    Procura comentários recentes de outros usuários semelhantes ao texto
+
+    Retorna ``(assinatura, [(comment_id, cluster_id)])``, para ser passado a
+    ``record_comment`` depois que o comentário for gravado. Com a detecção
+    desabilitada, retorna ``(None, [])``.
+    """
+    config = get_spam_settings()
+    if not config['ENABLED']:
+        return None, []
+
+    hasher = get_hasher()
+    signature = hasher.signature(text)
+    candidates = (
+        CommentSignature.objects
+        .filter(
+            comment_id__in=CommentSignatureBand.objects
+            .filter(chave__in=hasher.band_keys(signature))
+            .values('assinatura_id'),
+            data_criacao__gte=_window_start(config, now),
+        )
+        .exclude(user_id=user_id)
+        .order_by('-data_criacao')
+        .values_list('comment_id', 'assinatura', 'cluster_id')[:config['MAX_CANDIDATES']]
+    )
+
+    matches = []
+    rest = []
+    for comment_id, other, cluster_id in candidates:
+        if hasher.similarity(signature, other) >= config['SIMILARITY_THRESHOLD']:
+            matches.append((comment_id, cluster_id))
+        elif cluster_id is not None:
+            rest.append((comment_id, cluster_id))
+
+    # Membros de um cluster já encontrado entram junto, mesmo abaixo do limite
+    matched_clusters = {cluster_id for _, cluster_id in matches if cluster_id}
+    matches += [match for match in rest if match[1] in matched_clusters]
+    return signature, matches
+
+
+def record_comment(comment, signature, matches, now=None, replace=False):
+    """
+    Grava a assinatura do comentário e o junta ao cluster dos duplicados
+    encontrados por ``find_duplicates``
+
+    Com ``replace=True`` (edição do texto) a assinatura anterior do
+    comentário e as suas faixas são descartadas antes. Chamado dentro da
+    transação que grava o comentário, para que os dois fiquem juntos.
+    """
+    if signature is None:
+        return None
+
+    hasher = get_hasher()
+    with transaction.atomic(savepoint=False):
+        if replace:
+            CommentSignature.objects.filter(comment=comment).delete()
+        CommentSignature.objects.create(
+            comment=comment,
+            user_id=comment.user_id,
+            assinatura=list(signature),
+            data_criacao=now or timezone.now(),
+        )
+        CommentSignatureBand.objects.bulk_create([
+            CommentSignatureBand(assinatura_id=comment.id, chave=key)
+            for key in hasher.band_keys(signature)
+        ])
+        if matches:
+            return _merge_into_cluster(comment.id, matches)
+    return None
+
+
+def _merge_into_cluster(comment_id, matches):
+    cluster_ids = sorted({cluster_id for _, cluster_id in matches if cluster_id})
+    # Trava os clusters para que uma moderação simultânea não os apague
+    existing = list(
+        SpamCluster.objects.select_for_update()
+        .filter(id__in=cluster_ids)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+
+    if existing:
+        target_id = existing[0]
+        merged = existing[1:]
+        if merged:
+            CommentSignature.objects.filter(cluster_id__in=merged).update(cluster_id=target_id)
+            SpamCluster.objects.filter(id__in=merged).delete()
+    else:
+        target_id = SpamCluster.objects.create().id
+
+    members = [comment_id] + [match_id for match_id, _ in matches]
+    CommentSignature.objects.filter(comment_id__in=members).update(cluster_id=target_id)
+    return target_id
+
+
+def list_clusters(min_usuarios=2, now=None):
+    """
+    Retorna os clusters com comentários dentro da janela, do maior para o
+    menor
+    """
+    config = get_spam_settings()
+    since = _window_start(config, now)
+
+    clusters = list(
+        SpamCluster.objects
+        .filter(assinaturas__data_criacao__gte=since)
+        .annotate(
+            total_comentarios=Count('assinaturas', distinct=True),
+            total_usuarios=Count('assinaturas__user', distinct=True),
+            total_posts=Count('assinaturas__comment__post', distinct=True),
+            primeira_ocorrencia=Min('assinaturas__data_criacao'),
+            ultima_ocorrencia=Max('assinaturas__data_criacao'),
+        )
+        .filter(total_comentarios__gte=2, total_usuarios__gte=min_usuarios)
+        .order_by('-total_usuarios', '-total_comentarios', 'id')
+        .values(
+            'id', 'total_comentarios', 'total_usuarios', 'total_posts',
+            'primeira_ocorrencia', 'ultima_ocorrencia',
+        )
+    )
+    if not clusters:
+        return []
+
+    members = {}
+    for cluster_id, comment_id, user_id, conteudo in (
+        CommentSignature.objects
+        .filter(cluster_id__in=[c['id'] for c in clusters], data_criacao__gte=since)
+        .order_by('data_criacao', 'comment_id')
+        .values_list('cluster_id', 'comment_id', 'user_id', 'comment__conteudo')
+    ):
+        entry = members.setdefault(cluster_id, {'comments': [], 'users': set(), 'exemplo': conteudo})
+        entry['comments'].append(comment_id)
+        entry['users'].add(user_id)
+
+    for cluster in clusters:
+        entry = members[cluster['id']]
+        cluster['comentario_ids'] = sorted(entry['comments'])
+        cluster['usuario_ids'] = sorted(entry['users'])
+        cluster['exemplo'] = (entry['exemplo'] or '')[:200]
+    return clusters
+
+
+def resolve_cluster(cluster_id, comment_ids, now=None):
+    """
+    Encerra o cluster e retorna os ids dos comentários dele
+
+    ``comment_ids`` são os comentários que o moderador viu na listagem; se o
+    cluster tiver outros membros, levanta ``ClusterChanged`` sem alterar
+    nada. Retorna None se o cluster não existir. Chamado dentro da transação
+    que modera os comentários do cluster.
+    """
+    since = _window_start(get_spam_settings(), now)
+    with transaction.atomic(savepoint=False):
+        cluster = SpamCluster.objects.select_for_update().filter(id=cluster_id).first()
+        if cluster is None:
+            return None
+
+        members = set(
+            cluster.assinaturas
+            .filter(data_criacao__gte=since)
+            .values_list('comment_id', flat=True)
+        )
+        if members != set(comment_ids):
+            raise ClusterChanged(sorted(members))
+
+        cluster.delete()
+        return members
+
+
+def purge_signatures(now=None):
+    """
+    Remove as assinaturas fora da janela e os clusters sem membros
+    """
+    since = _window_start(get_spam_settings(), now)
+    _, signatures = CommentSignature.objects.filter(data_criacao__lt=since).delete()
+    _, clusters = SpamCluster.objects.filter(assinaturas__isnull=True).delete()
+    return (
+        signatures.get(CommentSignature._meta.label, 0),
+        clusters.get(SpamCluster._meta.label, 0),
+    )
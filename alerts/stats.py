@@ -0,0 +1,135 @@
+"""
+Cálculo e snapshots das estatísticas de posts e comentários
+
+As estatísticas são calculadas com agregações agrupadas no banco (número fixo
+de queries, independente da quantidade de posts) e gravadas em
+``StatsSnapshot``. As views servem o snapshot enquanto ele estiver dentro de
+``STATS_SNAPSHOT_MAX_AGE`` segundos; o comando ``refresh_stats_snapshots``
+os recalcula periodicamente.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Post, StatsSnapshot
+
+
+def compute_post_stats():
+    """
+    Calcula as estatísticas de posts
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    week_ago = now - timedelta(days=7)
+
+    stats = Post.objects.aggregate(
+        total_posts=Count('id'),
+        posts_publicados=Count('id', filter=Q(status='publicado')),
+        posts_rascunho=Count('id', filter=Q(status='rascunho')),
+        posts_hoje=Count('id', filter=Q(data_criacao__date=today)),
+        posts_semana=Count('id', filter=Q(data_criacao__gte=week_ago)),
+        total_visualizacoes=Coalesce(Sum('visualizacoes'), 0),
+    )
+
+    stats['total_comentarios'] = Comment.objects.filter(ativo=True, aprovado=True).count()
+
+    stats['posts_mais_visualizados'] = list(
+        Post.objects.filter(status='publicado')
+        .order_by('-visualizacoes', '-id')
+        .values('id', 'titulo', 'visualizacoes')[:5]
+    )
+
+    stats['posts_mais_comentados'] = list(
+        Post.objects.filter(status='publicado')
+        .annotate(comentarios=Count(
+            'comments',
+            filter=Q(comments__ativo=True, comments__aprovado=True)
+        ))
+        .order_by('-comentarios', '-id')
+        .values('id', 'titulo', 'comentarios')[:5]
+    )
+
+    return stats
+
+
+def compute_comment_stats():
+    """
+    Calcula as estatísticas de comentários
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    week_ago = now - timedelta(days=7)
+
+    stats = Comment.objects.aggregate(
+        total_comentarios=Count('id'),
+        comentarios_aprovados=Count('id', filter=Q(aprovado=True, ativo=True)),
+        comentarios_pendentes=Count('id', filter=Q(aprovado=False, ativo=True)),
+        comentarios_hoje=Count('id', filter=Q(data_criacao__date=today)),
+        comentarios_semana=Count('id', filter=Q(data_criacao__gte=week_ago)),
+    )
+
+    visiveis = Comment.objects.filter(ativo=True, aprovado=True)
+
+    usuarios_ativos = visiveis.values('user__username').annotate(
+        count=Count('id')
+    ).order_by('-count')[:10]
+
+    stats['usuarios_mais_ativos'] = [
+        {
+            'username': item['user__username'],
+            'comentarios': item['count']
+        }
+        for item in usuarios_ativos
+    ]
+
+    posts_comentados = visiveis.values('post__titulo', 'post__id').annotate(
+        count=Count('id')
+    ).order_by('-count')[:10]
+
+    stats['posts_mais_comentados'] = [
+        {
+            'id': item['post__id'],
+            'titulo': item['post__titulo'],
+            'comentarios': item['count']
+        }
+        for item in posts_comentados
+    ]
+
+    return stats
+
+
+STATS_BUILDERS = {
+    'posts': compute_post_stats,
+    'comments': compute_comment_stats,
+}
+
+
+def refresh_snapshot(chave):
+    """
+    Recalcula e grava o snapshot indicado, retornando-o
+    """
+    dados = STATS_BUILDERS[chave]()
+    snapshot, _ = StatsSnapshot.objects.update_or_create(
+        chave=chave,
+        defaults={'dados': dados, 'generated_at': timezone.now()}
+    )
+    return snapshot
+
+
+def get_snapshot(chave, max_age=None):
+    """
+    Retorna o snapshot se estiver dentro da idade máxima, senão o recalcula
+    """
+    if max_age is None:
+        max_age = getattr(settings, 'STATS_SNAPSHOT_MAX_AGE', 300)
+
+    snapshot = StatsSnapshot.objects.filter(chave=chave).first()
+
+    if snapshot and timezone.now() - snapshot.generated_at <= timedelta(seconds=max_age):
+        return snapshot
+
+    return refresh_snapshot(chave)
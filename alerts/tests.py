@@ -1,3 +1,327 @@
+"""
+Testes do app alerts
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import UserActivity
+from benchmarks.budget import QueryBudgetMixin
+from benchmarks.runner import throttling_disabled
+
+from .activity import rebuild_all
+from .models import Alert, Comment, Post, StatsSnapshot
+from .stats import get_snapshot
+
+
+class AlertsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Orçamento de consultas das views de alerts
+
+    As contagens incluem as 3 consultas de savepoint da transação desfeita
+    em volta de cada chamada.
+    """
+    namespace = 'alerts'
+    query_budgets = {
+        'POST alerts:alert-create': 6,
+        'GET alerts:alert-list': 6,
+        'GET alerts:alert-detail': 6,
+        'GET alerts:alert-stats': 12,
+        'POST alerts:post-create': 8,
+        'GET alerts:post-list': 8,
+        'GET alerts:post-detail': 11,
+        'GET alerts:post-stats': 17,
+        'GET alerts:post-feed': 6,
+        'GET alerts:post-feed [autenticado]': 6,
+        'POST alerts:post-view': 10,
+        'POST alerts:comment-create': 15,
+        'GET alerts:comment-list': 7,
+        'GET alerts:comment-detail': 6,
+        'GET alerts:comment-stats': 16,
+        'GET alerts:admin-alert-list': 8,
+        'PATCH alerts:admin-alert-update': 13,
+        'GET alerts:admin-post-list': 8,
+        'GET alerts:admin-comment-list': 8,
+        'PATCH alerts:admin-comment-moderate': 13,
+        'GET alerts:admin-spam-cluster-list': 8,
+        'PATCH alerts:admin-spam-cluster-moderate': 13,
+    }
+
+
+class SpamClusterTests(TestCase):
+    """
+    Detecção de comentários duplicados entre contas e moderação dos clusters
+    """
+
+    texto = 'Ganhe dinheiro rápido trabalhando de casa, chame no whatsapp agora mesmo!'
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create(username='spam_admin', is_staff=True)
+        self.users = [User.objects.create(username=f'spam_user_{i}') for i in range(3)]
+        self.post = Post.objects.create(
+            titulo='Chuva forte', conteudo='Alerta de chuva', autor=self.admin, status='publicado'
+        )
+        self.client = APIClient()
+
+    def comment(self, user, texto=None):
+        self.client.force_authenticate(user)
+        with throttling_disabled():
+            response = self.client.post(
+                reverse('alerts:comment-create'),
+                {'post_id': self.post.id, 'conteudo': texto or self.texto},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        return Comment.objects.get(id=response.data['data']['id'])
+
+    def clusters(self, **params):
+        self.client.force_authenticate(self.admin)
+        return self.client.get(reverse('alerts:admin-spam-cluster-list'), params)
+
+    def moderate(self, cluster_id, **data):
+        self.client.force_authenticate(self.admin)
+        return self.client.patch(
+            reverse('alerts:admin-spam-cluster-moderate', kwargs={'cluster_id': cluster_id}),
+            data, format='json'
+        )
+
+    def test_duplicate_from_other_account_is_held_before_saving(self):
+        first = self.comment(self.users[0])
+        with CaptureQueriesContext(connection) as queries:
+            second = self.comment(self.users[1])
+
+        self.assertTrue(first.aprovado)
+        self.assertFalse(second.aprovado)
+        self.assertFalse(any(
+            q['sql'].startswith('UPDATE "alerts_comment"') for q in queries.captured_queries
+        ))
+
+        clusters = self.clusters().data['data']['results']
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['comentario_ids'], [first.id, second.id])
+        self.assertEqual(clusters[0]['total_usuarios'], 2)
+
+    def test_same_account_and_different_text_do_not_cluster(self):
+        self.comment(self.users[0])
+        repeated = self.comment(self.users[0])
+        other = self.comment(self.users[1], 'A rua Lauro Linhares está alagada perto da UFSC')
+
+        self.assertTrue(repeated.aprovado)
+        self.assertTrue(other.aprovado)
+        self.assertEqual(self.clusters().data['data']['total'], 0)
+
+    def test_moderation_requires_the_listed_members(self):
+        comments = [self.comment(user) for user in self.users[:2]]
+        cluster = self.clusters().data['data']['results'][0]
+        # Um terceiro comentário entra no cluster depois da listagem
+        comments.append(self.comment(self.users[2]))
+
+        response = self.moderate(cluster['id'], action='delete', comentario_ids=cluster['comentario_ids'])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['data']['comentario_ids'], [c.id for c in comments])
+        self.assertEqual(Comment.objects.filter(ativo=False).count(), 0)
+
+        response = self.moderate(cluster['id'], action='delete', comentario_ids=[c.id for c in comments])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Comment.objects.filter(ativo=False).count(), 3)
+        self.assertEqual(self.moderate(cluster['id'], action='delete', comentario_ids=[1]).status_code, 404)
+
+    def test_edited_text_is_signed_again(self):
+        self.comment(self.users[0])
+        edited = self.comment(self.users[1], 'Que chuva forte hoje no centro da cidade')
+        self.assertTrue(edited.aprovado)
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.patch(
+            reverse('alerts:comment-detail', kwargs={'comment_id': edited.id}),
+            {'conteudo': self.texto}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        edited.refresh_from_db()
+        self.assertFalse(edited.aprovado)
+        self.assertEqual(edited.spam_signature.faixas.count(), 8)
+        clusters = self.clusters().data['data']['results']
+        self.assertEqual(len(clusters), 1)
+        self.assertIn(edited.id, clusters[0]['comentario_ids'])
+
+    def test_deleting_a_cluster_updates_the_authors_activity(self):
+        comments = [self.comment(user) for user in self.users[:2]]
+        cluster = self.clusters().data['data']['results'][0]
+
+        response = self.moderate(cluster['id'], action='delete', comentario_ids=[c.id for c in comments])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(UserActivity.objects.filter(user__in=self.users[:2]).values_list('total_comentarios', flat=True)),
+            [0, 0]
+        )
+
+    def test_invalid_parameters_return_400(self):
+        self.assertEqual(self.clusters(min_usuarios='abc').status_code, 400)
+        self.assertEqual(self.clusters(min_usuarios='1').status_code, 400)
+        self.assertEqual(self.moderate(1, action='approve').status_code, 400)
+        self.assertEqual(self.moderate(1, action='approve', comentario_ids=['1']).status_code, 400)
+
+
+class UserActivityTests(TestCase):
+    """
+    Resumo de atividade criado com o usuário, mantido por diferenças e
+    recalculado por completo
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username='atividade')
+        self.post = Post.objects.create(
+            titulo='Chuva forte', conteudo='Alerta de chuva', autor=self.user, status='publicado'
+        )
+
+    def test_new_user_has_activity(self):
+        activity = UserActivity.objects.get(user=self.user)
+
+        self.assertEqual((activity.total_alertas, activity.total_comentarios), (0, 0))
+
+    def test_missing_activity_is_rebuilt_with_both_counters(self):
+        Alert.objects.create(user=self.user, categoria='enchente', descricao='Rua alagada')
+        UserActivity.objects.filter(user=self.user).delete()
+
+        Comment.objects.create(post=self.post, user=self.user, conteudo='Obrigado')
+
+        activity = UserActivity.objects.get(user=self.user)
+        self.assertEqual((activity.total_alertas, activity.total_comentarios), (1, 1))
+        self.assertIsNotNone(activity.ultimo_alerta)
+
+    def activity(self):
+        activity = UserActivity.objects.get(user=self.user)
+        return activity.total_alertas, activity.ultimo_alerta
+
+    def alert(self, **fields):
+        return Alert.objects.create(user=self.user, categoria='enchente', descricao='Rua alagada', **fields)
+
+    def test_saves_that_keep_the_counted_state_do_not_touch_activity(self):
+        alert = Alert.objects.get(id=self.alert().id)
+
+        with CaptureQueriesContext(connection) as queries:
+            alert.descricao = 'Rua alagada e sem luz'
+            alert.save()
+
+        self.assertFalse(any('accounts_useractivity' in q['sql'] for q in queries.captured_queries))
+
+    def test_deactivation_and_deletion_apply_deltas(self):
+        first = self.alert()
+        last = self.alert()
+        self.assertEqual(self.activity(), (2, last.data_criacao))
+
+        last.ativo = False
+        last.save()
+        self.assertEqual(self.activity(), (1, first.data_criacao))
+
+        last.ativo = True
+        last.save(update_fields=['ativo'])
+        self.assertEqual(self.activity(), (2, last.data_criacao))
+
+        first.delete()
+        self.assertEqual(self.activity(), (1, last.data_criacao))
+
+    def test_rebuild_all_in_batches(self):
+        other = User.objects.create(username='atividade_2')
+        self.alert()
+        Comment.objects.create(post=self.post, user=other, conteudo='Obrigado')
+        UserActivity.objects.update(total_alertas=9, total_comentarios=9)
+
+        self.assertEqual(rebuild_all(batch_size=1), User.objects.count())
+
+        self.assertEqual(self.activity()[0], 1)
+        activity = UserActivity.objects.get(user=other)
+        self.assertEqual((activity.total_alertas, activity.total_comentarios), (0, 1))
+
+
+class StatsSnapshotTests(TestCase):
+    """
+    Estatísticas de posts e comentários servidas de snapshots
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create(username='stats_admin', is_staff=True)
+        self.user = User.objects.create(username='stats_user')
+        self.published = Post.objects.create(
+            titulo='Chuva forte', conteudo='Alerta de chuva', autor=self.admin,
+            status='publicado', visualizacoes=10
+        )
+        self.quiet = Post.objects.create(
+            titulo='Vento', conteudo='Alerta de vento', autor=self.admin,
+            status='publicado', visualizacoes=30
+        )
+        Post.objects.create(titulo='Rascunho', conteudo='...', autor=self.admin, status='rascunho')
+
+        Comment.objects.create(post=self.published, user=self.user, conteudo='Obrigado')
+        Comment.objects.create(post=self.published, user=self.admin, conteudo='De nada')
+        Comment.objects.create(post=self.published, user=self.user, conteudo='Pendente', aprovado=False)
+        Comment.objects.create(post=self.quiet, user=self.user, conteudo='Também vi')
+        Comment.objects.create(post=self.quiet, user=self.user, conteudo='Removido', ativo=False)
+
+    def test_post_aggregates(self):
+        dados = get_snapshot('posts').dados
+
+        self.assertEqual(
+            (dados['total_posts'], dados['posts_publicados'], dados['posts_rascunho']), (3, 2, 1)
+        )
+        self.assertEqual(dados['posts_hoje'], 3)
+        self.assertEqual(dados['total_visualizacoes'], 40)
+        self.assertEqual(dados['total_comentarios'], 3)
+        self.assertEqual(
+            [p['id'] for p in dados['posts_mais_visualizados']], [self.quiet.id, self.published.id]
+        )
+        self.assertEqual(
+            [(p['id'], p['comentarios']) for p in dados['posts_mais_comentados']],
+            [(self.published.id, 2), (self.quiet.id, 1)]
+        )
+
+    def test_comment_aggregates(self):
+        dados = get_snapshot('comments').dados
+
+        self.assertEqual(dados['total_comentarios'], 5)
+        self.assertEqual((dados['comentarios_aprovados'], dados['comentarios_pendentes']), (3, 1))
+        self.assertEqual(
+            dados['usuarios_mais_ativos'],
+            [{'username': 'stats_user', 'comentarios': 2}, {'username': 'stats_admin', 'comentarios': 1}]
+        )
+        self.assertEqual(
+            [(p['id'], p['comentarios']) for p in dados['posts_mais_comentados']],
+            [(self.published.id, 2), (self.quiet.id, 1)]
+        )
+
+    def test_snapshot_is_reused_until_stale(self):
+        first = get_snapshot('posts', max_age=300)
+        Post.objects.create(titulo='Novo', conteudo='...', autor=self.admin, status='publicado')
+
+        self.assertEqual(get_snapshot('posts', max_age=300).dados['total_posts'], 3)
+
+        StatsSnapshot.objects.filter(chave='posts').update(
+            generated_at=first.generated_at - timedelta(seconds=301)
+        )
+        snapshot = get_snapshot('posts', max_age=300)
+        self.assertEqual(snapshot.dados['total_posts'], 4)
+        self.assertGreater(snapshot.generated_at, first.generated_at)
+
+    def test_stats_endpoint_serves_the_snapshot(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.get(reverse('alerts:post-stats'))
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['total_posts'], 3)
+        self.assertIn('generated_at', response.data['data'])
+        self.assertLessEqual(
+            timezone.now() - StatsSnapshot.objects.get(chave='posts').generated_at, timedelta(seconds=5)
+        )
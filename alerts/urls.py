@@ -20,6 +20,7 @@ from .views import (
     AdminAlertListAPIView,
     AdminPostListAPIView,
     AdminCommentListAPIView,
+    AdminSpamClusterAPIView,
 )
 
 app_name = 'alerts'
@@ -48,5 +49,7 @@ urlpatterns = [
     path('admin/posts/', AdminPostListAPIView.as_view(), name='admin-post-list'),
     path('admin/comments/', AdminCommentListAPIView.as_view(), name='admin-comment-list'),
     path('admin/comments/<int:comment_id>/', AdminCommentListAPIView.as_view(), name='admin-comment-moderate'),
+    path('admin/comments/spam/', AdminSpamClusterAPIView.as_view(), name='admin-spam-cluster-list'),
+    path('admin/comments/spam/<int:cluster_id>/', AdminSpamClusterAPIView.as_view(), name='admin-spam-cluster-moderate'),
 ]
 
@@ -5,7 +5,7 @@ Views modulares para o app alerts
 from .alert import AlertCreateAPIView, AlertListAPIView, AlertDetailAPIView, AlertStatsAPIView
 from .post import PostCreateAPIView, PostListAPIView, PostDetailAPIView, PostFeedAPIView, PostStatsAPIView
 from .comment import CommentCreateAPIView, CommentListAPIView, CommentDetailAPIView, CommentStatsAPIView
-from .admin import AdminAlertListAPIView, AdminPostListAPIView, AdminCommentListAPIView
+from .admin import AdminAlertListAPIView, AdminPostListAPIView, AdminCommentListAPIView, AdminSpamClusterAPIView
 
 __all__ = [
     'AlertCreateAPIView',
@@ -24,4 +24,5 @@ __all__ = [
     'AdminAlertListAPIView',
     'AdminPostListAPIView',
     'AdminCommentListAPIView',
+    'AdminSpamClusterAPIView',
 ]
@@ -6,17 +6,23 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from .. import activity
 from ..models import Alert, Post, Comment
+from ..spam import ClusterChanged, list_clusters, resolve_cluster
+from core.schema import lazy_schema
 from ..serializers import (
     AlertListSerializer,
     AlertUpdateSerializer,
     PostListSerializer,
-    CommentListSerializer
+    CommentListSerializer,
+    with_comment_counts,
+    with_replies_count
 )
 
 logger = logging.getLogger(__name__)
@@ -93,8 +99,8 @@ class AdminAlertListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao listar alertas (admin): {str(e)}")
+        except Exception:
+            logger.exception('Erro ao listar alertas (admin)')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -123,8 +129,8 @@ class AdminAlertListAPIView(APIView):
                 serializer.save()
                 
                 logger.info(
-                    f"Alerta {alert_id} atualizado por admin {request.user.username}: "
-                    f"{old_status} -> {alert.status}"
+                    'Alerta %s atualizado por admin %s: %s -> %s',
+                    alert_id, request.user.username, old_status, alert.status
                 )
                 
                 return Response({
@@ -143,8 +149,8 @@ class AdminAlertListAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao atualizar alerta (admin): {str(e)}")
+        except Exception:
+            logger.exception('Erro ao atualizar alerta (admin)')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -204,7 +210,7 @@ class AdminPostListAPIView(APIView):
             end = start + page_size
             
             total = queryset.count()
-            posts = queryset[start:end]
+            posts = with_comment_counts(queryset)[start:end]
             
             serializer = PostListSerializer(posts, many=True)
             
@@ -224,8 +230,8 @@ class AdminPostListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao listar posts (admin): {str(e)}")
+        except Exception:
+            logger.exception('Erro ao listar posts (admin)')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -285,7 +291,7 @@ class AdminCommentListAPIView(APIView):
             end = start + page_size
             
             total = queryset.count()
-            comments = queryset[start:end]
+            comments = with_replies_count(queryset)[start:end]
             
             serializer = CommentListSerializer(comments, many=True)
             
@@ -302,8 +308,8 @@ class AdminCommentListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao listar comentários (admin): {str(e)}")
+        except Exception:
+            logger.exception('Erro ao listar comentários (admin)')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -343,7 +349,8 @@ class AdminCommentListAPIView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             logger.info(
-                f"Comentário {comment_id} moderado por admin {request.user.username}: {action}"
+                'Comentário %s moderado por admin %s: %s',
+                comment_id, request.user.username, action
             )
             
             return Response({
@@ -356,10 +363,129 @@ class AdminCommentListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao moderar comentário: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao moderar comentário')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+class AdminSpamClusterAPIView(APIView):
+    """
+    API administrativa para moderar clusters de comentários duplicados
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    
+    @lazy_schema('alerts.docs.simple.ADMIN_SPAM_CLUSTER_LIST_SIMPLE_SCHEMA')
+    def get(self, request):
+        """
+        Listar clusters de comentários quase idênticos de contas diferentes
+        """
+        try:
+            try:
+                min_usuarios = int(request.query_params.get('min_usuarios', 2))
+            except ValueError:
+                min_usuarios = 0
+            if min_usuarios < 2:
+                return Response({
+                    'success': False,
+                    'message': 'min_usuarios deve ser um número inteiro maior ou igual a 2'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            clusters = list_clusters(min_usuarios=min_usuarios)
+            
+            return Response({
+                'success': True,
+                'data': {
+                    'results': clusters,
+                    'total': len(clusters)
+                }
+            })
+            
+        except Exception:
+            logger.exception('Erro ao listar clusters de spam')
+            return Response({
+                'success': False,
+                'message': 'Erro interno do servidor'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @lazy_schema('alerts.docs.simple.ADMIN_SPAM_CLUSTER_MODERATE_SIMPLE_SCHEMA')
+    def patch(self, request, cluster_id):
+        """
+        Moderar em lote todos os comentários de um cluster
+        """
+        try:
+            action = request.data.get('action')
+            
+            updates = {
+                'approve': {'aprovado': True},
+                'reject': {'aprovado': False},
+                'delete': {'ativo': False},
+            }
+            
+            if action not in updates:
+                return Response({
+                    'success': False,
+                    'message': 'Ação inválida. Use: approve, reject ou delete'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            expected = request.data.get('comentario_ids')
+            if (
+                not isinstance(expected, list)
+                or not expected
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in expected)
+            ):
+                return Response({
+                    'success': False,
+                    'message': 'Informe comentario_ids: a lista de ids de comentários do cluster'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                # O cluster só é encerrado junto com a moderação dos comentários
+                with transaction.atomic():
+                    comment_ids = resolve_cluster(cluster_id, expected)
+                    if comment_ids is not None:
+                        comments = Comment.objects.filter(id__in=comment_ids)
+                        updated = comments.update(**updates[action])
+                        # update() não dispara sinais: refaz o resumo dos autores
+                        if 'ativo' in updates[action]:
+                            for user_id in comments.values_list('user_id', flat=True).distinct():
+                                activity.recompute(Comment, user_id)
+            except ClusterChanged as e:
+                return Response({
+                    'success': False,
+                    'message': 'Os comentários do cluster mudaram; revise a lista atual',
+                    'data': {
+                        'cluster_id': cluster_id,
+                        'comentario_ids': e.comment_ids
+                    }
+                }, status=status.HTTP_409_CONFLICT)
+            
+            if comment_ids is None:
+                return Response({
+                    'success': False,
+                    'message': 'Cluster não encontrado'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            logger.info(
+                'Cluster de spam %s moderado por admin %s: %s (%s comentários)',
+                cluster_id, request.user.username, action, updated
+            )
+            
+            return Response({
+                'success': True,
+                'message': f'{updated} comentários moderados com sucesso',
+                'data': {
+                    'cluster_id': cluster_id,
+                    'action': action,
+                    'comentario_ids': sorted(comment_ids)
+                }
+            })
+            
+        except Exception:
+            logger.exception('Erro ao moderar cluster de spam')
+            return Response({
+                'success': False,
+                'message': 'Erro interno do servidor'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -20,14 +20,7 @@ from ..serializers import (
     AlertListSerializer,
     AlertStatsSerializer
 )
-from ..docs.simple import (
-    ALERT_CREATE_SIMPLE_SCHEMA,
-    ALERT_LIST_SIMPLE_SCHEMA,
-    ALERT_DETAIL_SIMPLE_SCHEMA,
-    ALERT_UPDATE_SIMPLE_SCHEMA,
-    ALERT_DELETE_SIMPLE_SCHEMA,
-    ALERT_STATS_SIMPLE_SCHEMA
-)
+from core.schema import lazy_schema
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +32,9 @@ class AlertCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     serializer_class = AlertCreateSerializer
+    throttle_scope = 'alert_create'
     
-    @ALERT_CREATE_SIMPLE_SCHEMA
+    @lazy_schema('alerts.docs.simple.ALERT_CREATE_SIMPLE_SCHEMA')
     def post(self, request):
         """
         Criar novo alerta de desastre
@@ -51,7 +45,7 @@ class AlertCreateAPIView(APIView):
             if serializer.is_valid():
                 alert = serializer.save()
                 
-                logger.info(f"Alerta criado: {alert.id} por usuário {request.user.username}")
+                logger.info('Alerta criado: %s por usuário %s', alert.id, request.user.username)
                 
                 response_serializer = AlertSerializer(alert)
                 return Response({
@@ -66,8 +60,8 @@ class AlertCreateAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao criar alerta: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao criar alerta')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -86,7 +80,7 @@ class AlertListAPIView(APIView):
         Listar alertas do usuário autenticado
         """
         try:
-            queryset = Alert.objects.filter(user=request.user, ativo=True)
+            queryset = Alert.objects.filter(user=request.user, ativo=True).select_related('user')
             
             categoria = request.query_params.get('categoria')
             status_filter = request.query_params.get('status')
@@ -125,8 +119,8 @@ class AlertListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao listar alertas: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao listar alertas')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -169,8 +163,8 @@ class AlertDetailAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter alerta: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter alerta')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -213,8 +207,8 @@ class AlertDetailAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao atualizar alerta: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao atualizar alerta')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -242,15 +236,15 @@ class AlertDetailAPIView(APIView):
             alert.ativo = False
             alert.save()
             
-            logger.info(f"Alerta {alert_id} excluído por usuário {request.user.username}")
+            logger.info('Alerta %s excluído por usuário %s', alert_id, request.user.username)
             
             return Response({
                 'success': True,
                 'message': 'Alerta excluído com sucesso'
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao excluir alerta: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao excluir alerta')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -311,8 +305,8 @@ class AlertStatsAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter estatísticas: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter estatísticas')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
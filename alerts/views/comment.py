@@ -6,18 +6,23 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.db.models import Q, Count
+from rest_framework.authentication import SessionAuthentication
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from accounts.authentication import StatelessReadJWTAuthentication
 from ..models import Comment, Post
+from ..spam import find_duplicates, get_spam_settings, record_comment
+from ..stats import get_snapshot
 from ..serializers import (
     CommentSerializer,
     CommentCreateSerializer,
     CommentUpdateSerializer,
     CommentListSerializer,
-    CommentStatsSerializer
+    CommentStatsSerializer,
+    with_comment_tree
 )
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,7 @@ class CommentCreateAPIView(APIView):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = CommentCreateSerializer
+    throttle_scope = 'comment_create'
     
     def post(self, request):
         """
@@ -38,9 +44,26 @@ class CommentCreateAPIView(APIView):
             serializer = CommentCreateSerializer(data=request.data, context={'request': request})
             
             if serializer.is_valid():
-                comment = serializer.save()
+                assinatura, duplicados = find_duplicates(
+                    request.user.id, serializer.validated_data['conteudo']
+                )
+                with transaction.atomic():
+                    if duplicados and get_spam_settings()['HOLD_FOR_REVIEW']:
+                        comment = serializer.save(aprovado=False)
+                    else:
+                        comment = serializer.save()
+                    record_comment(comment, assinatura, duplicados)
                 
-                logger.info(f"Comentário criado: {comment.id} por usuário {request.user.username}")
+                logger.info(
+                    'Comentário criado: %s por usuário %s',
+                    comment.id, request.user.username
+                )
+                if duplicados:
+                    logger.warning(
+                        'Comentário %s de %s semelhante a comentários de outros usuários: %s',
+                        comment.id, request.user.username,
+                        [comment_id for comment_id, _ in duplicados]
+                    )
                 
                 response_serializer = CommentSerializer(comment)
                 return Response({
@@ -55,8 +78,8 @@ class CommentCreateAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao criar comentário: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao criar comentário')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -68,6 +91,7 @@ class CommentListAPIView(APIView):
     API para listagem de comentários de um post
     """
     permission_classes = []
+    authentication_classes = [StatelessReadJWTAuthentication, SessionAuthentication]
     serializer_class = CommentListSerializer
     
     def get(self, request, post_id):
@@ -94,7 +118,7 @@ class CommentListAPIView(APIView):
                 ativo=True,
                 aprovado=True,
                 parent=None
-            ).select_related('user', 'post').prefetch_related('replies')
+            )
             
             page = int(request.query_params.get('page', 1))
             page_size = int(request.query_params.get('page_size', 20))
@@ -103,7 +127,7 @@ class CommentListAPIView(APIView):
             end = start + page_size
             
             total = queryset.count()
-            comments = queryset[start:end]
+            comments = with_comment_tree(queryset)[start:end]
             
             serializer = CommentSerializer(comments, many=True)
             
@@ -120,8 +144,8 @@ class CommentListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao listar comentários: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao listar comentários')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -135,12 +159,14 @@ class CommentDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = CommentSerializer
     
-    def get_object(self, comment_id, user):
+    def get_object(self, comment_id, user, queryset=None):
         """
         Buscar comentário do usuário
         """
+        if queryset is None:
+            queryset = Comment.objects.all()
         try:
-            return Comment.objects.get(id=comment_id, user=user, ativo=True)
+            return queryset.get(id=comment_id, user=user, ativo=True)
         except Comment.DoesNotExist:
             return None
     
@@ -149,7 +175,9 @@ class CommentDetailAPIView(APIView):
         Obter detalhes do comentário
         """
         try:
-            comment = self.get_object(comment_id, request.user)
+            comment = self.get_object(
+                comment_id, request.user, with_comment_tree(Comment.objects.all())
+            )
             
             if not comment:
                 return Response({
@@ -164,8 +192,8 @@ class CommentDetailAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter comentário: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter comentário')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -194,7 +222,27 @@ class CommentDetailAPIView(APIView):
             serializer = CommentUpdateSerializer(comment, data=request.data, partial=True)
             
             if serializer.is_valid():
-                serializer.save()
+                # Texto alterado é assinado de novo, para que uma edição não
+                # escape da detecção de spam
+                conteudo = serializer.validated_data.get('conteudo', comment.conteudo)
+                if conteudo != comment.conteudo:
+                    assinatura, duplicados = find_duplicates(request.user.id, conteudo)
+                else:
+                    assinatura, duplicados = None, []
+                
+                with transaction.atomic():
+                    if duplicados and get_spam_settings()['HOLD_FOR_REVIEW']:
+                        serializer.save(aprovado=False)
+                    else:
+                        serializer.save()
+                    record_comment(comment, assinatura, duplicados, replace=True)
+                
+                if duplicados:
+                    logger.warning(
+                        'Comentário %s editado por %s semelhante a comentários de outros usuários: %s',
+                        comment.id, request.user.username,
+                        [comment_id for comment_id, _ in duplicados]
+                    )
                 
                 response_serializer = CommentSerializer(comment)
                 return Response({
@@ -209,8 +257,8 @@ class CommentDetailAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao atualizar comentário: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao atualizar comentário')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -239,15 +287,15 @@ class CommentDetailAPIView(APIView):
             comment.ativo = False
             comment.save()
             
-            logger.info(f"Comentário {comment_id} excluído por usuário {request.user.username}")
+            logger.info('Comentário %s excluído por usuário %s', comment_id, request.user.username)
             
             return Response({
                 'success': True,
                 'message': 'Comentário excluído com sucesso'
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao excluir comentário: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao excluir comentário')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -263,52 +311,12 @@ class CommentStatsAPIView(APIView):
     
     def get(self, request):
         """
-        Obter estatísticas dos comentários
+        Obter estatísticas dos comentários (snapshot pré-calculado)
         """
         try:
-            all_comments = Comment.objects.all()
-            
-            now = timezone.now()
-            today = now.date()
-            week_ago = now - timedelta(days=7)
-            
-            stats = {
-                'total_comentarios': all_comments.count(),
-                'comentarios_aprovados': all_comments.filter(aprovado=True, ativo=True).count(),
-                'comentarios_pendentes': all_comments.filter(aprovado=False, ativo=True).count(),
-                'comentarios_hoje': all_comments.filter(data_criacao__date=today).count(),
-                'comentarios_semana': all_comments.filter(data_criacao__gte=week_ago).count(),
-            }
-            
-            usuarios_ativos = all_comments.filter(
-                ativo=True, aprovado=True
-            ).values('user__username').annotate(
-                count=Count('user')
-            ).order_by('-count')[:10]
-            
-            stats['usuarios_mais_ativos'] = [
-                {
-                    'username': item['user__username'],
-                    'comentarios': item['count']
-                }
-                for item in usuarios_ativos
-            ]
-            
-            posts_comentados = all_comments.filter(
-                ativo=True, aprovado=True
-            ).values('post__titulo', 'post__id').annotate(
-                count=Count('post')
-            ).order_by('-count')[:10]
-            
-            stats['posts_mais_comentados'] = [
-                {
-                    'id': item['post__id'],
-                    'titulo': item['post__titulo'],
-                    'comentarios': item['count']
-                }
-                for item in posts_comentados
-            ]
+            snapshot = get_snapshot('comments')
             
+            stats = dict(snapshot.dados, generated_at=snapshot.generated_at)
             serializer = CommentStatsSerializer(stats)
             
             return Response({
@@ -316,10 +324,9 @@ class CommentStatsAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter estatísticas: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter estatísticas')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
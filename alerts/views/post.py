@@ -6,18 +6,20 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.db.models import Q, Count, F
-from django.utils import timezone
-from datetime import timedelta
+from rest_framework.authentication import SessionAuthentication
+from django.db.models import Q, F
 import logging
 
+from accounts.authentication import StatelessReadJWTAuthentication
 from ..models import Post, Alert
+from ..stats import get_snapshot
 from ..serializers import (
     PostSerializer,
     PostCreateSerializer,
     PostUpdateSerializer,
     PostListSerializer,
-    PostStatsSerializer
+    PostStatsSerializer,
+    with_comment_counts
 )
 
 logger = logging.getLogger(__name__)
@@ -40,7 +42,7 @@ class PostCreateAPIView(APIView):
             if serializer.is_valid():
                 post = serializer.save()
                 
-                logger.info(f"Post criado: {post.id} por admin {request.user.username}")
+                logger.info('Post criado: %s por admin %s', post.id, request.user.username)
                 
                 response_serializer = PostSerializer(post)
                 return Response({
@@ -55,8 +57,8 @@ class PostCreateAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao criar post: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao criar post')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -99,7 +101,7 @@ class PostListAPIView(APIView):
             end = start + page_size
             
             total = queryset.count()
-            posts = queryset[start:end]
+            posts = with_comment_counts(queryset)[start:end]
             
             serializer = PostListSerializer(posts, many=True)
             
@@ -116,8 +118,8 @@ class PostListAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao listar posts: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao listar posts')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -160,8 +162,8 @@ class PostDetailAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter post: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter post')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -198,8 +200,8 @@ class PostDetailAPIView(APIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Erro ao atualizar post: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao atualizar post')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -221,15 +223,15 @@ class PostDetailAPIView(APIView):
             post.status = 'arquivado'
             post.save()
             
-            logger.info(f"Post {post_id} arquivado por admin {request.user.username}")
+            logger.info('Post %s arquivado por admin %s', post_id, request.user.username)
             
             return Response({
                 'success': True,
                 'message': 'Post arquivado com sucesso'
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao arquivar post: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao arquivar post')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -241,6 +243,7 @@ class PostFeedAPIView(APIView):
     API para feed público de posts
     """
     permission_classes = []
+    authentication_classes = [StatelessReadJWTAuthentication, SessionAuthentication]
     serializer_class = PostListSerializer
     
     def get(self, request):
@@ -271,13 +274,13 @@ class PostFeedAPIView(APIView):
             end = start + page_size
             
             total = queryset.count()
-            posts = queryset[start:end]
+            posts = list(with_comment_counts(queryset)[start:end])
             
+            Post.objects.filter(id__in=[post.id for post in posts]).update(
+                visualizacoes=F('visualizacoes') + 1
+            )
             for post in posts:
-                post.visualizacoes = F('visualizacoes') + 1
-                post.save(update_fields=['visualizacoes'])
-            
-            posts = queryset[start:end]
+                post.visualizacoes += 1
             
             serializer = PostListSerializer(posts, many=True)
             
@@ -294,8 +297,8 @@ class PostFeedAPIView(APIView):
                 }
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter feed: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter feed')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -325,8 +328,8 @@ class PostFeedAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao visualizar post: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao visualizar post')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
@@ -342,53 +345,12 @@ class PostStatsAPIView(APIView):
     
     def get(self, request):
         """
-        Obter estatísticas dos posts
+        Obter estatísticas dos posts (snapshot pré-calculado)
         """
         try:
-            all_posts = Post.objects.all()
-            
-            now = timezone.now()
-            today = now.date()
-            week_ago = now - timedelta(days=7)
-            
-            stats = {
-                'total_posts': all_posts.count(),
-                'posts_publicados': all_posts.filter(status='publicado').count(),
-                'posts_rascunho': all_posts.filter(status='rascunho').count(),
-                'posts_hoje': all_posts.filter(data_criacao__date=today).count(),
-                'posts_semana': all_posts.filter(data_criacao__gte=week_ago).count(),
-                'total_visualizacoes': sum(all_posts.values_list('visualizacoes', flat=True)),
-                'total_comentarios': sum(
-                    post.comments.filter(ativo=True, aprovado=True).count() 
-                    for post in all_posts
-                ),
-            }
-            
-            mais_visualizados = all_posts.filter(status='publicado').order_by('-visualizacoes')[:5]
-            stats['posts_mais_visualizados'] = [
-                {
-                    'id': post.id,
-                    'titulo': post.titulo,
-                    'visualizacoes': post.visualizacoes
-                }
-                for post in mais_visualizados
-            ]
-            
-            mais_comentados = sorted(
-                all_posts.filter(status='publicado'),
-                key=lambda p: p.comments.filter(ativo=True, aprovado=True).count(),
-                reverse=True
-            )[:5]
-            
-            stats['posts_mais_comentados'] = [
-                {
-                    'id': post.id,
-                    'titulo': post.titulo,
-                    'comentarios': post.comments.filter(ativo=True, aprovado=True).count()
-                }
-                for post in mais_comentados
-            ]
+            snapshot = get_snapshot('posts')
             
+            stats = dict(snapshot.dados, generated_at=snapshot.generated_at)
             serializer = PostStatsSerializer(stats)
             
             return Response({
@@ -396,10 +358,9 @@ class PostStatsAPIView(APIView):
                 'data': serializer.data
             })
             
-        except Exception as e:
-            logger.error(f"Erro ao obter estatísticas: {str(e)}")
+        except Exception:
+            logger.exception('Erro ao obter estatísticas')
             return Response({
                 'success': False,
                 'message': 'Erro interno do servidor'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
@@ -0,0 +1,7 @@
+"""
+Benchmarks reprodutíveis dos endpoints da API
+
+``seed_benchmark_data`` gera uma massa de dados sintética a partir de uma
+semente fixa e ``run_benchmarks`` mede latência, consultas e memória de cada
+URL de ``accounts`` e ``alerts`` pelo cliente de testes do Django.
+"""
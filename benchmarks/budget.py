@@ -0,0 +1,145 @@
+"""
+Orçamento de consultas por view, para testes de regressão de N+1
+
+Cada caso de ``benchmarks.cases`` é chamado com a massa de dados gerada em
+dois tamanhos (``SIZES``). O número de consultas deve ser o mesmo nos dois
+(não cresce com os dados) e não pode passar do orçamento declarado para a
+view. Na falha, a mensagem lista as consultas repetidas, com os valores
+literais trocados por ``?``.
+"""
+
+from collections import Counter
+
+from django.core.cache import cache
+
+from core.instrumentation import normalize_sql
+
+from .cases import CASES, BenchmarkContext
+from .dataset import flush, seed
+from .runner import BenchmarkRunner, throttling_disabled, url_names, warm_up
+
+# A massa menor cabe em uma página das listagens e a maior ocupa várias
+SIZES = (
+    {"users": 3, "alerts": 6, "posts": 3, "comments": 6},
+    {"users": 12, "alerts": 60, "posts": 15, "comments": 90},
+)
+
+
+def duplicated_queries(queries):
+    """
+    Retorna [(vezes, sql normalizado)] das consultas executadas mais de uma
+    vez, da mais repetida para a menos
+    """
+    counts = Counter(normalize_sql(sql) for sql in queries)
+    return [(n, sql) for sql, n in counts.most_common() if n > 1]
+
+
+def measure(cases, size):
+    """
+    Gera a massa de dados no tamanho ``size`` e retorna
+    ``{nome do caso: (status, consultas)}`` (None para casos sem dados
+    para montar a chamada)
+    """
+    flush()
+    seed(**size)
+    cache.clear()
+    warm_up()
+
+    ctx = BenchmarkContext()
+    runner = BenchmarkRunner(clear_cache=True)
+    results = {}
+    with throttling_disabled():
+        for case in cases:
+            if case.kwargs and case.kwargs(ctx) is None:
+                results[case.name] = None
+                continue
+            # Aquecimento: índices em memória montados na primeira chamada
+            runner.prepare(ctx, case)[1]()
+            _, call = runner.prepare(ctx, case)
+            results[case.name] = runner.capture(call)
+    return results
+
+
+class QueryBudgetMixin:
+    """
+    Mixin de ``TestCase`` que verifica o orçamento de consultas das views de
+    um namespace
+
+    ``query_budgets`` mapeia o nome do caso (``"GET alerts:alert-list"``)
+    para o máximo de consultas. ``exclude`` lista casos fora da verificação.
+    """
+
+    namespace = None
+    query_budgets = {}
+    exclude = ()
+
+    def budget_cases(self):
+        return [
+            case
+            for case in CASES
+            if case.url_name.startswith(f"{self.namespace}:")
+            and case.name not in self.exclude
+        ]
+
+    def test_every_url_has_a_case(self):
+        covered = {case.url_name for case in CASES}
+        missing = [
+            name
+            for name in url_names()
+            if name.startswith(f"{self.namespace}:") and name not in covered
+        ]
+        self.assertEqual(missing, [], "URLs sem caso em benchmarks.cases")
+
+    def test_every_case_has_a_budget(self):
+        missing = [
+            case.name
+            for case in self.budget_cases()
+            if case.name not in self.query_budgets
+        ]
+        self.assertEqual(missing, [], "Casos sem orçamento de consultas")
+
+    def test_query_budgets(self):
+        cases = [
+            case for case in self.budget_cases() if case.name in self.query_budgets
+        ]
+        small, large = (measure(cases, size) for size in SIZES)
+
+        for case in cases:
+            with self.subTest(case=case.name):
+                if small[case.name] is None or large[case.name] is None:
+                    self.fail(f"{case.name}: sem dados para montar a chamada")
+
+                status, queries = large[case.name]
+                self.assertLess(status, 500, f"{case.name} retornou {status}")
+
+                _, small_queries = small[case.name]
+                if len(queries) != len(small_queries):
+                    self.fail(
+                        self._report(
+                            f"{case.name}: {len(small_queries)} consultas com a "
+                            f"massa menor e {len(queries)} com a maior",
+                            queries,
+                        )
+                    )
+
+                budget = self.query_budgets[case.name]
+                if len(queries) > budget:
+                    self.fail(
+                        self._report(
+                            f"{case.name}: {len(queries)} consultas, "
+                            f"orçamento de {budget}",
+                            queries,
+                        )
+                    )
+
+    @staticmethod
+    def _report(message, queries):
+        lines = [message]
+        duplicated = duplicated_queries(queries)
+        if duplicated:
+            lines.append("Consultas repetidas:")
+            lines += [f"  {n}x {sql}" for n, sql in duplicated]
+        else:
+            lines.append("Consultas:")
+            lines += [f"  {sql}" for sql in queries]
+        return "\n".join(lines)
@@ -0,0 +1,269 @@
+"""
+Casos de benchmark por URL de ``accounts`` e ``alerts``
+
+Cada caso diz como chamar a URL (método, usuário, argumentos, parâmetros e
+corpo) a partir do ``BenchmarkContext``, montado com registros da massa de
+dados gerada. URLs sem caso aparecem no relatório como não cobertas.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from django.contrib.auth.models import User
+from django.db.models import Count
+
+from alerts.models import Alert, Comment, CommentSignature, Post
+from alerts.spam import find_duplicates, list_clusters, record_comment
+from core.models import SlowQuery
+from core.profiling import get_storage
+
+from .dataset import ADMINS, SPAM_TEXTS, USERNAME_PREFIX, _cpf
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    Uma chamada medida pelo ``run_benchmarks``
+    """
+
+    url_name: str
+    method: str = "get"
+    user: str | None = None
+    kwargs: Callable[["BenchmarkContext"], dict] | None = None
+    params: dict = field(default_factory=dict)
+    data: Callable[["BenchmarkContext"], Any] | None = None
+    setup: Callable[["BenchmarkContext"], None] | None = None
+    label: str = ""
+
+    @property
+    def name(self):
+        name = f"{self.method.upper()} {self.url_name}"
+        return f"{name} [{self.label}]" if self.label else name
+
+
+class BenchmarkContext:
+    """
+    Registros da massa de dados usados para montar as chamadas
+    """
+
+    def __init__(self):
+        users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        self.admin = users.filter(is_staff=True).order_by("id").first()
+        self.citizen = (
+            users.filter(is_staff=False)
+            .annotate(total=Count("alerts"))
+            .order_by("-total", "id")
+            .first()
+        )
+        if self.admin is None or self.citizen is None:
+            raise LookupError(
+                "Massa de benchmark não encontrada; rode seed_benchmark_data"
+            )
+
+        self.alert = (
+            Alert.objects.filter(user=self.citizen, ativo=True).order_by("id").first()
+        )
+        self.post = (
+            Post.objects.filter(status="publicado", permite_comentarios=True)
+            .annotate(total=Count("comments"))
+            .order_by("-total", "id")
+            .first()
+        )
+        self.comment = (
+            Comment.objects.filter(user=self.citizen, ativo=True, aprovado=True)
+            .order_by("id")
+            .first()
+        )
+        self.spam_cluster = None
+        self.index_spam()
+
+    def index_spam(self):
+        """
+        Indexa os comentários repetidos da massa de dados na detecção de spam
+        (a massa é gravada com ``bulk_create``, sem passar pela view) e guarda
+        o primeiro cluster
+        """
+        spam = Comment.objects.filter(conteudo__in=SPAM_TEXTS).order_by("id")
+        CommentSignature.objects.filter(comment__in=spam).delete()
+        for comment in spam:
+            signature, matches = find_duplicates(comment.user_id, comment.conteudo)
+            record_comment(comment, signature, matches)
+        clusters = list_clusters()
+        self.spam_cluster = clusters[0] if clusters else None
+
+    def user(self, role):
+        return {"admin": self.admin, "citizen": self.citizen}.get(role)
+
+
+def _alert(ctx):
+    return {"alert_id": ctx.alert.id} if ctx.alert else None
+
+
+def _post(ctx):
+    return {"post_id": ctx.post.id}
+
+
+def _comment(ctx):
+    return {"comment_id": ctx.comment.id} if ctx.comment else None
+
+
+def _request_profile(ctx):
+    profiles = get_storage().list()
+    return {"profile_id": profiles[0]["id"]} if profiles else None
+
+
+def _slow_query(ctx):
+    entry = SlowQuery.objects.order_by("-id").first()
+    return {"fingerprint": entry.fingerprint} if entry else None
+
+
+def _registration(ctx):
+    return {
+        "username": f"{USERNAME_PREFIX}novo",
+        "email": f"{USERNAME_PREFIX}novo@example.com",
+        "first_name": "Nova",
+        "last_name": "Pessoa",
+        "password": "senha-forte-123",
+        "password_confirm": "senha-forte-123",
+        "profile": {
+            "cpf": _cpf(10**7 + ADMINS),
+            "data_nascimento": "1990-05-10",
+            "telefone": "48999990000",
+            "bairro": "Centro",
+            "cep": "88015100",
+        },
+    }
+
+
+CASES = [
+    # accounts
+    BenchmarkCase("accounts:profile", user="citizen"),
+    BenchmarkCase("accounts:profile_json", user="citizen"),
+    BenchmarkCase("accounts:api_register", method="post", data=_registration),
+    BenchmarkCase("accounts:api_user_profile", user="citizen"),
+    BenchmarkCase(
+        "accounts:api_profile_update",
+        method="patch",
+        user="citizen",
+        data=lambda ctx: {"telefone": "48988887777"},
+    ),
+    BenchmarkCase("accounts:api_profiles_list", user="admin"),
+    BenchmarkCase(
+        "accounts:api_profiles_list",
+        user="admin",
+        params={"search": "user_0", "ordering": "-total_alertas"},
+        label="busca",
+    ),
+    BenchmarkCase("accounts:api_inactive_profiles", user="admin"),
+    BenchmarkCase("accounts:api_user_stats", user="admin"),
+    BenchmarkCase("accounts:api_request_profiles", user="admin"),
+    BenchmarkCase("accounts:api_request_profiles", method="post", user="admin"),
+    BenchmarkCase(
+        "accounts:api_request_profile_detail", user="admin", kwargs=_request_profile
+    ),
+    BenchmarkCase("accounts:api_slow_queries", user="admin"),
+    BenchmarkCase("accounts:api_slow_query_detail", user="admin", kwargs=_slow_query),
+    BenchmarkCase("accounts:api_check_cpf", params={"cpf": _cpf(0)}),
+    BenchmarkCase("accounts:api_validate_phone", params={"phone": "48999999999"}),
+    BenchmarkCase("accounts:api_validate_cep", params={"cep": "88015-100"}),
+    BenchmarkCase(
+        "accounts:api_validate_batch",
+        method="post",
+        data=lambda ctx: {
+            "cpf": _cpf(1),
+            "phone": "48999999999",
+            "cep": "88015100",
+            "bairro": "Centro",
+            "username": "alguem",
+            "email": "alguem@example.com",
+        },
+    ),
+    BenchmarkCase(
+        "accounts:api_validate_batch",
+        method="post",
+        user="admin",
+        label="lote",
+        data=lambda ctx: [
+            {"cpf": _cpf(i), "username": f"alguem{i}", "email": f"alguem{i}@x.com"}
+            for i in range(1, 4)
+        ],
+    ),
+    BenchmarkCase("accounts:api_cep_lookup", params={"cep": "88058100"}),
+    BenchmarkCase("accounts:api_neighborhoods"),
+    BenchmarkCase(
+        "accounts:api_neighborhoods_autocomplete", params={"q": "corego gran"}
+    ),
+    BenchmarkCase("accounts:check_cpf_legacy", params={"cpf": _cpf(0)}),
+    # alerts
+    BenchmarkCase(
+        "alerts:alert-create",
+        method="post",
+        user="citizen",
+        data=lambda ctx: {
+            "categoria": "enchente",
+            "descricao": "Rua completamente alagada após a chuva forte da madrugada.",
+            "localizacao": "Trindade, Florianópolis",
+            "latitude": "-27.58800000",
+            "longitude": "-48.51900000",
+            "prioridade": 3,
+        },
+    ),
+    BenchmarkCase("alerts:alert-list", user="citizen"),
+    BenchmarkCase("alerts:alert-detail", user="citizen", kwargs=_alert),
+    BenchmarkCase("alerts:alert-stats", user="citizen"),
+    BenchmarkCase(
+        "alerts:post-create",
+        method="post",
+        user="admin",
+        data=lambda ctx: {
+            "titulo": "Boletim da Defesa Civil",
+            "conteudo": "Equipes atuam nos bairros afetados pela chuva.",
+            "status": "publicado",
+        },
+    ),
+    BenchmarkCase("alerts:post-list", user="admin"),
+    BenchmarkCase("alerts:post-detail", user="admin", kwargs=_post),
+    BenchmarkCase("alerts:post-stats", user="admin"),
+    BenchmarkCase("alerts:post-feed"),
+    BenchmarkCase("alerts:post-feed", user="citizen", label="autenticado"),
+    BenchmarkCase("alerts:post-view", method="post", kwargs=_post),
+    BenchmarkCase(
+        "alerts:comment-create",
+        method="post",
+        user="citizen",
+        data=lambda ctx: {"post_id": ctx.post.id, "conteudo": "Obrigado pelo aviso!"},
+    ),
+    BenchmarkCase("alerts:comment-list", kwargs=_post),
+    BenchmarkCase("alerts:comment-detail", user="citizen", kwargs=_comment),
+    BenchmarkCase("alerts:comment-stats", user="admin"),
+    BenchmarkCase("alerts:admin-alert-list", user="admin"),
+    BenchmarkCase(
+        "alerts:admin-alert-update",
+        method="patch",
+        user="admin",
+        kwargs=_alert,
+        data=lambda ctx: {"status": "analisando"},
+    ),
+    BenchmarkCase("alerts:admin-post-list", user="admin"),
+    BenchmarkCase("alerts:admin-comment-list", user="admin"),
+    BenchmarkCase(
+        "alerts:admin-comment-moderate",
+        method="patch",
+        user="admin",
+        kwargs=_comment,
+        data=lambda ctx: {"action": "approve"},
+    ),
+    BenchmarkCase("alerts:admin-spam-cluster-list", user="admin"),
+    BenchmarkCase(
+        "alerts:admin-spam-cluster-moderate",
+        method="patch",
+        user="admin",
+        kwargs=lambda ctx: (
+            {"cluster_id": ctx.spam_cluster["id"]} if ctx.spam_cluster else None
+        ),
+        data=lambda ctx: {
+            "action": "approve",
+            "comentario_ids": ctx.spam_cluster["comentario_ids"],
+        },
+    ),
+]
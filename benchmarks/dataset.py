@@ -0,0 +1,299 @@
+"""
+Gerador da massa de dados sintética dos benchmarks
+
+Todos os valores saem de um ``random.Random(seed)``, então a mesma semente e
+o mesmo tamanho geram sempre os mesmos dados. Os registros criados usam o
+prefixo ``bench_`` no nome de usuário, o que permite removê-los sem tocar no
+restante do banco (``flush``).
+"""
+
+import logging
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.cep import get_cep_index
+from accounts.models import Profile
+from alerts.activity import rebuild_all
+from alerts.models import Alert, Comment, Post, SpamCluster
+
+logger = logging.getLogger(__name__)
+
+USERNAME_PREFIX = "bench_"
+
+SIZES = {
+    "small": {"users": 200, "alerts": 1000, "posts": 50, "comments": 2000},
+    "medium": {"users": 2000, "alerts": 10000, "posts": 500, "comments": 20000},
+    "large": {"users": 20000, "alerts": 100000, "posts": 5000, "comments": 200000},
+}
+
+ADMINS = 3
+
+# Proporção de comentários que respondem a outro comentário, e profundidade
+# máxima das respostas
+REPLY_RATIO = 0.35
+MAX_REPLY_DEPTH = 3
+
+# Área aproximada de Florianópolis (ilha e parte continental)
+LATITUDE_RANGE = (-27.85, -27.38)
+LONGITUDE_RANGE = (-48.62, -48.35)
+
+WORDS = (
+    "água rua alagada chuva forte árvore caída deslizamento encosta casa "
+    "família desalojada vento telhado destelhado energia queda poste trânsito "
+    "interditado ponte rio transbordou bueiro entupido lama morro risco "
+    "moradores sirene abrigo escola ginásio doações colchões cobertores "
+    "defesa civil equipe bombeiros resgate ilhados acesso bloqueado"
+).split()
+
+# Comentários idênticos postados por várias contas (clusters de spam)
+SPAM_TEXTS = [
+    "Ganhe dinheiro rápido trabalhando de casa, chame no whatsapp agora mesmo!",
+    "Promoção imperdível de geradores e bombas d'água, acesse o link do perfil.",
+]
+SPAM_COPIES = 8
+
+FIRST_NAMES = (
+    "Ana Bruno Carla Daniel Eduarda Felipe Gabriela Henrique Isabela João "
+    "Karina Lucas Mariana Nicolas Olívia Pedro Rafaela Samuel Tatiana Vitor"
+).split()
+
+LAST_NAMES = (
+    "Silva Souza Oliveira Santos Pereira Costa Rodrigues Almeida Nascimento "
+    "Lima Araújo Fernandes Carvalho Gomes Martins Rocha Ribeiro Alves"
+).split()
+
+
+# Os CPFs gerados partem deste número base, longe dos CPFs reais mais comuns
+CPF_BASE = 900000000
+
+
+def _cpf(n):
+    """
+    CPF válido e único derivado de ``n``
+    """
+    base = f"{CPF_BASE + n:09d}"
+    digits = [int(d) for d in base]
+    for weight in (10, 11):
+        total = sum(d * (weight - i) for i, d in enumerate(digits))
+        rest = total % 11
+        digits.append(0 if rest < 2 else 11 - rest)
+    return "".join(str(d) for d in digits)
+
+
+def _sentence(rng, min_words, max_words):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + "."
+
+
+def _coordinate(rng, bounds):
+    return Decimal(f"{rng.uniform(*bounds):.8f}")
+
+
+def _spread(rng, now, days):
+    return now - timedelta(seconds=rng.randint(0, days * 24 * 60 * 60))
+
+
+def flush():
+    """
+    Remove os dados gerados (usuários ``bench_*`` e tudo que depende deles)
+    """
+    deleted, _ = User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    # Clusters de spam que ficaram sem comentários
+    SpamCluster.objects.filter(assinaturas__isnull=True).delete()
+    return deleted
+
+
+def _create_users(rng, count, now, batch_size):
+    cep_ranges = list(get_cep_index())
+    # Sem senha utilizável: os benchmarks autenticam sem login por senha
+    password = make_password(None)
+
+    users = [
+        User(
+            username=f"{USERNAME_PREFIX}admin_{i:02d}",
+            email=f"{USERNAME_PREFIX}admin_{i:02d}@example.com",
+            first_name="Admin",
+            last_name=f"Benchmark {i}",
+            is_staff=True,
+            password=password,
+            date_joined=_spread(rng, now, 720),
+        )
+        for i in range(ADMINS)
+    ]
+    users += [
+        User(
+            username=f"{USERNAME_PREFIX}user_{i:06d}",
+            email=f"{USERNAME_PREFIX}user_{i:06d}@example.com",
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            password=password,
+            date_joined=_spread(rng, now, 720),
+        )
+        for i in range(count)
+    ]
+    users = User.objects.bulk_create(users, batch_size=batch_size)
+
+    profiles = []
+    for i, user in enumerate(users):
+        start, end, neighborhoods = rng.choice(cep_ranges)
+        profiles.append(
+            Profile(
+                user=user,
+                cpf=_cpf(i),
+                data_nascimento=(
+                    now - timedelta(days=rng.randint(17, 85) * 365)
+                ).date(),
+                telefone=f"489{rng.randint(0, 99999999):08d}",
+                endereco=f"Rua {rng.choice(LAST_NAMES)}, {rng.randint(1, 3000)}",
+                bairro=rng.choice(neighborhoods),
+                cep=str(rng.randint(start, end)),
+                # Um perfil inativo a cada 20, a partir do segundo cidadão
+                ativo=i % 20 != ADMINS + 1,
+            )
+        )
+    Profile.objects.bulk_create(profiles, batch_size=batch_size)
+
+    return users[:ADMINS], users[ADMINS:]
+
+
+def _create_alerts(rng, users, count, now, batch_size):
+    categorias = [choice for choice, _ in Alert.CATEGORIA_CHOICES]
+    status_choices = [choice for choice, _ in Alert.STATUS_CHOICES]
+
+    alerts = []
+    for _ in range(count):
+        user = rng.choice(users)
+        alerts.append(
+            Alert(
+                user=user,
+                categoria=rng.choice(categorias),
+                descricao=_sentence(rng, 8, 40),
+                localizacao=f"{user.profile.bairro}, Florianópolis",
+                latitude=_coordinate(rng, LATITUDE_RANGE),
+                longitude=_coordinate(rng, LONGITUDE_RANGE),
+                status=rng.choices(status_choices, weights=[40, 15, 20, 10, 15])[0],
+                prioridade=rng.choices([1, 2, 3, 4], weights=[40, 30, 20, 10])[0],
+                ativo=rng.random() > 0.03,
+            )
+        )
+    alerts = Alert.objects.bulk_create(alerts, batch_size=batch_size)
+
+    # auto_now_add ignora o valor informado na criação
+    for alert in alerts:
+        alert.data_criacao = _spread(rng, now, 365)
+    Alert.objects.bulk_update(alerts, ["data_criacao"], batch_size=batch_size)
+    return alerts
+
+
+def _create_posts(rng, admins, alerts, count, now, batch_size):
+    posts = []
+    for _ in range(count):
+        publicado = rng.random() < 0.8
+        posts.append(
+            Post(
+                titulo=_sentence(rng, 3, 9)[:200],
+                conteudo=" ".join(
+                    _sentence(rng, 10, 30) for _ in range(rng.randint(2, 6))
+                ),
+                alert=rng.choice(alerts) if alerts and rng.random() < 0.7 else None,
+                autor=rng.choice(admins),
+                status=(
+                    "publicado" if publicado else rng.choice(["rascunho", "arquivado"])
+                ),
+                destaque=rng.random() < 0.05,
+                permite_comentarios=rng.random() > 0.1,
+                visualizacoes=rng.randint(0, 50000),
+                data_publicacao=_spread(rng, now, 365) if publicado else None,
+            )
+        )
+    posts = Post.objects.bulk_create(posts, batch_size=batch_size)
+
+    for post in posts:
+        post.data_criacao = post.data_publicacao or _spread(rng, now, 365)
+    Post.objects.bulk_update(posts, ["data_criacao"], batch_size=batch_size)
+    return posts
+
+
+def _create_comments(rng, users, posts, count, now, batch_size):
+    """
+    Cria comentários em ondas: primeiro os de nível superior, depois as
+    respostas a comentários da onda anterior, até ``MAX_REPLY_DEPTH``
+    """
+    published = [post for post in posts if post.status == "publicado"] or posts
+    # Alguns posts concentram a maior parte dos comentários, como no uso real
+    weights = [1 / (rank + 1) for rank in range(len(published))]
+
+    replies = int(count * REPLY_RATIO)
+    waves = [count - replies] + [0] * MAX_REPLY_DEPTH
+    for i in range(replies):
+        waves[1 + i % MAX_REPLY_DEPTH] += 1
+
+    created = []
+    previous = []
+    for depth, total in enumerate(waves):
+        if not total or (depth and not previous):
+            break
+
+        comments = []
+        for _ in range(total):
+            parent = rng.choice(previous) if depth else None
+            comments.append(
+                Comment(
+                    post=parent.post if parent else rng.choices(published, weights)[0],
+                    user=rng.choice(users),
+                    conteudo=_sentence(rng, 3, 25)[:1000],
+                    parent=parent,
+                    aprovado=rng.random() > 0.05,
+                    ativo=rng.random() > 0.03,
+                )
+            )
+        previous = Comment.objects.bulk_create(comments, batch_size=batch_size)
+        created += previous
+
+    spam = [
+        Comment(post=rng.choice(published), user=user, conteudo=text)
+        for text in SPAM_TEXTS
+        for user in rng.sample(users, min(SPAM_COPIES, len(users)))
+    ]
+    created += Comment.objects.bulk_create(spam, batch_size=batch_size)
+
+    for comment in created:
+        comment.data_criacao = _spread(rng, now, 365)
+    Comment.objects.bulk_update(created, ["data_criacao"], batch_size=batch_size)
+    return created
+
+
+def seed(size="small", seed=42, batch_size=1000, **counts):
+    """
+    Gera a massa de dados e retorna a quantidade criada por tipo
+
+    ``counts`` (users, alerts, posts, comments) sobrescreve o tamanho.
+    """
+    volumes = {**SIZES[size], **{k: v for k, v in counts.items() if v is not None}}
+    rng = random.Random(seed)
+    now = timezone.now().replace(microsecond=0)
+
+    with transaction.atomic():
+        admins, users = _create_users(rng, volumes["users"], now, batch_size)
+        alerts = _create_alerts(rng, users, volumes["alerts"], now, batch_size)
+        posts = _create_posts(rng, admins, alerts, volumes["posts"], now, batch_size)
+        comments = _create_comments(
+            rng, users, posts, volumes["comments"], now, batch_size
+        )
+
+    # bulk_create não dispara os sinais que mantêm o resumo de atividade
+    rebuild_all(batch_size=batch_size)
+
+    logger.info("Massa de benchmark gerada: %s (semente %s)", volumes, seed)
+    return {
+        "users": len(users) + len(admins),
+        "alerts": len(alerts),
+        "posts": len(posts),
+        "comments": len(comments),
+    }
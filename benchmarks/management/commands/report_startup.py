@@ -0,0 +1,70 @@
+"""
+Mede a inicialização a frio da aplicação: tempo até o primeiro request
+poder ser atendido, pico de memória e as importações mais caras
+
+Cada medição roda em um processo novo (ver ``benchmarks.startup``). Com
+``--output`` grava o relatório em JSON.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = "Mede o tempo e a memória de inicialização da aplicação"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Inicializações medidas; o relatório usa a mediana (padrão: 5)",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Pacotes e módulos listados (padrão: 15)",
+        )
+        parser.add_argument("--output", help="Arquivo JSON para gravar o relatório")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat deve ser maior que zero")
+
+        try:
+            report = measure_startup(repeat=options["repeat"], top=options["top"])
+        except RuntimeError as e:
+            raise CommandError(f"Falha ao iniciar a aplicação: {e}")
+
+        self.stdout.write(
+            f"Inicialização: {report['elapsed_ms']:.1f}ms (mediana de "
+            f"{report['runs']}, mínimo {report['elapsed_ms_min']:.1f}ms), "
+            f"pico de memória {report['rss_mb']:.1f}MB"
+        )
+        self.stdout.write(
+            f"{report['modules_imported']} módulos importados em "
+            f"{report['import_ms']:.1f}ms"
+        )
+
+        self.stdout.write(f"\n{'pacote':<40} {'próprio':>10}")
+        for package in report["top_packages"]:
+            self.stdout.write(f"{package['package']:<40} {package['self_ms']:>8.1f}ms")
+
+        self.stdout.write(f"\n{'módulo':<50} {'próprio':>10} {'acumulado':>10}")
+        for module in report["top_modules"]:
+            self.stdout.write(
+                f"{module['module']:<50} {module['self_ms']:>8.1f}ms "
+                f"{module['cumulative_ms']:>8.1f}ms"
+            )
+
+        for name in report["watched_loaded"]:
+            self.stdout.write(self.style.WARNING(f"Importado na inicialização: {name}"))
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Relatório gravado em {options['output']}")
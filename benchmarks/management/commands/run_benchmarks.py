@@ -0,0 +1,109 @@
+"""
+Mede latência (p50/p95/p99), consultas e pico de memória de cada URL de
+``accounts`` e ``alerts``
+
+Requer a massa de dados de ``seed_benchmark_data``. Com ``--output`` grava o
+relatório em JSON; com ``--compare`` compara com um relatório anterior e,
+com ``--fail-on-regression``, termina com erro se houver regressões.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.runner import BenchmarkRunner, compare
+
+
+class Command(BaseCommand):
+    help = "Roda os benchmarks dos endpoints de accounts e alerts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Chamadas cronometradas por caso (padrão: 50)",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=5,
+            help="Chamadas de aquecimento por caso (padrão: 5)",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="*",
+            help="Roda apenas os casos cujo nome contém algum dos termos",
+        )
+        parser.add_argument(
+            "--clear-cache",
+            action="store_true",
+            help="Limpa o cache antes de cada chamada (medição a frio)",
+        )
+        parser.add_argument("--output", help="Arquivo JSON para gravar o relatório")
+        parser.add_argument("--compare", help="Relatório JSON anterior para comparar")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Aumento de p95 considerado regressão (padrão: 0.2 = 20%%)",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Termina com erro se a comparação encontrar regressões",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations deve ser maior que zero")
+
+        runner = BenchmarkRunner(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            clear_cache=options["clear_cache"],
+            only=options["only"],
+        )
+
+        self.stdout.write(
+            f"{'caso':<60} {'status':>6} {'sql':>5} {'p50':>9} {'p95':>9} "
+            f"{'p99':>9} {'mem KB':>9}"
+        )
+
+        try:
+            report = runner.run(progress=self._print_result)
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        for name in report["uncovered_urls"]:
+            self.stdout.write(self.style.WARNING(f"URL sem caso de benchmark: {name}"))
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Relatório gravado em {options['output']}")
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, options["threshold"])
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"Regressão: {regression}"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("Nenhuma regressão encontrada"))
+            elif options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regressões encontradas")
+
+    def _print_result(self, name, result):
+        if "skipped" in result:
+            self.stdout.write(f"{name:<60} ignorado: {result['skipped']}")
+            return
+
+        line = (
+            f"{name:<60} {result['status']:>6} {result['queries']:>5} "
+            f"{result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+            f"{result['p99_ms']:>7.2f}ms {result['peak_memory_kb']:>9.1f}"
+        )
+        if result["status"] >= 500:
+            line = self.style.ERROR(line)
+        self.stdout.write(line)
@@ -0,0 +1,92 @@
+"""
+Gera a massa de dados sintética usada pelos benchmarks
+
+A mesma semente e o mesmo tamanho geram sempre os mesmos dados. Use um banco
+dedicado: os dados gerados (usuários ``bench_*``) convivem com os existentes,
+mas distorcem estatísticas e listagens. Por isso o comando só roda com
+``DEBUG`` ou com ``--allow-non-debug``.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.dataset import SIZES, USERNAME_PREFIX, flush, seed
+
+
+class Command(BaseCommand):
+    help = "Gera a massa de dados sintética usada pelos benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            choices=sorted(SIZES),
+            default="small",
+            help="Volume de dados (padrão: small)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Semente aleatória (padrão: 42)"
+        )
+        for name in ("users", "alerts", "posts", "comments"):
+            parser.add_argument(
+                f"--{name}", type=int, help=f"Sobrescreve a quantidade de {name}"
+            )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tamanho dos lotes de inserção (padrão: 1000)",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Remove a massa de dados gerada anteriormente antes de gerar",
+        )
+        parser.add_argument(
+            "--flush-only",
+            action="store_true",
+            help="Apenas remove a massa de dados gerada anteriormente",
+        )
+        parser.add_argument(
+            "--allow-non-debug",
+            action="store_true",
+            help="Permite gravar com DEBUG desligado (banco dedicado de benchmark)",
+        )
+
+    def handle(self, *args, **options):
+        from django.contrib.auth.models import User
+
+        if not settings.DEBUG and not options["allow_non_debug"]:
+            raise CommandError(
+                f"DEBUG desligado: recusando gravar no banco "
+                f"'{connection.settings_dict['NAME']}'. Use um banco dedicado e "
+                "--allow-non-debug"
+            )
+
+        if options["flush"] or options["flush_only"]:
+            deleted = flush()
+            self.stdout.write(f"{deleted} registros de benchmark removidos")
+            if options["flush_only"]:
+                return
+
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError(
+                "Já existe massa de benchmark no banco; use --flush para recriá-la"
+            )
+
+        counts = seed(
+            size=options["size"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            users=options["users"],
+            alerts=options["alerts"],
+            posts=options["posts"],
+            comments=options["comments"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Massa de benchmark gerada: "
+                + ", ".join(f"{total} {name}" for name, total in counts.items())
+            )
+        )
@@ -0,0 +1,193 @@
+"""
+Simula um pico de uso (tempestade) contra um servidor em execução
+
+Usa os usuários e posts da massa de ``seed_benchmark_data``. Os tokens JWT
+são emitidos localmente, então o servidor precisa usar a mesma
+``SECRET_KEY`` e o mesmo banco que este comando. Ao final mostra vazão,
+taxa de erros e percentis de latência por endpoint e, com ``--timeline``,
+a evolução por janela de tempo.
+"""
+
+import asyncio
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from alerts.models import Post
+from benchmarks.dataset import USERNAME_PREFIX
+from benchmarks.surge import (
+    DEFAULT_PROFILE,
+    SurgeContext,
+    SurgeSimulator,
+    validate_profile,
+)
+
+
+class Command(BaseCommand):
+    help = "Simula um pico de uso contra um servidor local"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Endereço do servidor (padrão: http://127.0.0.1:8000)",
+        )
+        parser.add_argument(
+            "--profile", help="Perfil de pico em JSON (padrão: perfil embutido)"
+        )
+        parser.add_argument(
+            "--rate-scale",
+            type=float,
+            default=1.0,
+            help="Multiplica as taxas de todas as fases (padrão: 1.0)",
+        )
+        parser.add_argument(
+            "--time-scale",
+            type=float,
+            default=1.0,
+            help="Multiplica as durações de todas as fases (padrão: 1.0)",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=100,
+            help="Conexões simultâneas com o servidor (padrão: 100)",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=2000,
+            help="Requisições pendentes antes de descartar chegadas (padrão: 2000)",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=50,
+            help="Cidadãos da massa de dados usados nas requisições (padrão: 50)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=5,
+            help="Tamanho das janelas da linha do tempo em segundos (padrão: 5)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30,
+            help="Tempo máximo por requisição em segundos (padrão: 30)",
+        )
+        parser.add_argument("--seed", type=int, help="Semente aleatória")
+        parser.add_argument(
+            "--timeline",
+            action="store_true",
+            help="Mostra os resultados por janela de tempo",
+        )
+        parser.add_argument("--output", help="Arquivo JSON para gravar o relatório")
+
+    def handle(self, *args, **options):
+        profile = self._load_profile(options)
+        context = self._build_context(options, profile)
+
+        simulator = SurgeSimulator(
+            options["url"],
+            profile,
+            context,
+            connections=options["connections"],
+            max_in_flight=options["max_in_flight"],
+            interval=options["interval"],
+            timeout=options["timeout"],
+            seed=options["seed"],
+        )
+
+        duration = sum(phase["duration"] for phase in profile["phases"])
+        self.stdout.write(
+            f"Simulando {duration:.0f}s de pico contra {options['url']} "
+            f"com {options['connections']} conexões"
+        )
+        report = asyncio.run(simulator.run(progress=self._print_phase))
+
+        self._print_report(report, options["timeline"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Relatório gravado em {options['output']}")
+
+    def _load_profile(self, options):
+        if options["profile"]:
+            try:
+                with open(options["profile"], encoding="utf-8") as f:
+                    profile = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Perfil inválido: {e}")
+        else:
+            profile = json.loads(json.dumps(DEFAULT_PROFILE))
+
+        problems = validate_profile(profile)
+        if problems:
+            raise CommandError("\n".join(problems))
+
+        for phase in profile["phases"]:
+            phase["duration"] *= options["time_scale"]
+            for key in ("rate", "rate_end"):
+                if key in phase:
+                    phase[key] *= options["rate_scale"]
+        return profile
+
+    def _build_context(self, options, profile):
+        users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        citizens = list(users.filter(is_staff=False).order_by("?")[: options["users"]])
+        admins = list(users.filter(is_staff=True))
+        post_ids = list(
+            Post.objects.filter(status="publicado", permite_comentarios=True)
+            .order_by("-data_publicacao")
+            .values_list("id", flat=True)[:200]
+        )
+        if not citizens or not admins or not post_ids:
+            raise CommandError(
+                "Massa de benchmark não encontrada; rode seed_benchmark_data"
+            )
+
+        return SurgeContext(
+            citizen_tokens=[str(AccessToken.for_user(user)) for user in citizens],
+            admin_tokens=[str(AccessToken.for_user(user)) for user in admins],
+            post_ids=post_ids,
+            media_kb=profile.get("media_kb", 0),
+        )
+
+    def _print_phase(self, phase, offset):
+        self.stdout.write(f"[{offset:7.1f}s] fase: {phase}")
+
+    def _print_report(self, report, timeline):
+        header = (
+            f"{'endpoint':<20} {'req':>7} {'req/s':>8} {'erros':>7} {'429':>7} "
+            f"{'p50':>9} {'p95':>9} {'p99':>9}"
+        )
+        self.stdout.write(f"\n{header}")
+        for endpoint, result in report["endpoints"].items():
+            self.stdout.write(self._line(endpoint, result))
+            if result["dropped"]:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{'':<20} {result['dropped']} chegadas descartadas "
+                        "(gerador saturado)"
+                    )
+                )
+            if timeline:
+                for window in result["timeline"]:
+                    self.stdout.write(self._line(f"  +{window['start_s']}s", window))
+
+    def _line(self, label, result):
+        line = (
+            f"{label:<20} {result['requests']:>7} {result['throughput_rps']:>8.1f} "
+            f"{result['error_rate']:>7.1%} {result['throttled_rate']:>7.1%} "
+            f"{_ms(result['p50_ms'])} {_ms(result['p95_ms'])} {_ms(result['p99_ms'])}"
+        )
+        return self.style.ERROR(line) if result["error_rate"] >= 0.01 else line
+
+
+def _ms(value):
+    return f"{'-':>9}" if value is None else f"{value:>7.1f}ms"
@@ -0,0 +1,288 @@
+"""
+Execução e relatório dos benchmarks
+
+Cada caso roda pelo cliente de testes do Django, com autenticação JWT real
+(e sessão, para as views legadas), ``DEBUG`` desligado e sem limitação de
+taxa. Cada chamada roda
+em uma transação desfeita no final, então casos de escrita não alteram a
+massa de dados e podem ser repetidos.
+
+Por caso são feitas três medições separadas, para que uma não distorça a
+outra:
+
+- uma chamada com ``CaptureQueriesContext`` (número de consultas);
+- uma chamada com ``tracemalloc`` (pico de memória alocada);
+- ``iterations`` chamadas cronometradas (p50/p95/p99), após ``warmup``.
+"""
+
+import contextlib
+import gc
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.availability import get_cpf_registry
+from core.throttling import SlidingWindowRateThrottle
+
+from .cases import CASES, BenchmarkContext
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ("accounts", "alerts")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def percentile(values, p):
+    """
+    Percentil ``p`` (0-100) com interpolação linear; ``values`` ordenados
+    """
+    if not values:
+        return None
+    k = (len(values) - 1) * p / 100
+    low, high = math.floor(k), math.ceil(k)
+    return values[low] + (values[high] - values[low]) * (k - low)
+
+
+@contextlib.contextmanager
+def throttling_disabled():
+    """
+    Desliga a limitação de taxa enquanto os benchmarks rodam
+    """
+    rates = SlidingWindowRateThrottle.THROTTLE_RATES
+    SlidingWindowRateThrottle.THROTTLE_RATES = defaultdict(lambda: None)
+    try:
+        yield
+    finally:
+        SlidingWindowRateThrottle.THROTTLE_RATES = rates
+
+
+def url_names():
+    """
+    Nomes (``namespace:nome``) de todas as URLs de accounts e alerts
+    """
+    names = []
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, pattern.namespace or namespace)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                if namespace in NAMESPACES:
+                    names.append(f"{namespace}:{pattern.name}")
+
+    walk(get_resolver().url_patterns, None)
+    return sorted(set(names))
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def warm_up():
+    """
+    Deixa o processo como um worker já aquecido
+
+    O filtro de CPFs é montado em segundo plano na primeira consulta; aqui é
+    montado antes, para que a medição não dependa de a thread ter terminado.
+    """
+    get_cpf_registry().rebuild()
+
+
+class BenchmarkRunner:
+    """
+    Roda os casos de ``benchmarks.cases`` e monta o relatório
+    """
+
+    def __init__(self, iterations=50, warmup=5, clear_cache=False, only=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.clear_cache = clear_cache
+        self.only = only
+        self._clients = {}
+
+    def _client(self, ctx, role):
+        if role not in self._clients:
+            client = Client(raise_request_exception=False)
+            user = ctx.user(role)
+            if user is not None:
+                client.force_login(user)
+                client.defaults["HTTP_AUTHORIZATION"] = (
+                    f"Bearer {AccessToken.for_user(user)}"
+                )
+            self._clients[role] = client
+        return self._clients[role]
+
+    def _call(self, client, method, path, params, data):
+        """
+        Faz a chamada em uma transação desfeita e retorna o status
+        """
+        if self.clear_cache:
+            cache.clear()
+
+        response = None
+        try:
+            with transaction.atomic():
+                if method == "get":
+                    response = client.get(path, params)
+                else:
+                    if params:
+                        path = f"{path}?{urlencode(params)}"
+                    response = getattr(client, method)(
+                        path,
+                        data=json.dumps(data or {}),
+                        content_type="application/json",
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+        return response.status_code
+
+    def prepare(self, ctx, case):
+        """
+        Roda o setup do caso (fora da medição, já que ele pode mudar os
+        argumentos da URL) e retorna (path, chamada)
+        """
+        if case.setup:
+            case.setup(ctx)
+        kwargs = case.kwargs(ctx) if case.kwargs else {}
+        data = case.data(ctx) if case.data else None
+        path = reverse(case.url_name, kwargs=kwargs)
+        client = self._client(ctx, case.user)
+        return path, lambda: self._call(client, case.method, path, case.params, data)
+
+    @staticmethod
+    def capture(call):
+        """
+        Faz a chamada e retorna (status, SQL das consultas executadas)
+        """
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            status_code = call()
+        # A lista capturada é lida do log da conexão, limpo a cada requisição
+        return status_code, [query["sql"] for query in queries.captured_queries]
+
+    def run_case(self, ctx, case):
+        if case.kwargs and case.kwargs(ctx) is None:
+            return {"skipped": "sem dados para montar a chamada"}
+
+        for _ in range(self.warmup):
+            self.prepare(ctx, case)[1]()
+
+        path, call = self.prepare(ctx, case)
+        status_code, queries = self.capture(call)
+
+        _, call = self.prepare(ctx, case)
+        gc.collect()
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(self.iterations):
+            _, call = self.prepare(ctx, case)
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+
+        return {
+            "path": path,
+            "method": case.method.upper(),
+            "status": status_code,
+            "queries": len(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(sum(timings) / len(timings), 3),
+            "max_ms": round(timings[-1], 3),
+        }
+
+    def run(self, progress=None):
+        warm_up()
+        ctx = BenchmarkContext()
+        cases = [
+            case
+            for case in CASES
+            if not self.only or any(term in case.name for term in self.only)
+        ]
+
+        results = {}
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts, DEBUG=False), throttling_disabled():
+            for case in cases:
+                result = self.run_case(ctx, case)
+                results[case.name] = result
+                if progress:
+                    progress(case.name, result)
+
+        covered = {case.url_name for case in CASES}
+        return {
+            "meta": {
+                "generated_at": timezone.now().isoformat(),
+                "git_revision": git_revision(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "pid": os.getpid(),
+                "iterations": self.iterations,
+                "warmup": self.warmup,
+                "clear_cache": self.clear_cache,
+            },
+            "results": results,
+            "uncovered_urls": [name for name in url_names() if name not in covered],
+        }
+
+
+def compare(report, baseline, threshold=0.2):
+    """
+    Lista as regressões do relatório em relação a uma execução anterior
+
+    Uma regressão é um aumento de consultas ou um p95 mais de ``threshold``
+    (fração) acima do anterior.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or "p95_ms" not in result or "p95_ms" not in before:
+            continue
+
+        if result["queries"] > before["queries"]:
+            regressions.append(
+                f"{name}: consultas {before['queries']} -> {result['queries']}"
+            )
+        if before["p95_ms"] and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms"
+            )
+    return regressions
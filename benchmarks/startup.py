@@ -0,0 +1,123 @@
+"""
+Medição da inicialização a frio da aplicação
+
+Cada medição roda em um processo Python novo com as mesmas configurações:
+``django.setup()``, ``get_wsgi_application()`` e a carga das URLs, o que um
+worker faz antes de atender a primeira requisição. O processo filho informa
+o tempo total, o pico de memória (RSS) e quais módulos de ``WATCHED`` foram
+importados. Uma execução extra com ``python -X importtime`` detalha o tempo
+de importação por pacote e por módulo.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+
+# Módulos que só deveriam ser importados ao gerar o schema OpenAPI
+WATCHED = (
+    "drf_spectacular.generators",
+    "drf_spectacular.views",
+    "accounts.docs",
+    "alerts.docs",
+)
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed_ms = (time.perf_counter() - start) * 1000
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+watched = %r
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "loaded": [m for m in watched if any(
+        name == m or name.startswith(m + ".") for name in sys.modules
+    )],
+}))
+"""
+
+
+def _run_child(importtime=False):
+    env = dict(os.environ)
+    env["DJANGO_SETTINGS_MODULE"] = settings.SETTINGS_MODULE
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(settings.BASE_DIR), env.get("PYTHONPATH")])
+    )
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD % (WATCHED,)]
+
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"código {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(output):
+    """
+    ``[(módulo, próprio_us, acumulado_us)]`` da saída do ``-X importtime``
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        modules.append(
+            (fields[2].strip(), int(fields[0].strip()), int(fields[1].strip()))
+        )
+    return modules
+
+
+def measure_startup(repeat=5, top=15):
+    """
+    Mediana de ``repeat`` inicializações e o detalhamento das importações
+    """
+    runs = [_run_child()[0] for _ in range(repeat)]
+    sample, stderr = _run_child(importtime=True)
+    modules = parse_importtime(stderr)
+
+    packages = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".", 1)[0]] += self_us
+    slowest = sorted(modules, key=lambda module: module[2], reverse=True)
+
+    return {
+        "runs": repeat,
+        "elapsed_ms": round(statistics.median(r["elapsed_ms"] for r in runs), 1),
+        "elapsed_ms_min": round(min(r["elapsed_ms"] for r in runs), 1),
+        "rss_mb": round(statistics.median(r["rss_mb"] for r in runs), 1),
+        "modules_imported": len(modules),
+        "import_ms": round(sum(m[1] for m in modules) / 1000, 1),
+        "watched_loaded": sample["loaded"],
+        "top_packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)}
+            for name, us in sorted(
+                packages.items(), key=lambda item: item[1], reverse=True
+            )[:top]
+        ],
+        "top_modules": [
+            {
+                "module": name,
+                "self_ms": round(self_us / 1000, 1),
+                "cumulative_ms": round(cumulative_us / 1000, 1),
+            }
+            for name, self_us, cumulative_us in slowest[:top]
+        ],
+    }
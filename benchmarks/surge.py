@@ -0,0 +1,475 @@
+"""
+Simulação de pico de uso (tempestade) contra um servidor em execução
+
+O gerador é de modelo aberto: as chegadas seguem um processo de Poisson na
+taxa de cada fase do perfil, independentemente de o servidor estar
+respondendo. A latência é medida a partir do instante previsto da chegada,
+então o tempo de espera por uma conexão livre também é contabilizado (sem
+"coordinated omission").
+
+O cliente HTTP/1.1 é mínimo (keep-alive, ``Content-Length`` e ``chunked``),
+feito direto sobre ``asyncio`` para não trazer dependências ao projeto.
+
+Perfil (JSON, ou ``DEFAULT_PROFILE``)::
+
+    {
+        "phases": [
+            {"name": "calmaria", "duration": 20, "rate": 5},
+            {"name": "tempestade", "duration": 60, "rate": 5, "rate_end": 150},
+            ...
+        ],
+        "mix": {"alert-create": 3, "post-feed": 10, ...},
+        "media_kb": 512
+    }
+
+``rate`` é em requisições por segundo; com ``rate_end`` a taxa varia
+linearmente ao longo da fase. As chaves de ``mix`` são os nomes de
+``ENDPOINTS`` e os valores, os pesos relativos.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import ssl
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.urls import reverse
+
+from .runner import percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = {
+    "phases": [
+        {"name": "calmaria", "duration": 15, "rate": 5},
+        {"name": "chuva forte", "duration": 30, "rate": 5, "rate_end": 80},
+        {"name": "tempestade", "duration": 60, "rate": 80},
+        {"name": "recuperacao", "duration": 30, "rate": 80, "rate_end": 10},
+    ],
+    "mix": {
+        "alert-create": 15,
+        "alert-list": 10,
+        "post-feed": 35,
+        "comment-list": 20,
+        "comment-create": 5,
+        "admin-alert-list": 15,
+    },
+    "media_kb": 512,
+}
+
+
+class HTTPConnection:
+    """
+    Conexão HTTP/1.1 persistente
+    """
+
+    def __init__(self, host, port, use_ssl=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl
+        )
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def request(self, method, path, headers=None, body=b""):
+        """
+        Envia a requisição e retorna (status, corpo)
+
+        Uma conexão reaproveitada pode ter sido fechada pelo servidor; nesse
+        caso a requisição é reenviada uma vez em uma conexão nova.
+        """
+        reused = self._writer is not None
+        try:
+            return await asyncio.wait_for(
+                self._request(method, path, headers or {}, body), self.timeout
+            )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        except BaseException:
+            self.close()
+            raise
+        return await asyncio.wait_for(
+            self._request(method, path, headers or {}, body), self.timeout
+        )
+
+    async def _request(self, method, path, headers, body):
+        if self._writer is None:
+            await self._connect()
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Conexão fechada pelo servidor")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in response_headers:
+            content = await self._reader.readexactly(
+                int(response_headers["content-length"])
+            )
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            content = await self._read_chunked()
+        else:
+            content = await self._reader.read()
+            response_headers["connection"] = "close"
+
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, content
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self._reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await self._reader.readline()
+                return b"".join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readline()
+
+
+class ConnectionPool:
+    """
+    Conjunto limitado de conexões; quem não consegue uma conexão espera
+    """
+
+    def __init__(self, base_url, size, timeout=30):
+        url = urlsplit(base_url)
+        use_ssl = url.scheme == "https"
+        port = url.port or (443 if use_ssl else 80)
+        self._idle = asyncio.LifoQueue()
+        for _ in range(size):
+            self._idle.put_nowait(HTTPConnection(url.hostname, port, use_ssl, timeout))
+
+    async def request(self, method, path, headers=None, body=b""):
+        connection = await self._idle.get()
+        try:
+            return await connection.request(method, path, headers, body)
+        finally:
+            self._idle.put_nowait(connection)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+def multipart(fields, files):
+    """
+    Monta um corpo ``multipart/form-data``; ``files`` é
+    ``{campo: (nome_do_arquivo, conteúdo, content_type)}``
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            f"\r\n\r\n{value}\r\n".encode()
+        )
+    for name, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'.encode()
+            + content
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return f"multipart/form-data; boundary={boundary}", b"".join(parts)
+
+
+class SurgeContext:
+    """
+    Dados usados para montar as requisições: tokens e ids existentes
+    """
+
+    def __init__(self, citizen_tokens, admin_tokens, post_ids, media_kb=512):
+        self.citizen_tokens = citizen_tokens
+        self.admin_tokens = admin_tokens
+        self.post_ids = post_ids
+        # Um único conteúdo de mídia reaproveitado; o servidor só valida
+        # extensão e tamanho
+        self.media = random.Random(0).randbytes(media_kb * 1024)
+
+    @staticmethod
+    def auth(token):
+        return {"Authorization": f"Bearer {token}"}
+
+
+def _json(method, path, token, data):
+    headers = {**SurgeContext.auth(token), "Content-Type": "application/json"}
+    return method, path, headers, json.dumps(data).encode()
+
+
+def _get(path, token=None, params=None):
+    if params:
+        path = f"{path}?{urlencode(params)}"
+    return "GET", path, SurgeContext.auth(token) if token else {}, b""
+
+
+def _alert_create(rng, ctx):
+    fields = {
+        "categoria": rng.choice(["enchente", "deslizamento", "tempestade"]),
+        "descricao": "Água subindo rápido na rua, moradores pedindo ajuda urgente.",
+        "localizacao": "Trindade, Florianópolis",
+        "latitude": f"{rng.uniform(-27.70, -27.50):.8f}",
+        "longitude": f"{rng.uniform(-48.60, -48.40):.8f}",
+        "prioridade": rng.randint(2, 4),
+    }
+    files = {}
+    if ctx.media:
+        files["media"] = ("foto.jpg", ctx.media, "image/jpeg")
+    content_type, body = multipart(fields, files)
+    headers = {
+        **SurgeContext.auth(rng.choice(ctx.citizen_tokens)),
+        "Content-Type": content_type,
+    }
+    return "POST", reverse("alerts:alert-create"), headers, body
+
+
+ENDPOINTS = {
+    "alert-create": _alert_create,
+    "alert-list": lambda rng, ctx: _get(
+        reverse("alerts:alert-list"), rng.choice(ctx.citizen_tokens)
+    ),
+    "post-feed": lambda rng, ctx: _get(
+        reverse("alerts:post-feed"), params={"page": rng.choice([1, 1, 1, 2, 3])}
+    ),
+    "comment-list": lambda rng, ctx: _get(
+        reverse("alerts:comment-list", kwargs={"post_id": rng.choice(ctx.post_ids)})
+    ),
+    "comment-create": lambda rng, ctx: _json(
+        "POST",
+        reverse("alerts:comment-create"),
+        rng.choice(ctx.citizen_tokens),
+        {"post_id": rng.choice(ctx.post_ids), "conteudo": "Aqui também alagou!"},
+    ),
+    "admin-alert-list": lambda rng, ctx: _get(
+        reverse("alerts:admin-alert-list"),
+        rng.choice(ctx.admin_tokens),
+        {"status": rng.choice(["pendente", "analisando"]), "ordering": "-prioridade"},
+    ),
+}
+
+
+def validate_profile(profile):
+    """
+    Valida o perfil e retorna a lista de problemas encontrados
+    """
+    problems = []
+    phases = profile.get("phases") or []
+    if not phases:
+        problems.append("O perfil precisa de ao menos uma fase")
+    for i, phase in enumerate(phases):
+        if phase.get("duration", 0) <= 0:
+            problems.append(f"Fase {i}: duration deve ser maior que zero")
+        if phase.get("rate", 0) < 0 or phase.get("rate_end", 0) < 0:
+            problems.append(f"Fase {i}: rate não pode ser negativo")
+
+    mix = profile.get("mix") or {}
+    if not mix or sum(mix.values()) <= 0:
+        problems.append("O perfil precisa de um mix com pesos positivos")
+    for name in mix:
+        if name not in ENDPOINTS:
+            problems.append(
+                f"Endpoint desconhecido no mix: {name} "
+                f"(disponíveis: {', '.join(ENDPOINTS)})"
+            )
+    return problems
+
+
+class SurgeStats:
+    """
+    Resultados por endpoint e por janela de ``interval`` segundos
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = defaultdict(list)
+        self.dropped = defaultdict(int)
+
+    def record(self, endpoint, offset, latency_ms, status):
+        """
+        ``status`` None indica falha de conexão ou tempo esgotado
+        """
+        self.samples[endpoint].append((offset, latency_ms, status))
+
+    def drop(self, endpoint):
+        self.dropped[endpoint] += 1
+
+    def _summary(self, samples, seconds):
+        latencies = sorted(latency for _, latency, _ in samples)
+        statuses = [status for _, _, status in samples]
+        errors = sum(1 for status in statuses if status is None or status >= 500)
+        throttled = sum(1 for status in statuses if status == 429)
+        return {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / seconds, 2) if seconds else None,
+            "error_rate": round(errors / len(samples), 4) if samples else 0,
+            "throttled_rate": round(throttled / len(samples), 4) if samples else 0,
+            "status": {
+                str(status or "falha"): statuses.count(status)
+                for status in sorted(set(statuses), key=lambda s: s or 0)
+            },
+            "p50_ms": _round(percentile(latencies, 50)),
+            "p95_ms": _round(percentile(latencies, 95)),
+            "p99_ms": _round(percentile(latencies, 99)),
+        }
+
+    def report(self, duration):
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            windows = defaultdict(list)
+            for sample in samples:
+                windows[int(sample[0] // self.interval)].append(sample)
+            endpoints[endpoint] = {
+                **self._summary(samples, duration),
+                "dropped": self.dropped.get(endpoint, 0),
+                "timeline": [
+                    {
+                        "start_s": window * self.interval,
+                        **self._summary(windows[window], self.interval),
+                    }
+                    for window in sorted(windows)
+                ],
+            }
+        return endpoints
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+class SurgeSimulator:
+    """
+    Reproduz o perfil de pico contra ``base_url``
+    """
+
+    def __init__(
+        self,
+        base_url,
+        profile,
+        context,
+        connections=100,
+        max_in_flight=2000,
+        interval=5,
+        timeout=30,
+        seed=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.profile = profile
+        self.context = context
+        self.connections = connections
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.stats = SurgeStats(interval)
+        self._endpoints = list(profile["mix"])
+        self._weights = [profile["mix"][name] for name in self._endpoints]
+
+    def arrivals(self):
+        """
+        Gera (instante, fase) das chegadas ao longo das fases do perfil
+        """
+        offset = 0.0
+        for phase in self.profile["phases"]:
+            start, duration = offset, phase["duration"]
+            rate, rate_end = phase["rate"], phase.get("rate_end", phase["rate"])
+            t = start
+            while True:
+                current = rate + (rate_end - rate) * (t - start) / duration
+                # Sem chegadas com taxa zero: avança em passos curtos
+                t += self.rng.expovariate(current) if current > 0 else 0.1
+                if t >= start + duration:
+                    break
+                if current > 0:
+                    yield t, phase["name"]
+            offset = start + duration
+
+    async def _send(self, pool, endpoint, scheduled, started_at):
+        method, path, headers, body = ENDPOINTS[endpoint](self.rng, self.context)
+        status = None
+        try:
+            status, _ = await pool.request(method, path, headers, body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            logger.debug("Falha em %s: %r", endpoint, e)
+        except ValueError as e:
+            # Resposta que não é HTTP válido
+            logger.debug("Resposta inválida em %s: %r", endpoint, e)
+        latency = (time.perf_counter() - started_at - scheduled) * 1000
+        self.stats.record(endpoint, scheduled, latency, status)
+
+    async def run(self, progress=None):
+        pool = ConnectionPool(self.base_url, self.connections, self.timeout)
+        in_flight = set()
+        phases = {}
+        started_at = time.perf_counter()
+        current_phase = None
+
+        try:
+            for scheduled, phase in self.arrivals():
+                delay = scheduled - (time.perf_counter() - started_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if phase != current_phase:
+                    current_phase = phase
+                    phases[phase] = scheduled
+                    if progress:
+                        progress(phase, scheduled)
+
+                endpoint = self.rng.choices(self._endpoints, self._weights)[0]
+                if len(in_flight) >= self.max_in_flight:
+                    # O gerador não acompanha: descarta em vez de atrasar
+                    self.stats.drop(endpoint)
+                    continue
+
+                task = asyncio.create_task(
+                    self._send(pool, endpoint, scheduled, started_at)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            if in_flight:
+                await asyncio.wait(in_flight)
+        finally:
+            pool.close()
+
+        duration = time.perf_counter() - started_at
+        return {
+            "meta": {
+                "base_url": self.base_url,
+                "duration_s": round(duration, 2),
+                "connections": self.connections,
+                "interval_s": self.stats.interval,
+                "phases": phases,
+                "profile": self.profile,
+            },
+            "endpoints": self.stats.report(duration),
+        }
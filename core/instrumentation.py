@@ -0,0 +1,263 @@
+"""
+Instrumentação de SQL por requisição
+
+``SQLInstrumentationMiddleware`` registra, para cada requisição, o número de
+consultas, o tempo total no banco e as consultas repetidas (mesmo SQL com
+parâmetros diferentes). Com isso:
+
+- administradores recebem os números no cabeçalho ``Server-Timing``
+  (decidido pelo usuário autenticado pela view do DRF, que pode ser um
+  ``TokenUser`` sem os dados da conta; nesse caso o token é conferido pela
+  autenticação JWT padrão);
+- requisições acima dos limites de ``SQL_INSTRUMENTATION`` são registradas
+  no log;
+- com ``DEBUG``, consultas repetidas além do limite (N+1) são registradas
+  junto com o campo do serializer e a linha do projeto que as dispararam.
+
+Desligado (``SQL_INSTRUMENTATION["ENABLED"]``), o middleware se remove da
+cadeia na inicialização (``MiddlewareNotUsed``) e não tem custo algum.
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    # Quem recebe o cabeçalho Server-Timing: "staff", "all" ou "off"
+    "SERVER_TIMING": "staff",
+    # Limites para registrar a requisição no log
+    "SLOW_REQUEST_MS": 500,
+    "SLOW_DB_MS": 200,
+    "MAX_QUERIES": 50,
+    # Repetições da mesma consulta consideradas N+1
+    "DUPLICATE_THRESHOLD": 5,
+    # Detecção de N+1 com origem; None segue o DEBUG
+    "DETECT_N_PLUS_ONE": None,
+}
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"IN \((?:(?:%s|\?), )*(?:%s|\?)\)")
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+_LIBRARY_DIRS = tuple(
+    path for path in sys.path if "site-packages" in path or "dist-packages" in path
+)
+
+
+def get_instrumentation_settings():
+    """
+    Retorna as configurações de instrumentação mescladas com os padrões
+    """
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "SQL_INSTRUMENTATION", {}))
+    if config["DETECT_N_PLUS_ONE"] is None:
+        config["DETECT_N_PLUS_ONE"] = bool(settings.DEBUG)
+    return config
+
+
+def normalize_sql(sql):
+    """
+    Troca valores literais por ``?`` e listas de ``IN`` por uma só, para que
+    consultas que só diferem nos parâmetros sejam agrupadas
+    """
+    return _IN_LISTS.sub("IN (...)", _LITERALS.sub("?", sql))
+
+
+@lru_cache(maxsize=2048)
+def query_template(sql):
+    """
+    Forma da consulta a partir do SQL parametrizado (com ``%s``), que só
+    varia no tamanho das listas de ``IN``
+    """
+    return _IN_LISTS.sub("IN (...)", sql)
+
+
+def find_origin():
+    """
+    Localiza quem disparou a consulta na pilha atual: o campo de serializer
+    mais interno (``Serializer.campo``) e a linha de código do projeto
+    """
+    from rest_framework.fields import Field
+
+    serializer_field = None
+    code = None
+    frame = sys._getframe(1)
+    while frame is not None and (serializer_field is None or code is None):
+        filename = frame.f_code.co_filename
+        if (
+            code is None
+            and filename.startswith(_PROJECT_DIR)
+            and not filename.startswith(_LIBRARY_DIRS)
+            and filename != __file__
+        ):
+            path = os.path.relpath(filename, _PROJECT_DIR)
+            code = f"{path}:{frame.f_lineno} em {frame.f_code.co_name}"
+
+        field = frame.f_locals.get("self")
+        if (
+            serializer_field is None
+            and isinstance(field, Field)
+            and field.parent is not None
+            and field.field_name
+        ):
+            serializer_field = f"{type(field.parent).__name__}.{field.field_name}"
+        frame = frame.f_back
+    return serializer_field, code
+
+
+class QueryRecorder:
+    """
+    ``execute_wrapper`` que conta e cronometra as consultas da requisição
+    """
+
+    def __init__(self, detect_origin=False, duplicate_threshold=5):
+        self.detect_origin = detect_origin
+        self.duplicate_threshold = duplicate_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.templates = {}
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        template = query_template(sql)
+        seen = self.templates.get(template, 0) + 1
+        self.templates[template] = seen
+        if self.detect_origin and seen == self.duplicate_threshold:
+            self.origins[template] = find_origin()
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def duplicates(self, minimum=2):
+        """
+        [(vezes, forma da consulta)] das consultas repetidas, da mais
+        repetida para a menos
+        """
+        repeated = [(n, sql) for sql, n in self.templates.items() if n >= minimum]
+        return sorted(repeated, key=lambda item: item[0], reverse=True)
+
+
+def authenticated_user(request):
+    """
+    Usuário (da conta) autenticado na requisição, ou None
+
+    O DRF troca ``request.user`` pelo usuário autenticado na view; a carga
+    preguiçosa da sessão não é disparada. Um ``TokenUser`` (autenticação só
+    pelo token, sem banco) é trocado pelo usuário da autenticação JWT padrão.
+    """
+    from rest_framework.exceptions import APIException
+    from rest_framework.settings import api_settings
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.models import TokenUser
+
+    user = request.__dict__.get("user")
+    if isinstance(user, SimpleLazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+
+    if user is not None and not isinstance(user, TokenUser):
+        return user if user.is_authenticated else None
+
+    if "HTTP_AUTHORIZATION" not in request.META:
+        return None
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(authentication_class, JWTAuthentication):
+            try:
+                result = authentication_class().authenticate(request)
+            except APIException:
+                return None
+            return result[0] if result else None
+    return None
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Mede as consultas de cada requisição (ver o docstring do módulo)
+    """
+
+    def __init__(self, get_response):
+        self.config = get_instrumentation_settings()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(
+            detect_origin=self.config["DETECT_N_PLUS_ONE"],
+            duplicate_threshold=self.config["DUPLICATE_THRESHOLD"],
+        )
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+
+        if self._show_server_timing(request):
+            response.headers["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={db_ms:.1f};desc="{recorder.count} consultas"',
+                    f"app;dur={elapsed_ms:.1f}",
+                ]
+            )
+
+        self._log(request, response, recorder, elapsed_ms, db_ms)
+        return response
+
+    def _show_server_timing(self, request):
+        mode = self.config["SERVER_TIMING"]
+        if mode == "all":
+            return True
+        if mode == "staff":
+            user = authenticated_user(request)
+            return bool(user is not None and user.is_staff)
+        return False
+
+    def _log(self, request, response, recorder, elapsed_ms, db_ms):
+        if (
+            elapsed_ms > self.config["SLOW_REQUEST_MS"]
+            or db_ms > self.config["SLOW_DB_MS"]
+            or recorder.count > self.config["MAX_QUERIES"]
+        ):
+            logger.warning(
+                "Requisição acima dos limites: %s %s -> %s, %d consultas, "
+                "%.1fms no banco, %.1fms no total%s",
+                request.method,
+                request.path,
+                response.status_code,
+                recorder.count,
+                db_ms,
+                elapsed_ms,
+                "".join(f"\n  {n}x {sql}" for n, sql in recorder.duplicates()[:5]),
+            )
+
+        if self.config["DETECT_N_PLUS_ONE"]:
+            threshold = self.config["DUPLICATE_THRESHOLD"]
+            for n, sql in recorder.duplicates(minimum=threshold):
+                serializer_field, code = recorder.origins.get(sql, (None, None))
+                logger.warning(
+                    "Possível N+1 em %s %s: %dx %s\n  serializer: %s\n  origem: %s",
+                    request.method,
+                    request.path,
+                    n,
+                    sql,
+                    serializer_field or "-",
+                    code or "-",
+                )
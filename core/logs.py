@@ -0,0 +1,287 @@
+"""
+Logging estruturado e fora do caminho da requisição
+
+- ``BoundedQueueHandler`` só enfileira o registro; uma thread
+  (``QueueListener``) repassa aos handlers de saída. Com a fila cheia, o
+  registro é descartado e contado, e um resumo dos descartes entra na fila
+  assim que houver espaço.
+- ``RequestContextMiddleware`` guarda o id da requisição, a rota, o usuário
+  e o método em ``contextvars``; ``RequestContextFilter`` copia esses campos
+  para cada registro emitido durante a requisição e o middleware registra,
+  ao final, status, latência e número de consultas (logger
+  ``core.requests``).
+- ``JSONFormatter`` escreve um objeto JSON por linha, com o traceback no
+  campo ``exception``.
+
+A configuração (``LOGGING``) fica em ``core/settings.py``.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from django.db import connections
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("core.requests")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_request = ContextVar("log_request", default=None)
+
+# Campos de LogRecord que não são repassados como "extra" no JSON
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request",
+    "request_id",
+    "route",
+    "user_id",
+    "method",
+    "path",
+}
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Enfileira os registros em uma fila de até ``maxsize`` registros; a
+    thread de saída os grava em ``stream`` (padrão: ``sys.stderr``) com o
+    formatador deste handler, ou os repassa a ``handlers``
+
+    A thread de saída é iniciada no primeiro registro de cada processo,
+    o que também a recria nos workers após um ``fork``.
+    """
+
+    def __init__(self, stream=None, handlers=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.handlers = list(handlers) if handlers else [logging.StreamHandler(stream)]
+        self.maxsize = maxsize
+        self.dropped = Counter()
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Após um fork, a fila e a thread herdadas não valem mais
+            self.queue = queue.Queue(self.maxsize)
+            self.dropped.clear()
+            for handler in self.handlers:
+                if handler.formatter is None:
+                    handler.setFormatter(self.formatter)
+            self._listener = QueueListener(
+                self.queue, *self.handlers, respect_handler_level=True
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self._stop_listener)
+
+    def prepare(self, record):
+        """
+        Monta a mensagem e o traceback na thread que emitiu o registro, sem
+        formatar o registro inteiro como o ``QueueHandler`` padrão, para que
+        o formatador de saída receba os campos separados
+        """
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+
+        prepared = logging.makeLogRecord(record.__dict__)
+        prepared.msg = record.message
+        prepared.args = None
+        prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.levelname] += 1
+            return
+
+        if self.dropped:
+            self._enqueue_summary()
+
+    def _enqueue_summary(self):
+        with self._lock:
+            dropped, self.dropped = self.dropped, Counter()
+        if not dropped:
+            return
+        summary = logger.makeRecord(
+            logger.name,
+            logging.WARNING,
+            __file__,
+            0,
+            "Fila de log cheia: %d registros descartados (%s)",
+            (
+                sum(dropped.values()),
+                ", ".join(f"{level}: {n}" for level, n in dropped.most_common()),
+            ),
+            None,
+        )
+        try:
+            self.queue.put_nowait(self.prepare(summary))
+        except queue.Full:
+            with self._lock:
+                self.dropped.update(dropped)
+
+    def _stop_listener(self):
+        """
+        Esvazia a fila nos handlers de saída e encerra a thread
+        """
+        with self._lock:
+            listener, self._listener = self._listener, None
+            running = self._pid == os.getpid()
+            self._pid = None
+        if listener is not None and running:
+            listener.stop()
+
+    def close(self):
+        self._stop_listener()
+        super().close()
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Acrescenta ao registro o contexto da requisição em andamento
+    """
+
+    def filter(self, record):
+        context = _request.get()
+        if context is None:
+            # Registros do Django emitidos depois do middleware (django.request)
+            context = getattr(getattr(record, "request", None), "log_context", None)
+        if context is not None:
+            record.request_id = context["request_id"]
+            record.method = context["method"]
+            record.path = context["path"]
+            record.route = context["route"]
+            record.user_id = context["user_id"] or _user_id(context["request"])
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Um objeto JSON por registro, com os campos de contexto e os ``extra``
+    """
+
+    def format(self, record):
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("request_id", "method", "path", "route", "user_id"):
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _user_id(request):
+    """
+    Id do usuário autenticado sem disparar a carga preguiçosa da sessão
+    (a autenticação JWT do DRF substitui ``request.user`` dentro da view)
+    """
+    user = request.__dict__.get("user")
+    if isinstance(user, SimpleLazyObject):
+        if user._wrapped is empty:
+            return None
+        user = user._wrapped
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class RequestContextMiddleware:
+    """
+    Contexto de log da requisição e registro de acesso ao final (ver o
+    docstring do módulo)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        context = {
+            "request": request,
+            "request_id": request_id[:64],
+            "method": request.method,
+            "path": request.path,
+            "route": None,
+            "user_id": None,
+        }
+        request.log_context = context
+        token = _request.set(context)
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+            latency_ms = (time.perf_counter() - start) * 1000
+
+            context["user_id"] = _user_id(request)
+            response.headers[REQUEST_ID_HEADER] = context["request_id"]
+            level = logging.WARNING if response.status_code >= 500 else logging.INFO
+            if request_logger.isEnabledFor(level):
+                request_logger.log(
+                    level,
+                    "%s %s -> %s",
+                    request.method,
+                    request.path,
+                    response.status_code,
+                    extra={
+                        "status": response.status_code,
+                        "latency_ms": round(latency_ms, 1),
+                        "queries": counter.count,
+                    },
+                )
+            return response
+        finally:
+            _request.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        context = _request.get()
+        match = request.resolver_match
+        if context is not None and match is not None:
+            context["route"] = match.view_name
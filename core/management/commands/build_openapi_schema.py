@@ -0,0 +1,44 @@
+"""
+Gera o schema OpenAPI servido em ``/schema/`` (YAML e JSON, com versões
+gzip) em ``OPENAPI_SCHEMA_DIR``
+
+Rodado no build da imagem, para que os processos da aplicação não precisem
+importar o drf-spectacular nem os módulos ``docs`` para servir o schema.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.schema import get_schema_dir, write_artifacts
+
+
+class Command(BaseCommand):
+    help = "Gera os arquivos do schema OpenAPI servidos em /schema/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            help="Diretório de saída (padrão: settings.OPENAPI_SCHEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        from drf_spectacular.renderers import (
+            OpenApiJsonRenderer,
+            OpenApiYamlRenderer,
+        )
+        from drf_spectacular.settings import spectacular_settings
+
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+
+        paths = write_artifacts(
+            options["dir"] or get_schema_dir(),
+            {
+                "yaml": OpenApiYamlRenderer().render(schema),
+                "json": OpenApiJsonRenderer().render(schema),
+            },
+        )
+        for path in paths:
+            self.stdout.write(f"Gravado {path}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Schema com {len(schema['paths'])} caminhos gerado")
+        )
@@ -0,0 +1,474 @@
+"""
+Métricas no formato de exposição do Prometheus, agregadas entre workers
+
+Cada processo grava seus valores em um arquivo próprio em ``METRICS["DIR"]``
+(``metrics_<pid>.db``, mapeado em memória). Como cada arquivo tem um único
+processo escrevendo, não há trava entre processos: a escrita é só uma
+atualização de 8 bytes no lugar, e ``/metrics`` lê e soma os arquivos de
+todos os workers a cada coleta.
+
+- Contadores e histogramas somam todos os arquivos, inclusive de processos
+  já encerrados (os totais continuam valendo).
+- Gauges somam apenas os processos vivos.
+
+Limpe o diretório ao iniciar o serviço, para não somar arquivos de uma
+execução anterior.
+
+Métricas disponíveis: requisições por rota e status, histogramas de
+latência, requisições em andamento, conexões de banco abertas, acertos e
+falhas de cache e fila de verificação de senhas.
+"""
+
+import hmac
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "DIR": os.path.join(tempfile.gettempdir(), "plataforma-metrics"),
+    # /metrics exige "Authorization: Bearer <TOKEN>"; sem token, só responde
+    # com DEBUG ligado
+    "TOKEN": None,
+}
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_metrics_settings():
+    """
+    Retorna as configurações de métricas mescladas com os padrões
+    """
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "METRICS", {}))
+    return config
+
+
+class FileStore:
+    """
+    Valores (float64) por chave em um arquivo mapeado em memória por processo
+
+    Formato: 8 bytes de cabeçalho (bytes em uso) e, para cada chave, o
+    tamanho (int32), a chave em UTF-8 com preenchimento até múltiplo de 8 e
+    o valor (float64).
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"metrics_{os.getpid()}.db")
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(self.INITIAL_SIZE)
+            self._mmap = mmap.mmap(self._file.fileno(), self.INITIAL_SIZE)
+            struct.pack_into("q", self._mmap, 0, 8)
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        # O pid pode ter sido reaproveitado de um processo encerrado
+        self._positions = {key: position for key, position, _ in _entries(self._mmap)}
+        self._used = struct.unpack_from("q", self._mmap, 0)[0]
+        self._pid = os.getpid()
+
+    def _position(self, key):
+        if self._pid != os.getpid():
+            self._open()
+
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        return position
+
+    def _append(self, key):
+        encoded = key.encode()
+        size = 4 + len(encoded)
+        size += -size % 8
+        if self._used + size + 8 > len(self._mmap):
+            capacity = len(self._mmap)
+            while self._used + size + 8 > capacity:
+                capacity *= 2
+            self._mmap.close()
+            self._file.truncate(capacity)
+            self._mmap = mmap.mmap(self._file.fileno(), capacity)
+
+        struct.pack_into(
+            f"i{len(encoded)}s", self._mmap, self._used, len(encoded), encoded
+        )
+        position = self._used + size
+        struct.pack_into("d", self._mmap, position, 0.0)
+        # O cabeçalho só avança com a entrada completa, para quem lê
+        self._used = position + 8
+        struct.pack_into("q", self._mmap, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def add(self, key, amount):
+        with self._lock:
+            position = self._position(key)
+            value = struct.unpack_from("d", self._mmap, position)[0]
+            struct.pack_into("d", self._mmap, position, value + amount)
+
+    def set(self, key, value):
+        with self._lock:
+            struct.pack_into("d", self._mmap, self._position(key), value)
+
+    def read_all(self):
+        """
+        Retorna ``[(pid, {chave: valor})]`` de todos os arquivos do diretório
+        """
+        result = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return result
+
+        for name in names:
+            if not (name.startswith("metrics_") and name.endswith(".db")):
+                continue
+            try:
+                pid = int(name[len("metrics_") : -len(".db")])
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    data = f.read()
+            except (ValueError, OSError):
+                continue
+            result.append((pid, {key: value for key, _, value in _entries(data)}))
+        return result
+
+
+def _entries(data):
+    if len(data) < 8:
+        return
+    used = struct.unpack_from("q", data, 0)[0]
+    position = 8
+    while position < used:
+        length = struct.unpack_from("i", data, position)[0]
+        key = bytes(data[position + 4 : position + 4 + length]).decode()
+        position += 4 + length
+        position += -position % 8
+        yield key, position, struct.unpack_from("d", data, position)[0]
+        position += 8
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class NullStore:
+    """
+    Usado com as métricas desligadas: descarta tudo
+    """
+
+    def add(self, key, amount):
+        pass
+
+    def set(self, key, value):
+        pass
+
+    def read_all(self):
+        return []
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = get_metrics_settings()
+                _store = FileStore(config["DIR"]) if config["ENABLED"] else NullStore()
+    return _store
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    @property
+    def full_name(self):
+        return f"{self.name}_total" if self.type == "counter" else self.name
+
+    def _key(self, suffix, labels):
+        values = [str(labels[label]) for label in self.labelnames]
+        return json.dumps([self.name, suffix, values], separators=(",", ":"))
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        get_store().add(self._key("_total", labels), amount)
+
+
+class Gauge(Metric):
+    """
+    Soma dos valores dos processos vivos
+    """
+
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        get_store().add(self._key("", labels), amount)
+
+    def dec(self, amount=1, **labels):
+        get_store().add(self._key("", labels), -amount)
+
+    def set(self, value, **labels):
+        get_store().set(self._key("", labels), value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        store = get_store()
+        bucket = self.buckets[bisect_left(self.buckets, value)]
+        # Contagem por faixa (não acumulada); acumulada na exposição
+        store.add(self._key("_bucket", {**labels, "le": bucket}), 1)
+        store.add(self._key("_sum", labels), value)
+        store.add(self._key("_count", labels), 1)
+
+    def _key(self, suffix, labels):
+        if suffix != "_bucket":
+            return super()._key(suffix, labels)
+        values = [str(labels[label]) for label in self.labelnames]
+        return json.dumps(
+            [self.name, suffix, values + [repr(float(labels["le"]))]],
+            separators=(",", ":"),
+        )
+
+
+REGISTRY = {}
+
+REQUESTS = Counter(
+    "http_requests",
+    "Requisições HTTP por rota, método e status",
+    ["route", "method", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota e método",
+    ["route", "method"],
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requisições HTTP em andamento")
+DB_CONNECTIONS = Gauge(
+    "db_connections_open", "Conexões de banco abertas pelos workers", ["alias"]
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Leituras de cache por uso e resultado (hit ou miss)",
+    ["cache", "result"],
+)
+PASSWORD_CHECK_PENDING = Gauge(
+    "password_check_pending",
+    "Verificações de senha rodando ou aguardando no pool",
+)
+PASSWORD_CHECK_REJECTED = Counter(
+    "password_check_rejected",
+    "Logins recusados por falta de vaga no pool de verificação de senhas",
+)
+
+
+def record_cache(name, hit):
+    """
+    Contabiliza uma leitura de cache (``hit`` True para acerto)
+    """
+    CACHE_REQUESTS.inc(cache=name, result="hit" if hit else "miss")
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_le(value):
+    value = float(value)
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+def collect():
+    """
+    Soma os arquivos de todos os processos: ``{(nome, sufixo, valores): valor}``
+    """
+    totals = defaultdict(float)
+    for pid, values in get_store().read_all():
+        alive = None
+        for key, value in values.items():
+            name, suffix, labels = json.loads(key)
+            metric = REGISTRY.get(name)
+            if metric is None:
+                continue
+            if metric.type == "gauge":
+                if alive is None:
+                    alive = _is_alive(pid)
+                if not alive:
+                    continue
+            totals[(name, suffix, tuple(labels))] += value
+    return totals
+
+
+def render():
+    """
+    Texto no formato de exposição do Prometheus (0.0.4)
+    """
+    totals = collect()
+    by_metric = defaultdict(list)
+    for (name, suffix, labels), value in totals.items():
+        by_metric[name].append((suffix, labels, value))
+
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f"# HELP {metric.full_name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.full_name} {metric.type}")
+        samples = sorted(by_metric.get(name, []))
+
+        if metric.type != "histogram":
+            if not samples and not metric.labelnames:
+                samples = [("_total" if metric.type == "counter" else "", (), 0.0)]
+            for suffix, labels, value in samples:
+                lines.append(
+                    f"{name}{suffix}{_labels(metric.labelnames, labels)} {value!r}"
+                )
+            continue
+
+        buckets = defaultdict(dict)
+        series = defaultdict(dict)
+        for suffix, labels, value in samples:
+            if suffix == "_bucket":
+                buckets[labels[:-1]][float(labels[-1])] = value
+            else:
+                series[labels][suffix] = value
+
+        for labels, values in sorted(series.items()):
+            cumulative = 0.0
+            for bound in metric.buckets:
+                cumulative += buckets[labels].get(bound, 0.0)
+                label_text = _labels(
+                    metric.labelnames + ("le",), labels + (_format_le(bound),)
+                )
+                lines.append(f"{name}_bucket{label_text} {cumulative!r}")
+            label_text = _labels(metric.labelnames, labels)
+            lines.append(f"{name}_sum{label_text} {values.get('_sum', 0.0)!r}")
+            lines.append(f"{name}_count{label_text} {values.get('_count', 0.0)!r}")
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    Exposição das métricas para o Prometheus
+    """
+    config = get_metrics_settings()
+    if not config["ENABLED"]:
+        return HttpResponse(status=404)
+
+    token = config["TOKEN"]
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+@lru_cache(maxsize=1)
+def _warn_missing_token():
+    # Uma vez por processo, não a cada instância do middleware
+    logger.warning("METRICS_TOKEN não definido: /metrics responderá 403")
+
+
+class MetricsMiddleware:
+    """
+    Registra contagem, latência e status das requisições por rota
+    """
+
+    def __init__(self, get_response):
+        config = get_metrics_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        if not config["TOKEN"] and not settings.DEBUG:
+            _warn_missing_token()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+
+            match = getattr(request, "resolver_match", None)
+            route = (match.view_name or match.route) if match else "desconhecida"
+            REQUESTS.inc(route=route, method=request.method, status=status)
+            LATENCY.observe(elapsed, route=route, method=request.method)
+
+            for connection in connections.all(initialized_only=True):
+                DB_CONNECTIONS.set(
+                    int(connection.connection is not None), alias=connection.alias
+                )
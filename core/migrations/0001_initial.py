@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Hash do SQL parametrizado; agrupa execuções da mesma consulta",
+                        max_length=32,
+                        verbose_name="Forma da Consulta",
+                    ),
+                ),
+                (
+                    "sql",
+                    models.TextField(
+                        help_text="SQL parametrizado (com %s)", verbose_name="SQL"
+                    ),
+                ),
+                (
+                    "parametros",
+                    models.JSONField(blank=True, null=True, verbose_name="Parâmetros"),
+                ),
+                ("duracao_ms", models.FloatField(verbose_name="Duração (ms)")),
+                (
+                    "banco",
+                    models.CharField(
+                        default="default", max_length=50, verbose_name="Banco"
+                    ),
+                ),
+                (
+                    "rota",
+                    models.CharField(
+                        blank=True,
+                        help_text="Nome da URL da requisição que executou a consulta",
+                        max_length=200,
+                        verbose_name="Rota",
+                    ),
+                ),
+                (
+                    "plano",
+                    models.TextField(
+                        blank=True,
+                        help_text="Saída do EXPLAIN; vazio quando a amostra foi limitada",
+                        verbose_name="Plano de Execução",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="Data de Captura"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Consulta Lenta",
+                "verbose_name_plural": "Consultas Lentas",
+                "ordering": ["-id"],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """
+    Consulta lenta capturada por ``core.slow_queries``
+
+    A tabela funciona como um buffer circular: a cada gravação, as linhas
+    além de ``SLOW_QUERIES["MAX_ROWS"]`` são apagadas.
+    """
+
+    fingerprint = models.CharField(
+        max_length=32,
+        db_index=True,
+        verbose_name="Forma da Consulta",
+        help_text="Hash do SQL parametrizado; agrupa execuções da mesma consulta",
+    )
+
+    sql = models.TextField(verbose_name="SQL", help_text="SQL parametrizado (com %s)")
+
+    parametros = models.JSONField(null=True, blank=True, verbose_name="Parâmetros")
+
+    duracao_ms = models.FloatField(verbose_name="Duração (ms)")
+
+    banco = models.CharField(max_length=50, default="default", verbose_name="Banco")
+
+    rota = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Rota",
+        help_text="Nome da URL da requisição que executou a consulta",
+    )
+
+    plano = models.TextField(
+        blank=True,
+        verbose_name="Plano de Execução",
+        help_text="Saída do EXPLAIN; vazio quando a amostra foi limitada",
+    )
+
+    data_criacao = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name="Data de Captura"
+    )
+
+    class Meta:
+        verbose_name = "Consulta Lenta"
+        verbose_name_plural = "Consultas Lentas"
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.fingerprint} ({self.duracao_ms:.0f}ms)"
@@ -0,0 +1,16 @@
+"""
+Gerador de schema do drf-spectacular com os decoradores de ``core.schema``
+
+Importado só quando o schema é gerado (``SPECTACULAR_SETTINGS``).
+"""
+
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+
+from .schema import apply_lazy_schemas
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    def parse(self, input_request, public):
+        # As views já foram importadas ao listar os endpoints
+        apply_lazy_schemas()
+        return super().parse(input_request, public)
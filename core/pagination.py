@@ -0,0 +1,92 @@
+"""
+Paginação com contagem barata para listagens grandes
+"""
+
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que evita o COUNT(*) completo em tabelas grandes
+
+    - Sem filtros, no PostgreSQL, usa a estimativa de linhas do planner
+      (``pg_class.reltuples``) quando ela passa de ``max_exact_count``.
+    - Com filtros, conta no máximo ``max_exact_count`` linhas (COUNT sobre
+      uma subquery com LIMIT); acima disso a contagem é marcada como estimada.
+
+    ``count_is_exact`` indica se ``count`` é o valor exato. Com a contagem
+    estimada, as páginas além dela continuam acessíveis: ``has_next`` passa a
+    depender de haver mais uma linha depois da página, e não do total.
+    """
+
+    def __init__(self, object_list, per_page, max_exact_count=10000, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.max_exact_count = max_exact_count
+        self.count_is_exact = True
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = queryset.query
+
+        if not query.where:
+            estimate = self._planner_estimate(queryset)
+            if estimate is not None and estimate > self.max_exact_count:
+                self.count_is_exact = False
+                return estimate
+
+        count = queryset.order_by()[: self.max_exact_count + 1].count()
+        if count > self.max_exact_count:
+            self.count_is_exact = False
+            return self.max_exact_count
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Além da contagem estimada a página ainda pode ter linhas
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+
+        # Uma linha a mais indica se existe a próxima página
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        page = EstimatedPage(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _planner_estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        if not row or row[0] < 0:
+            return None
+        return row[0]
+
+
+class EstimatedPage(Page):
+    """
+    Página de ``EstimatedCountPaginator`` quando a contagem é estimada
+    """
+
+    has_more = False
+
+    def has_next(self):
+        return self.has_more
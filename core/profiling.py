@@ -0,0 +1,357 @@
+"""
+Profiler por amostragem para requisições em produção
+
+Uma requisição é perfilada quando:
+
+- traz um token de administrador no cabeçalho ``X-Profile-Token`` ou no
+  parâmetro ``_profile`` (tokens assinados com a ``SECRET_KEY``, emitidos
+  pela API administrativa e válidos por ``TOKEN_MAX_AGE`` segundos); ou
+- a rota aparece em ``PROFILING["ROUTES"]`` e é sorteada pela fração
+  configurada (``{"alerts:post-feed": 0.01}``).
+
+Durante a requisição, uma thread lê a pilha da thread que a atende a cada
+``INTERVAL_MS`` e conta as pilhas iguais. O resultado é gravado em
+``PROFILING["DIR"]`` no formato "collapsed" (``a;b;c 12``, uma pilha por
+linha), aceito pelo ``flamegraph.pl``, speedscope e similares, com um
+``.json`` de metadados ao lado. A resposta perfilada traz o cabeçalho
+``X-Profile-Id``.
+
+Fora desses casos o custo é só a checagem do cabeçalho e do parâmetro (e a
+resolução da URL, quando há rotas amostradas). A conferência de que o dono
+de um token válido ainda é administrador fica em cache por
+``STAFF_CHECK_SECONDS``, para não consultar o banco a cada requisição.
+
+Os perfis ficam no disco do servidor que atendeu a requisição perfilada, e a
+API administrativa lista os do servidor que a atende. Com mais de um
+servidor, aponte ``PROFILING["DIR"]`` para um diretório compartilhado (ex.:
+um volume de rede); sem isso, a listagem mostra só os perfis daquele
+servidor.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "DIR": os.path.join(tempfile.gettempdir(), "plataforma-profiles"),
+    # Intervalo entre amostras da pilha
+    "INTERVAL_MS": 5,
+    # Amostragem encerrada depois deste tempo, mesmo com a requisição ativa
+    "MAX_SECONDS": 30,
+    # Perfis guardados; os mais antigos são apagados
+    "MAX_PROFILES": 200,
+    # Requisições perfiladas ao mesmo tempo no processo; as demais seguem sem
+    "MAX_CONCURRENT": 2,
+    "TOKEN_MAX_AGE": 600,
+    # Tempo em cache da conferência de que o dono do token é administrador
+    "STAFF_CHECK_SECONDS": 60,
+    # {nome da rota: fração das requisições perfiladas}
+    "ROUTES": {},
+}
+
+HEADER = "X-Profile-Token"
+QUERY_PARAM = "_profile"
+TOKEN_SALT = "core.profiling"
+STAFF_KEY = "profiling:staff:{user_id}"
+
+_PROFILE_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+_PROJECT_DIR = str(settings.BASE_DIR)
+
+
+def get_profiling_settings():
+    """
+    Retorna as configurações do profiler mescladas com os padrões
+    """
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "PROFILING", {}))
+    return config
+
+
+def issue_token(user):
+    """
+    Emite um token de perfilamento para o administrador ``user``
+    """
+    return signing.dumps({"u": user.pk}, salt=TOKEN_SALT, compress=True)
+
+
+def check_token(token, max_age, staff_check_seconds=60):
+    """
+    Retorna o id do administrador dono do token, ou None se o token for
+    inválido, expirado ou de alguém que deixou de ser administrador
+
+    A conferência no banco fica em cache por ``staff_check_seconds``.
+    """
+    from django.contrib.auth.models import User
+
+    try:
+        user_id = signing.loads(token, salt=TOKEN_SALT, max_age=max_age)["u"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+    key = STAFF_KEY.format(user_id=user_id)
+    if cache.get(key) is None:
+        if not User.objects.filter(pk=user_id, is_staff=True, is_active=True).exists():
+            return None
+        cache.set(key, True, staff_check_seconds)
+    return user_id
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_DIR):
+        filename = os.path.relpath(filename, _PROJECT_DIR)
+    else:
+        for marker in ("site-packages/", "dist-packages/"):
+            if marker in filename:
+                filename = filename.split(marker, 1)[1]
+                break
+    # ";" separa os quadros no formato collapsed
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Amostra a pilha de uma thread em intervalos fixos a partir de outra
+    thread
+
+    A thread amostrada não é instrumentada: o custo fica com a thread do
+    profiler, que disputa o GIL a cada amostra.
+    """
+
+    def __init__(self, thread_id, interval=0.005, max_seconds=30):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        labels = {}
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """
+        Pilhas no formato collapsed, da mais amostrada para a menos
+        """
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+class ProfileStorage:
+    """
+    Perfis gravados em disco: ``<id>.folded`` com as pilhas e ``<id>.json``
+    com os metadados
+    """
+
+    def __init__(self, directory, max_profiles=200):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def save(self, collapsed, metadata):
+        """
+        Grava o perfil, apaga os excedentes e retorna o id
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = (
+            f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+        )
+        metadata = {"id": profile_id, **metadata}
+
+        self._write(f"{profile_id}.folded", collapsed)
+        # Os metadados por último: a listagem só enxerga perfis completos
+        self._write(f"{profile_id}.json", json.dumps(metadata, ensure_ascii=False))
+        self._prune()
+        return profile_id
+
+    def list(self):
+        """
+        Metadados dos perfis, do mais recente para o mais antigo
+        """
+        profiles = []
+        for profile_id in self._ids():
+            try:
+                with open(self._path(f"{profile_id}.json"), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path(self, profile_id):
+        """
+        Caminho do arquivo de pilhas, ou None se o perfil não existir
+        """
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self._path(f"{profile_id}.folded")
+        return path if os.path.exists(path) else None
+
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        ids = [name[:-5] for name in names if name.endswith(".json")]
+        return sorted((i for i in ids if _PROFILE_ID.match(i)), reverse=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write(self, name, content):
+        tmp = self._path(f".{name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, self._path(name))
+
+    def _prune(self):
+        for profile_id in self._ids()[self.max_profiles :]:
+            for ext in (".json", ".folded"):
+                try:
+                    os.remove(self._path(f"{profile_id}{ext}"))
+                except FileNotFoundError:
+                    pass
+
+
+def get_storage():
+    config = get_profiling_settings()
+    return ProfileStorage(config["DIR"], config["MAX_PROFILES"])
+
+
+class ProfilingMiddleware:
+    """
+    Perfila as requisições marcadas por token ou sorteadas por rota (ver o
+    docstring do módulo)
+    """
+
+    def __init__(self, get_response):
+        self.config = get_profiling_settings()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.routes = dict(self.config["ROUTES"])
+        self.storage = get_storage()
+        self.slots = threading.BoundedSemaphore(self.config["MAX_CONCURRENT"])
+
+    def __call__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        if not self.slots.acquire(blocking=False):
+            logger.info("Perfilamento ignorado: limite de perfis simultâneos")
+            return self.get_response(request)
+
+        try:
+            return self._profile(request, *trigger)
+        finally:
+            self.slots.release()
+
+    def _trigger(self, request):
+        """
+        (gatilho, id do administrador) se a requisição deve ser perfilada
+        """
+        token = request.headers.get(HEADER)
+        if token is None and f"{QUERY_PARAM}=" in request.META.get("QUERY_STRING", ""):
+            token = request.GET.get(QUERY_PARAM)
+        if token:
+            user_id = check_token(
+                token, self.config["TOKEN_MAX_AGE"], self.config["STAFF_CHECK_SECONDS"]
+            )
+            if user_id is not None:
+                return "token", user_id
+            logger.warning("Token de perfilamento inválido em %s", request.path)
+
+        if self.routes:
+            try:
+                route = resolve(request.path_info).view_name
+            except Resolver404:
+                return None
+            rate = self.routes.get(route)
+            if rate and random.random() < rate:
+                return "amostragem", None
+        return None
+
+    def _profile(self, request, trigger, user_id):
+        profiler = SamplingProfiler(
+            threading.get_ident(),
+            interval=self.config["INTERVAL_MS"] / 1000,
+            max_seconds=self.config["MAX_SECONDS"],
+        )
+        started_at = timezone.now()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        try:
+            profile_id = self.storage.save(
+                profiler.collapsed(),
+                {
+                    "criado_em": started_at.isoformat(),
+                    "metodo": request.method,
+                    "caminho": request.path,
+                    "rota": match.view_name if match else None,
+                    "status": response.status_code,
+                    "duracao_ms": round(elapsed_ms, 1),
+                    "amostras": profiler.samples,
+                    "intervalo_ms": self.config["INTERVAL_MS"],
+                    "gatilho": trigger,
+                    "usuario_id": user_id,
+                },
+            )
+        except OSError:
+            logger.exception("Falha ao gravar o perfil de %s", request.path)
+            return response
+
+        response.headers["X-Profile-Id"] = profile_id
+        logger.info(
+            "Perfil %s gravado: %s %s, %.1fms, %d amostras",
+            profile_id,
+            request.method,
+            request.path,
+            elapsed_ms,
+            profiler.samples,
+        )
+        return response
@@ -0,0 +1,185 @@
+"""
+Documentação OpenAPI sem custo na inicialização
+
+- ``lazy_schema("app.docs.simple.NOME")`` substitui o uso direto dos
+  decoradores ``extend_schema`` dos módulos ``docs``: a view só é
+  registrada, e o decorador é importado e aplicado por
+  ``apply_lazy_schemas`` quando o schema é gerado (pelo gerador
+  ``core.openapi.SchemaGenerator``).
+- ``schema_view`` serve ``/schema/`` a partir dos arquivos gerados no build
+  por ``manage.py build_openapi_schema`` (YAML e JSON, com versões gzip),
+  com ETag. Sem os arquivos, gera o schema na hora, como antes.
+- ``lazy_view`` adia a importação de views pesadas (Swagger e Redoc) até a
+  primeira requisição.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from importlib import import_module
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_GET
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "yaml": ("schema.yaml", "application/vnd.oai.openapi; charset=utf-8"),
+    "json": ("schema.json", "application/vnd.oai.openapi+json; charset=utf-8"),
+}
+
+_pending = []
+_pending_lock = threading.Lock()
+
+
+def lazy_schema(path):
+    """
+    Decorador que adia o ``extend_schema`` em ``path`` (``módulo.NOME``)
+    até a geração do schema
+    """
+
+    def decorator(view):
+        with _pending_lock:
+            _pending.append((view, path))
+        return view
+
+    return decorator
+
+
+def apply_lazy_schemas():
+    """
+    Importa e aplica os decoradores pendentes, na ordem em que foram
+    registrados (a mesma em que seriam aplicados na importação)
+    """
+    with _pending_lock:
+        pending = list(_pending)
+        _pending.clear()
+    for view, path in pending:
+        module, name = path.rsplit(".", 1)
+        getattr(import_module(module), name)(view)
+
+
+def get_schema_dir():
+    return getattr(
+        settings, "OPENAPI_SCHEMA_DIR", os.path.join(settings.BASE_DIR, "build")
+    )
+
+
+def write_artifacts(schema_dir, contents):
+    """
+    Grava ``{formato: bytes}`` e as versões gzip em ``schema_dir``
+    """
+    os.makedirs(schema_dir, exist_ok=True)
+    paths = []
+    for fmt, content in contents.items():
+        path = os.path.join(schema_dir, FORMATS[fmt][0])
+        with open(path, "wb") as f:
+            f.write(content)
+        # mtime fixo: o mesmo schema gera o mesmo arquivo
+        with open(f"{path}.gz", "wb") as f:
+            f.write(gzip.compress(content, compresslevel=9, mtime=0))
+        paths += [path, f"{path}.gz"]
+    return paths
+
+
+class PrebuiltSchema:
+    """
+    Um formato do schema gerado no build, carregado uma vez por processo
+    """
+
+    def __init__(self, path, content_type):
+        with open(path, "rb") as f:
+            self.content = f.read()
+        try:
+            with open(f"{path}.gz", "rb") as f:
+                self.gzipped = f.read()
+        except FileNotFoundError:
+            self.gzipped = None
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha256(self.content).hexdigest()[:32]}"'
+
+
+_prebuilt = {}
+_prebuilt_lock = threading.Lock()
+
+
+def _load_prebuilt(fmt):
+    if fmt not in _prebuilt:
+        with _prebuilt_lock:
+            if fmt not in _prebuilt:
+                filename, content_type = FORMATS[fmt]
+                path = os.path.join(get_schema_dir(), filename)
+                try:
+                    _prebuilt[fmt] = PrebuiltSchema(path, content_type)
+                except FileNotFoundError:
+                    logger.warning(
+                        "Schema pré-gerado não encontrado em %s; gerando a cada "
+                        "requisição (rode build_openapi_schema)",
+                        path,
+                    )
+                    _prebuilt[fmt] = None
+    return _prebuilt[fmt]
+
+
+def _requested_format(request):
+    fmt = request.GET.get("format")
+    if fmt in FORMATS:
+        return fmt
+    if "json" in request.headers.get("Accept", ""):
+        return "json"
+    return "yaml"
+
+
+_dynamic_view = None
+
+
+def _generate(request):
+    global _dynamic_view
+    if _dynamic_view is None:
+        from drf_spectacular.views import SpectacularAPIView
+
+        _dynamic_view = SpectacularAPIView.as_view()
+    return _dynamic_view(request)
+
+
+@require_GET
+def schema_view(request):
+    """
+    Schema OpenAPI pré-gerado (YAML ou JSON com ``?format=json``)
+    """
+    schema = _load_prebuilt(_requested_format(request))
+    if schema is None:
+        return _generate(request)
+
+    if request.headers.get("If-None-Match") == schema.etag:
+        response = HttpResponseNotModified()
+    elif schema.gzipped and "gzip" in request.headers.get("Accept-Encoding", ""):
+        response = HttpResponse(schema.gzipped, content_type=schema.content_type)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(schema.content, content_type=schema.content_type)
+    response["ETag"] = schema.etag
+    response["Vary"] = "Accept, Accept-Encoding"
+    response["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+def lazy_view(path, **initkwargs):
+    """
+    View que importa a classe em ``path`` e chama ``as_view(**initkwargs)``
+    só na primeira requisição
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+    return wrapper
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -28,7 +29,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.getenv("DEBUG", "True")
+DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1")
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "*").split(",")
 
@@ -42,14 +43,29 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "drf_spectacular_sidecar",
+    "core",
     "accounts",
     "alerts",
 ]
 
+# Comandos de benchmark (massa de dados sintética, carga e relatórios): só
+# em desenvolvimento ou com BENCHMARKS_ENABLED=True, nunca em produção
+
+BENCHMARKS_ENABLED = DEBUG or os.getenv("BENCHMARKS_ENABLED") == "True"
+
+if BENCHMARKS_ENABLED:
+    INSTALLED_APPS.append("benchmarks")
+
 MIDDLEWARE = [
+    "core.logs.RequestContextMiddleware",
+    "core.metrics.MetricsMiddleware",
+    "core.slow_queries.SlowQueryMiddleware",
+    "core.instrumentation.SQLInstrumentationMiddleware",
+    "core.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -94,6 +110,21 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Em produção aponte para um backend compartilhado (ex.: Redis) para que os
+# limites de taxa valham entre todos os workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -141,6 +172,10 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Testes: o runner silencia o log de acesso de cada requisição
+
+TEST_RUNNER = "core.test_runner.TestRunner"
+
 # Rest framework settings
 # https://www.django-rest-framework.org/
 
@@ -149,10 +184,22 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "core.throttling.SlidingWindowRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "alert_create": os.getenv("THROTTLE_ALERT_CREATE", "30/hour"),
+        "comment_create": os.getenv("THROTTLE_COMMENT_CREATE", "20/min"),
+        "cpf_check": os.getenv("THROTTLE_CPF_CHECK", "30/min"),
+        "validation": os.getenv("THROTTLE_VALIDATION", "60/min"),
+        # Registros por hora na validação em lote (cada item da lista conta)
+        "validation_batch": os.getenv("THROTTLE_VALIDATION_BATCH", "2000/hour"),
+        "autocomplete": os.getenv("THROTTLE_AUTOCOMPLETE", "300/min"),
+    },
 }
 
 # Spectacular settings
@@ -168,8 +215,14 @@ SPECTACULAR_SETTINGS = {
     "REDOC_DIST": "SIDECAR",
     "COMPONENT_SPLIT_REQUEST": True,
     "SCHEMA_PATH_PREFIX": "/api/",
+    # Aplica os decoradores de documentação adiados (core.schema.lazy_schema)
+    "DEFAULT_GENERATOR_CLASS": "core.openapi.SchemaGenerator",
 }
 
+# Schema OpenAPI servido em /schema/, gerado no build com
+# "python manage.py build_openapi_schema" (YAML, JSON e versões gzip)
+OPENAPI_SCHEMA_DIR = os.getenv("OPENAPI_SCHEMA_DIR", os.path.join(BASE_DIR, "build"))
+
 # JWT Settings
 # https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
 
@@ -178,7 +231,7 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
-    "UPDATE_LAST_LOGIN": True,
+    "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "VERIFYING_KEY": None,
@@ -200,9 +253,177 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=60),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=7),
     "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.auth.CustomTokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.auth.RotatingTokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
     "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
 }
+
+# last_login é atualizado pelo CustomTokenObtainPairSerializer no máximo uma
+# vez a cada LAST_LOGIN_UPDATE_INTERVAL segundos
+
+LAST_LOGIN_UPDATE_INTERVAL = int(os.getenv("LAST_LOGIN_UPDATE_INTERVAL", "900"))
+
+# Tempo (segundos) que o usuário autenticado fica em cache na autenticação JWT.
+# Só vale com um CACHE_BACKEND compartilhado (Redis, Memcached); com o
+# LocMemCache o usuário é lido do banco a cada requisição. 0 desliga o cache.
+
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL", "60"))
+
+# Tempo (segundos) de cache dos documentos de perfil (/accounts/me/). Como o
+# JWT_USER_CACHE_TTL, só vale com um CACHE_BACKEND compartilhado. 0 desliga.
+
+PROFILE_DOCUMENT_CACHE_TTL = int(os.getenv("PROFILE_DOCUMENT_CACHE_TTL", "3600"))
+
+# Verificação de senhas em pool limitado (accounts.backends)
+
+AUTHENTICATION_BACKENDS = ["accounts.backends.BoundedPasswordBackend"]
+
+PASSWORD_CHECK_WORKERS = int(os.getenv("PASSWORD_CHECK_WORKERS", "0")) or None
+PASSWORD_CHECK_MAX_PENDING = int(os.getenv("PASSWORD_CHECK_MAX_PENDING", "32"))
+PASSWORD_CHECK_TIMEOUT = float(os.getenv("PASSWORD_CHECK_TIMEOUT", "5"))
+
+# Detecção de spam em comentários (MinHash/LSH, assinaturas no banco).
+# Agende `python manage.py purge_spam_signatures` para remover as antigas.
+
+SPAM_DETECTION = {
+    "ENABLED": os.getenv("SPAM_DETECTION_ENABLED", "True") == "True",
+    "WINDOW_SECONDS": 6 * 60 * 60,
+    "MAX_CANDIDATES": 500,
+    "SIMILARITY_THRESHOLD": 0.7,
+    "HOLD_FOR_REVIEW": True,
+}
+
+# Idade máxima (segundos) dos snapshots de estatísticas antes de recalcular
+# sob demanda. Agende `python manage.py refresh_stats_snapshots` para mantê-los
+# sempre atualizados.
+
+STATS_SNAPSHOT_MAX_AGE = int(os.getenv("STATS_SNAPSHOT_MAX_AGE", "300"))
+
+# Filtro de Bloom (por worker) para a verificação de disponibilidade de CPF
+
+CPF_BLOOM_FILTER = {
+    "ENABLED": os.getenv("CPF_BLOOM_FILTER_ENABLED", "True") == "True",
+    "ERROR_RATE": 0.001,
+    "MIN_CAPACITY": 100000,
+    "REFRESH_SECONDS": 30,
+    "REFRESH_OVERLAP_SECONDS": 5 * 60,
+    "REBUILD_SECONDS": 60 * 60,
+}
+
+# Máximo de registros por requisição em /accounts/validate/batch/
+
+VALIDATION_BATCH_MAX_ITEMS = int(os.getenv("VALIDATION_BATCH_MAX_ITEMS", "500"))
+
+# Tabela de faixas de CEP por bairro (padrão: accounts/data/cep_faixas.csv)
+
+CEP_RANGES_FILE = os.getenv("CEP_RANGES_FILE") or None
+
+# Lista opcional de logradouros (um por linha) para o autocompletar
+
+AUTOCOMPLETE_STREETS_FILE = os.getenv("AUTOCOMPLETE_STREETS_FILE") or None
+
+# Tempo (segundos) de cache das estatísticas de usuários
+
+USER_STATS_CACHE_TTL = int(os.getenv("USER_STATS_CACHE_TTL", "300"))
+
+# Instrumentação de SQL por requisição (core.instrumentation): Server-Timing
+# para administradores, log de requisições lentas e detecção de N+1 (DEBUG)
+
+SQL_INSTRUMENTATION = {
+    "ENABLED": os.getenv("SQL_INSTRUMENTATION_ENABLED", "False") == "True",
+    "SERVER_TIMING": os.getenv("SQL_INSTRUMENTATION_SERVER_TIMING", "staff"),
+    "SLOW_REQUEST_MS": int(os.getenv("SQL_INSTRUMENTATION_SLOW_REQUEST_MS", "500")),
+    "SLOW_DB_MS": int(os.getenv("SQL_INSTRUMENTATION_SLOW_DB_MS", "200")),
+    "MAX_QUERIES": int(os.getenv("SQL_INSTRUMENTATION_MAX_QUERIES", "50")),
+    "DUPLICATE_THRESHOLD": 5,
+}
+
+# Consultas lentas (core.slow_queries): acima de SLOW_QUERIES_THRESHOLD_MS, o
+# SQL e uma amostra do plano (EXPLAIN, limitada por forma de consulta) vão
+# para a tabela core_slowquery, consultada em /accounts/slow-queries/. Os
+# valores dos parâmetros (CPFs, emails) só são gravados com
+# SLOW_QUERIES_CAPTURE_PARAMS=True; EXPLAIN ANALYZE executa a consulta de novo
+
+SLOW_QUERIES = {
+    "ENABLED": os.getenv("SLOW_QUERIES_ENABLED", "True") == "True",
+    "THRESHOLD_MS": int(os.getenv("SLOW_QUERIES_THRESHOLD_MS", "200")),
+    "EXPLAIN": True,
+    "EXPLAIN_ANALYZE": os.getenv("SLOW_QUERIES_EXPLAIN_ANALYZE", "False") == "True",
+    "EXPLAIN_INTERVAL": int(os.getenv("SLOW_QUERIES_EXPLAIN_INTERVAL", "600")),
+    "EXPLAIN_TIMEOUT_MS": 5000,
+    "MAX_ROWS": int(os.getenv("SLOW_QUERIES_MAX_ROWS", "5000")),
+    "MAX_PER_REQUEST": 5,
+    "CAPTURE_PARAMS": os.getenv("SLOW_QUERIES_CAPTURE_PARAMS", "False") == "True",
+}
+
+# Métricas no formato do Prometheus em /metrics (core.metrics). Cada worker
+# grava em um arquivo próprio em METRICS_DIR; limpe o diretório ao iniciar o
+# serviço. A coleta exige "Authorization: Bearer <METRICS_TOKEN>"; sem o
+# token, /metrics só responde com DEBUG ligado.
+
+METRICS = {
+    "ENABLED": os.getenv("METRICS_ENABLED", "True") == "True",
+    "DIR": os.getenv(
+        "METRICS_DIR", os.path.join(tempfile.gettempdir(), "plataforma-metrics")
+    ),
+    "TOKEN": os.getenv("METRICS_TOKEN") or None,
+}
+
+# Profiler por amostragem (core.profiling). Administradores perfilam uma
+# requisição enviando o token emitido em /accounts/profiling/ no cabeçalho
+# X-Profile-Token; ROUTES sorteia uma fração das requisições de uma rota,
+# como {"alerts:post-feed": 0.01}. Os perfis ficam em PROFILING_DIR, no disco
+# de cada servidor: com mais de um, use um diretório compartilhado para que a
+# listagem mostre os perfis de todos.
+
+PROFILING = {
+    "ENABLED": os.getenv("PROFILING_ENABLED", "True") == "True",
+    "DIR": os.getenv(
+        "PROFILING_DIR", os.path.join(tempfile.gettempdir(), "plataforma-profiles")
+    ),
+    "INTERVAL_MS": int(os.getenv("PROFILING_INTERVAL_MS", "5")),
+    "MAX_SECONDS": 30,
+    "MAX_PROFILES": 200,
+    "MAX_CONCURRENT": 2,
+    "TOKEN_MAX_AGE": 600,
+    "STAFF_CHECK_SECONDS": 60,
+    "ROUTES": {},
+}
+
+# Logging (core.logs): os registros vão para uma fila limitada e uma thread
+# os grava na saída de erro, em JSON (LOG_FORMAT=json) ou texto. Com a fila
+# cheia, registros são descartados e um resumo dos descartes é registrado.
+# Cada registro de uma requisição traz request_id, rota e usuário; o logger
+# core.requests registra status, latência e número de consultas.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "request_context": {"()": "core.logs.RequestContextFilter"},
+    },
+    "formatters": {
+        "json": {"()": "core.logs.JSONFormatter"},
+        "text": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"},
+    },
+    "handlers": {
+        "queue": {
+            "()": "core.logs.BoundedQueueHandler",
+            "stream": "ext://sys.stderr",
+            "formatter": os.getenv("LOG_FORMAT", "json"),
+            "maxsize": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            "filters": ["request_context"],
+        },
+    },
+    "root": {"handlers": ["queue"], "level": LOG_LEVEL},
+    "loggers": {
+        "django": {"handlers": ["queue"], "level": LOG_LEVEL, "propagate": False},
+        "core.requests": {
+            "level": os.getenv("LOG_REQUESTS_LEVEL", LOG_LEVEL),
+        },
+    },
+}
@@ -0,0 +1,227 @@
+"""
+Captura de consultas lentas com amostras de plano de execução
+
+``SlowQueryMiddleware`` cronometra as consultas de cada requisição. As que
+passam de ``SLOW_QUERIES["THRESHOLD_MS"]`` são gravadas na tabela
+``core.SlowQuery`` ao final da requisição, com o SQL parametrizado, a
+duração, o banco e a rota. Para cada forma de consulta (o SQL
+parametrizado, com as listas de ``IN`` unificadas), no máximo uma amostra a
+cada ``EXPLAIN_INTERVAL`` segundos por processo recebe também o plano de
+execução (``EXPLAIN``, só para ``SELECT`` sem cláusula de trava como
+``FOR UPDATE``).
+
+Os parâmetros trazem CPFs, emails e hashes, então só são gravados com
+``CAPTURE_PARAMS``; sem ele, os literais de texto do plano também são
+mascarados. ``EXPLAIN_ANALYZE`` executa a consulta de novo e fica desligado
+por padrão.
+
+A tabela é um buffer circular de ``MAX_ROWS`` linhas. A API administrativa
+agrupa as linhas por forma de consulta e ordena pelo tempo total.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections, transaction
+
+from .instrumentation import query_template
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "THRESHOLD_MS": 200,
+    # Plano de execução das amostras e intervalo mínimo por forma de consulta
+    "EXPLAIN": True,
+    "EXPLAIN_ANALYZE": False,
+    "EXPLAIN_INTERVAL": 600,
+    "EXPLAIN_TIMEOUT_MS": 5000,
+    # Tamanho do buffer circular
+    "MAX_ROWS": 5000,
+    # Consultas lentas gravadas por requisição; as demais só vão para o log
+    "MAX_PER_REQUEST": 5,
+    # Grava os valores dos parâmetros (dados pessoais) em vez de omiti-los
+    "CAPTURE_PARAMS": False,
+}
+
+_SCALARS = (str, int, float, bool, type(None))
+
+# Cláusulas de trava: o EXPLAIN ANALYZE travaria as linhas de novo
+_LOCKING = re.compile(r"\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)\b", re.I)
+_PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def get_slow_query_settings():
+    """
+    Retorna as configurações de captura mescladas com os padrões
+    """
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "SLOW_QUERIES", {}))
+    return config
+
+
+def fingerprint(sql):
+    """
+    Identificador da forma da consulta
+    """
+    return hashlib.md5(query_template(sql).encode(), usedforsecurity=False).hexdigest()
+
+
+def _jsonable(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _jsonable(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_jsonable(value) for value in params]
+    return params if isinstance(params, _SCALARS) else str(params)
+
+
+class ExplainRateLimiter:
+    """
+    Libera um plano de execução por forma de consulta a cada ``interval``
+    segundos, no processo
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                return False
+            self._last[key] = now
+            return True
+
+
+class SlowQueryRecorder:
+    """
+    ``execute_wrapper`` que guarda as consultas acima do limite
+    """
+
+    def __init__(self, alias, threshold_ms):
+        self.alias = alias
+        self.threshold_ms = threshold_ms
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= self.threshold_ms and not many:
+                self.slow.append((sql, params, elapsed_ms))
+
+
+def mask_plan(plan):
+    """
+    Troca os literais de texto do plano (valores dos parâmetros) por '?'
+    """
+    return _PLAN_LITERAL.sub("'?'", plan)
+
+
+def explain(alias, sql, params, analyze=False, timeout_ms=5000):
+    """
+    Plano de execução da consulta em texto, ou "" se não for possível
+
+    ``EXPLAIN ANALYZE`` executa a consulta de novo; por isso só é usado
+    em ``SELECT`` sem cláusula de trava e com ``statement_timeout`` no
+    PostgreSQL.
+    """
+    if sql.lstrip()[:6].upper() != "SELECT" or _LOCKING.search(sql):
+        return ""
+
+    connection = connections[alias]
+    postgres = connection.vendor == "postgresql"
+    options = {"analyze": True, "buffers": True} if analyze and postgres else {}
+    try:
+        prefix = connection.ops.explain_query_prefix(**options)
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            if postgres:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except (DatabaseError, ValueError) as e:
+        logger.warning("Falha no EXPLAIN de consulta lenta: %s", e)
+        return ""
+
+
+class SlowQueryMiddleware:
+    """
+    Grava as consultas lentas de cada requisição (ver o docstring do módulo)
+    """
+
+    def __init__(self, get_response):
+        self.config = get_slow_query_settings()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limiter = ExplainRateLimiter(self.config["EXPLAIN_INTERVAL"])
+
+    def __call__(self, request):
+        recorders = [
+            SlowQueryRecorder(connection.alias, self.config["THRESHOLD_MS"])
+            for connection in connections.all()
+        ]
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(
+                    connections[recorder.alias].execute_wrapper(recorder)
+                )
+            response = self.get_response(request)
+
+        # Fora do execute_wrapper: as gravações abaixo não são cronometradas
+        slow = [(r.alias, *query) for r in recorders for query in r.slow]
+        if slow:
+            match = getattr(request, "resolver_match", None)
+            self._store(slow, match.view_name if match else request.path)
+        return response
+
+    def _store(self, slow, route):
+        from .models import SlowQuery
+
+        slow.sort(key=lambda query: query[3], reverse=True)
+        for alias, sql, params, elapsed_ms in slow[self.config["MAX_PER_REQUEST"] :]:
+            logger.info("Consulta lenta não gravada (%.1fms) em %s", elapsed_ms, route)
+
+        for alias, sql, params, elapsed_ms in slow[: self.config["MAX_PER_REQUEST"]]:
+            key = fingerprint(sql)
+            plan = ""
+            if self.config["EXPLAIN"] and self.limiter.allow(key):
+                plan = explain(
+                    alias,
+                    sql,
+                    params,
+                    analyze=self.config["EXPLAIN_ANALYZE"],
+                    timeout_ms=self.config["EXPLAIN_TIMEOUT_MS"],
+                )
+                if not self.config["CAPTURE_PARAMS"]:
+                    plan = mask_plan(plan)
+            try:
+                entry = SlowQuery.objects.create(
+                    fingerprint=key,
+                    sql=sql,
+                    parametros=(
+                        _jsonable(params) if self.config["CAPTURE_PARAMS"] else None
+                    ),
+                    duracao_ms=round(elapsed_ms, 3),
+                    banco=alias,
+                    rota=route[:200],
+                    plano=plan,
+                )
+                SlowQuery.objects.filter(
+                    id__lte=entry.id - self.config["MAX_ROWS"]
+                ).delete()
+            except DatabaseError:
+                logger.exception("Falha ao gravar consulta lenta")
@@ -0,0 +1,20 @@
+"""
+Runner dos testes do projeto
+"""
+
+import logging
+
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner que não registra cada requisição feita pelos testes
+
+    O log de acesso (``core.requests``) fica em WARNING, então só respostas
+    5xx aparecem na saída.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        logging.getLogger("core.requests").setLevel(logging.WARNING)
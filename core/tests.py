@@ -0,0 +1,272 @@
+"""
+Testes do app core
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import SlowQuery
+from .pagination import EstimatedCountPaginator
+from .profiling import HEADER, check_token, issue_token
+from .slow_queries import SlowQueryMiddleware, explain
+from .throttling import SlidingWindowRateThrottle
+
+
+class MetricsEndpointTests(TestCase):
+    """
+    Acesso a /metrics
+    """
+
+    url = "/metrics"
+
+    @override_settings(DEBUG=False, METRICS={"TOKEN": None})
+    def test_closed_without_token_outside_debug(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(DEBUG=True, METRICS={"TOKEN": None})
+    def test_open_without_token_in_debug(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(DEBUG=False, METRICS={"TOKEN": "segredo"})
+    def test_requires_bearer_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer outro")
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer segredo")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS={"ENABLED": False})
+    def test_disabled(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """
+    Contagem limitada sem bloquear as páginas seguintes
+    """
+
+    def setUp(self):
+        User.objects.bulk_create(User(username=f"pagina{i}") for i in range(7))
+        self.queryset = User.objects.filter(is_active=True).order_by("id")
+
+    def usernames(self, page):
+        return [user.username for user in page]
+
+    def test_exact_count_below_the_limit(self):
+        paginator = EstimatedCountPaginator(self.queryset, 3, max_exact_count=10)
+
+        self.assertEqual(paginator.count, 7)
+        self.assertTrue(paginator.count_is_exact)
+        self.assertEqual(paginator.get_page(9).number, 3)
+
+    def test_pages_past_the_capped_count(self):
+        paginator = EstimatedCountPaginator(self.queryset, 2, max_exact_count=3)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_exact)
+
+        page = paginator.get_page(3)
+        self.assertEqual(self.usernames(page), ["pagina4", "pagina5"])
+        self.assertTrue(page.has_next())
+
+        page = paginator.get_page(page.next_page_number())
+        self.assertEqual(self.usernames(page), ["pagina6"])
+        self.assertFalse(page.has_next())
+
+
+class SlidingWindowRateThrottleTests(TestCase):
+    """
+    Limite de taxa por janela deslizante
+    """
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        self.url = reverse("accounts:api_validate_phone")
+
+    def test_over_the_limit_returns_429_with_retry_after(self):
+        rates = {"validation": "2/min"}
+        with mock.patch.object(SlidingWindowRateThrottle, "THROTTLE_RATES", rates):
+            for _ in range(2):
+                response = self.client.get(self.url, {"phone": "48999998888"})
+                self.assertEqual(response.status_code, 200)
+
+            response = self.client.get(self.url, {"phone": "48999998888"})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    def test_concurrent_requests_do_not_overshoot(self):
+        class SlowCache:
+            # Atraso antes do incremento, para expor a disputa entre as threads
+            def __getattr__(self, name):
+                return getattr(cache, name)
+
+            def add(self, *args, **kwargs):
+                time.sleep(0.01)
+                return cache.add(*args, **kwargs)
+
+        class Throttle(SlidingWindowRateThrottle):
+            scope = "validation"
+            cache = SlowCache()
+
+            def get_cache_key(self, request, view):
+                return "throttle:concorrencia"
+
+        barrier = threading.Barrier(20)
+        allowed = []
+
+        def hit():
+            barrier.wait()
+            allowed.append(Throttle().allow_request(None, None))
+
+        rates = {"validation": "5/min"}
+        with mock.patch.object(SlidingWindowRateThrottle, "THROTTLE_RATES", rates):
+            threads = [threading.Thread(target=hit) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(allowed.count(True), 5)
+
+
+@override_settings(SQL_INSTRUMENTATION={"ENABLED": True, "SERVER_TIMING": "staff"})
+class ServerTimingTests(TestCase):
+    """
+    Cabeçalho Server-Timing só para a equipe autenticada por JWT
+    """
+
+    def setUp(self):
+        cache.clear()
+        SlidingWindowRateThrottle._blocked.clear()
+        self.staff = User.objects.create_user(username="equipe", is_staff=True)
+        self.user = User.objects.create_user(username="cidadao")
+
+    def get(self, name, user):
+        token = AccessToken.for_user(user)
+        return self.client.get(reverse(name), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_staff_gets_the_header(self):
+        for name in ("accounts:api_user_profile", "alerts:post-feed"):
+            response = self.get(name, self.staff)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("db;dur=", response["Server-Timing"])
+
+    def test_other_users_do_not(self):
+        for name in ("accounts:api_user_profile", "alerts:post-feed"):
+            response = self.get(name, self.user)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("Server-Timing", response)
+
+        self.assertNotIn("Server-Timing", self.client.get(reverse("alerts:post-feed")))
+
+
+class SlowQueryMiddlewareTests(TestCase):
+    """
+    Captura de consultas lentas e buffer circular
+    """
+
+    def request(self):
+        def view(request):
+            list(User.objects.filter(username="lenta"))
+            return None
+
+        SlowQueryMiddleware(view)(RequestFactory().get("/lenta/"))
+
+    @override_settings(SLOW_QUERIES={"THRESHOLD_MS": 0, "EXPLAIN_INTERVAL": 0})
+    def test_queries_above_the_threshold_are_stored(self):
+        self.request()
+
+        entry = SlowQuery.objects.get()
+        self.assertIn('FROM "auth_user"', entry.sql)
+        self.assertIsNone(entry.parametros)
+        self.assertEqual(entry.rota, "/lenta/")
+        self.assertNotEqual(entry.plano, "")
+
+    @override_settings(SLOW_QUERIES={"THRESHOLD_MS": 60_000})
+    def test_fast_queries_are_not_stored(self):
+        self.request()
+
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERIES={"THRESHOLD_MS": 0, "MAX_ROWS": 2})
+    def test_table_keeps_the_latest_rows(self):
+        for _ in range(3):
+            self.request()
+
+        self.assertEqual(SlowQuery.objects.count(), 2)
+
+    def test_explain_skips_locking_and_write_queries(self):
+        sql = 'SELECT "auth_user"."id" FROM "auth_user" WHERE "auth_user"."id" = %s'
+
+        self.assertNotEqual(explain("default", sql, (1,)), "")
+        self.assertEqual(explain("default", f"{sql} FOR UPDATE", (1,)), "")
+        self.assertEqual(explain("default", 'DELETE FROM "auth_user"', ()), "")
+
+
+class ProfilingTests(TestCase):
+    """
+    Perfilamento por token de administrador
+    """
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        override = override_settings(PROFILING={"DIR": directory, "INTERVAL_MS": 1})
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.admin = User.objects.create_user(username="perfil_admin", is_staff=True)
+        self.user = User.objects.create_user(username="perfil_usuario")
+
+    def profiled_get(self, token):
+        return self.client.get(reverse("alerts:post-feed"), headers={HEADER: token})
+
+    def test_bad_expired_and_non_staff_tokens_are_rejected(self):
+        with mock.patch(
+            "django.core.signing.time.time", return_value=time.time() - 3600
+        ):
+            expired = issue_token(self.admin)
+
+        for token in ("invalido", expired, issue_token(self.user)):
+            self.assertIsNone(check_token(token, max_age=600))
+            self.assertNotIn("X-Profile-Id", self.profiled_get(token))
+
+    def test_profile_is_recorded_and_listed(self):
+        response = self.profiled_get(issue_token(self.admin))
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-Profile-Id"]
+
+        self.client.force_login(self.admin)
+        listing = self.client.get(reverse("accounts:api_request_profiles")).json()
+        self.assertEqual(listing["count"], 1)
+        self.assertEqual(listing["results"][0]["id"], profile_id)
+        self.assertEqual(listing["results"][0]["usuario_id"], self.admin.pk)
+        self.assertEqual(listing["results"][0]["rota"], "alerts:post-feed")
+
+        url = reverse("accounts:api_request_profile_detail", args=[profile_id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_staff_check_is_cached(self):
+        token = issue_token(self.admin)
+        self.assertEqual(check_token(token, max_age=600), self.admin.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(check_token(token, max_age=600), self.admin.pk)
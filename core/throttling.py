@@ -0,0 +1,116 @@
+"""
+Limitação de taxa compartilhada entre workers
+
+Usa uma janela deslizante aproximada (contadores por janela fixa ponderados)
+armazenada no cache padrão, incrementada com operações atômicas para que o
+limite valha para todos os processos. Cada processo mantém ainda um registro
+local das chaves bloqueadas, de modo que clientes já limitados são recusados
+sem consultar o cache até o fim do bloqueio.
+"""
+
+import threading
+
+from rest_framework.throttling import ScopedRateThrottle
+
+
+class SlidingWindowRateThrottle(ScopedRateThrottle):
+    """
+    Throttle por usuário (ou IP, se anônimo) e escopo
+
+    O escopo vem do atributo ``scope`` da classe ou de ``throttle_scope`` da
+    view, e a taxa de ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``. Subclasses
+    podem sobrescrever ``get_cost`` para que uma requisição consuma mais de
+    uma unidade (ex.: um lote de registros).
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+    max_local_entries = 10000
+
+    _blocked = {}
+    _blocked_lock = threading.Lock()
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        scope = type(self).scope or getattr(view, self.scope_attr, None)
+        if not scope:
+            return True
+
+        self.scope = scope
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        cost = self.get_cost(request, view)
+        if cost <= 0:
+            return True
+
+        self.now = self.timer()
+
+        blocked_until = self._blocked.get(self.key)
+        if blocked_until is not None and blocked_until > self.now:
+            self.wait_seconds = blocked_until - self.now
+            return False
+
+        window = int(self.now // self.duration)
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        # Incrementa antes de decidir: requisições simultâneas veem cada uma
+        # o contador já com as outras, então não ultrapassam o limite juntas
+        self.cache.add(current_key, 0, timeout=self.duration * 2)
+        try:
+            current = self.cache.incr(current_key, cost)
+        except ValueError:
+            self.cache.set(current_key, cost, timeout=self.duration * 2)
+            current = cost
+        previous = self.cache.get(previous_key, 0)
+
+        elapsed = (self.now % self.duration) / self.duration
+        estimated = previous * (1 - elapsed) + current
+
+        if estimated - 1 >= self.num_requests:
+            # A requisição recusada não consome a taxa
+            try:
+                self.cache.decr(current_key, cost)
+            except ValueError:
+                pass
+            self.wait_seconds = self._retry_after(previous, estimated - 1)
+            self._block(self.key, self.now + self.wait_seconds, self.now)
+            return False
+
+        return True
+
+    def get_cost(self, request, view):
+        """
+        Unidades da taxa consumidas pela requisição (0 não conta)
+        """
+        return 1
+
+    def _retry_after(self, previous, estimated):
+        """
+        Calcula em quantos segundos a janela volta a aceitar requisições
+        """
+        remaining = self.duration - (self.now % self.duration)
+        if previous <= 0:
+            return remaining
+
+        excess = estimated - (self.num_requests - 1)
+        return max(1.0, min(remaining, self.duration * excess / previous))
+
+    @classmethod
+    def _block(cls, key, until, now):
+        with cls._blocked_lock:
+            if len(cls._blocked) >= cls.max_local_entries:
+                for expired in [k for k, v in cls._blocked.items() if v <= now]:
+                    del cls._blocked[expired]
+            cls._blocked[key] = until
+
+    def wait(self):
+        return self.wait_seconds
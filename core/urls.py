@@ -19,11 +19,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from core.metrics import metrics_view
+from core.schema import lazy_view, schema_view
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -38,10 +35,17 @@ urlpatterns = [
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
-    path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    path("metrics", metrics_view, name="metrics"),
+    path("schema/", schema_view, name="schema"),
+    path(
+        "docs/",
+        lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name="schema"),
+        name="swagger-ui",
+    ),
     path(
-        "schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"
+        "schema/redoc/",
+        lazy_view("drf_spectacular.views.SpectacularRedocView", url_name="schema"),
+        name="redoc",
     ),
 ]
 